@@ -0,0 +1,215 @@
+"""
+Command line maintenance tasks.
+
+Usage (from the backend directory):
+    python -m app.cli reprice [--dry-run] [--chunk-size N] [--annee YEAR]
+    python -m app.cli train [--source synthetic|history] [--n-jobs N] [--backend threading|loky]
+    python -m app.cli rebuild-stats [--check]
+    python -m app.cli migrate
+    python -m app.cli check-query-plans
+    python -m app.cli rebuild-search-index [--check]
+    python -m app.cli import {cars,customers,rentals} FILE [--format csv|ndjson] [--chunk-size N] [--dry-run]
+    python -m app.cli export {cars,customers,rentals} [--format ndjson|csv] [--output FILE] [--from DATE] [--to DATE]
+"""
+from datetime import date
+import argparse
+import json
+import sys
+
+from app.database import init_db
+
+
+def _print_progress(processed: int, total: int):
+    print(f"\r{processed}/{total} cars", end="", file=sys.stderr, flush=True)
+
+
+def cmd_reprice(args) -> int:
+    """Reprice the whole fleet with the ML price model"""
+    from app.services.repricing_service import RepricingService
+
+    report = RepricingService.reprice_fleet(
+        chunk_size=args.chunk_size,
+        dry_run=args.dry_run,
+        annee=args.annee,
+        progress=_print_progress
+    )
+    print(file=sys.stderr)
+    print(json.dumps(report, indent=2, default=str))
+    return 0
+
+
+def cmd_train(args) -> int:
+    """Train and publish a new version of the price model"""
+    from app.services.training_service import TrainingService
+
+    report = TrainingService.train(
+        source=args.source,
+        chunk_size=args.chunk_size,
+        n_jobs=args.n_jobs,
+        backend=args.backend,
+        progress=lambda processed: print(f"\r{processed} rows", end="", file=sys.stderr, flush=True)
+    )
+    print(json.dumps(report, indent=2, default=str))
+    return 0
+
+
+def cmd_rebuild_stats(args) -> int:
+    """Check the fleet statistics counters against the cars table and rebuild them"""
+    from app.database import SessionLocal
+    from app.services.stats_service import StatsService
+
+    db = SessionLocal()
+    try:
+        report = StatsService.rebuild(db, dry_run=args.check)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+    return 0 if report["consistent"] or not args.check else 1
+
+
+def cmd_migrate(args) -> int:
+    """Show the applied schema migrations (pending ones are applied by init_db)"""
+    from app.database import engine
+    from app.migrations import MIGRATIONS, get_applied_versions
+
+    applied = get_applied_versions(engine)
+    for version, description, _ in MIGRATIONS:
+        print(f"{version:>4}  {'applied' if version in applied else 'pending'}  {description}")
+    return 0
+
+
+def cmd_check_query_plans(args) -> int:
+    """Check that the hot queries are served by their indexes"""
+    from app.database import engine
+    from app.migrations import check_query_plans
+
+    results = check_query_plans(engine)
+    for result in results:
+        print(f"{'OK  ' if result['ok'] else 'FAIL'}  {result['query']} ({result['expected_index']})")
+        for step in result["plan"]:
+            print(f"        {step}")
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+def cmd_rebuild_search_index(args) -> int:
+    """Rebuild the customer full-text search index"""
+    from app.database import SessionLocal
+    from app.services.search_service import SearchService
+
+    db = SessionLocal()
+    try:
+        if not SearchService.fts_available(db):
+            print("No full-text index in this database (SQLite with FTS5 only)", file=sys.stderr)
+            return 1
+        if args.check:
+            ok = SearchService.check_index(db)
+            print(json.dumps({"integrity_check": ok}, indent=2))
+            return 0 if ok else 1
+        report = SearchService.rebuild_index(db)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+    return 0 if report["integrity_check"] else 1
+
+
+def cmd_import(args) -> int:
+    """Bulk import cars, customers or rentals from a CSV or NDJSON file"""
+    from app.database import SessionLocal
+    from app.services.import_service import ImportService
+
+    fmt = args.format or ImportService.detect_format(args.file)
+    if fmt is None:
+        print("Cannot tell the file format from its name, use --format", file=sys.stderr)
+        return 2
+
+    db = SessionLocal()
+    try:
+        with open(args.file, "rb") as f:
+            report = ImportService.import_records(
+                db, args.entity, ImportService.iter_records(ImportService.decode_lines(f), fmt),
+                fmt=fmt, chunk_size=args.chunk_size, dry_run=args.dry_run
+            )
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+    return 0 if report["failed"] == 0 else 1
+
+
+def cmd_export(args) -> int:
+    """Stream a table to a file or stdout as NDJSON or CSV"""
+    from app.services.export_service import ExportService
+
+    chunks = ExportService.stream(args.entity, args.format, args.batch_size, args.date_from, args.date_to)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            f.writelines(chunks)
+    else:
+        sys.stdout.writelines(chunks)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Car rental maintenance tasks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reprice = subparsers.add_parser("reprice", help="Write ML-predicted prices to every car")
+    reprice.add_argument("--dry-run", action="store_true", help="Only report the price changes")
+    reprice.add_argument("--chunk-size", type=int, default=500, help="Cars scored and written per transaction")
+    reprice.add_argument("--annee", type=int, default=2023, help="Manufacturing year assumed for every car")
+    reprice.set_defaults(func=cmd_reprice)
+
+    train = subparsers.add_parser("train", help="Train and publish a new version of the price model")
+    train.add_argument("--source", choices=["synthetic", "history"], default="synthetic",
+                       help="Synthetic grid or historical rentals from the database")
+    train.add_argument("--chunk-size", type=int, default=50000, help="Rows fetched per database round trip")
+    train.add_argument("--n-jobs", type=int, default=-1, help="Parallel workers (-1 = all cores)")
+    train.add_argument("--backend", choices=["threading", "loky"], default="threading",
+                       help="Thread pool or process pool")
+    train.set_defaults(func=cmd_train)
+
+    rebuild_stats = subparsers.add_parser("rebuild-stats", help="Rebuild the fleet statistics counters")
+    rebuild_stats.add_argument("--check", action="store_true",
+                               help="Only compare the counters with the cars table (exit 1 on drift)")
+    rebuild_stats.set_defaults(func=cmd_rebuild_stats)
+
+    migrate = subparsers.add_parser("migrate", help="Apply pending schema migrations and list them")
+    migrate.set_defaults(func=cmd_migrate)
+
+    check_plans = subparsers.add_parser("check-query-plans", help="Check that hot queries use their indexes")
+    check_plans.set_defaults(func=cmd_check_query_plans)
+
+    rebuild_search = subparsers.add_parser("rebuild-search-index",
+                                           help="Rebuild the customer full-text search index")
+    rebuild_search.add_argument("--check", action="store_true", help="Only run the index integrity check")
+    rebuild_search.set_defaults(func=cmd_rebuild_search_index)
+
+    bulk_import = subparsers.add_parser("import", help="Bulk import rows from a CSV or NDJSON file")
+    bulk_import.add_argument("entity", choices=["cars", "customers", "rentals"])
+    bulk_import.add_argument("file", help="CSV (with a header row) or NDJSON file")
+    bulk_import.add_argument("--format", choices=["csv", "ndjson"], help="Default: from the file extension")
+    bulk_import.add_argument("--chunk-size", type=int, default=1000, help="Rows validated and inserted per transaction")
+    bulk_import.add_argument("--dry-run", action="store_true", help="Validate only, write nothing")
+    bulk_import.set_defaults(func=cmd_import)
+
+    export = subparsers.add_parser("export", help="Export a table as NDJSON or CSV")
+    export.add_argument("entity", choices=["cars", "customers", "rentals"])
+    export.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    export.add_argument("--output", help="Output file (default: stdout)")
+    export.add_argument("--batch-size", type=int, default=1000, help="Rows fetched per database round trip")
+    export.add_argument("--from", dest="date_from", type=date.fromisoformat,
+                        help="Rentals started on or after this day (YYYY-MM-DD)")
+    export.add_argument("--to", dest="date_to", type=date.fromisoformat,
+                        help="Rentals started before this day (YYYY-MM-DD)")
+    export.set_defaults(func=cmd_export)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    init_db()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
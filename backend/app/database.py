@@ -1,18 +1,183 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.metrics import timed_pool_class
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./rental_system.db")
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+# Engine profile: "tuned" (SQLite pragmas and pool settings below) or "default"
+# (driver and SQLAlchemy defaults: rollback journal, pool of 5 + 10 overflow)
+DATABASE_PROFILE = os.getenv("DATABASE_PROFILE", "tuned").lower()
+
+# Connection pool of each engine: connections kept, extra connections under load,
+# seconds to wait for a free one, and age in seconds after which one is replaced.
+# Size + overflow matches the 40 threads that run sync routes
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", "30"))
+DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
+DATABASE_POOL_RECYCLE = int(os.getenv("DATABASE_POOL_RECYCLE", "3600"))
+
+# Serve GET routes from a second, read-only engine on the same SQLite file (its own pool)
+DATABASE_READ_ENGINE = os.getenv("DATABASE_READ_ENGINE", "true").lower() in ("1", "true", "yes")
+
+# SQLite connection settings (tuned profile): how long a writer waits for the lock,
+# fsync policy (NORMAL: at checkpoints only, safe with WAL), page cache per
+# connection in KiB, and bytes of the file memory-mapped
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_CACHE_KIB = int(os.getenv("SQLITE_CACHE_KIB", "16384"))
+SQLITE_MMAP_BYTES = int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+
+# Serve the car, customer and rental routes with async def handlers over an AsyncSession
+# (aiosqlite or asyncpg driver) instead of sync handlers in the thread pool
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Async driver of each database backend
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+if DATABASE_PROFILE not in ("tuned", "default"):
+    raise ValueError(f"DATABASE_PROFILE must be tuned or default, not {DATABASE_PROFILE!r}")
+if SQLITE_SYNCHRONOUS not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+    raise ValueError(f"SQLITE_SYNCHRONOUS must be OFF, NORMAL, FULL or EXTRA, not {SQLITE_SYNCHRONOUS!r}")
+
+
+def is_sqlite_file(url: str) -> bool:
+    """SQLite database stored in a file (not in memory)"""
+    parsed = make_url(url)
+    return (parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+            and parsed.query.get("mode") != "memory")
+
+
+def sqlite_pragmas(read_only: bool = False) -> list:
+    """Statements run on each new connection of the tuned profile"""
+    pragmas = [
+        f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size = -{SQLITE_CACHE_KIB}",
+        f"PRAGMA mmap_size = {SQLITE_MMAP_BYTES}",
+    ]
+    # The journal mode is stored in the file: the write engine switches it once for every process
+    return pragmas + (["PRAGMA query_only = ON"] if read_only else ["PRAGMA journal_mode = WAL"])
+
+
+def _pool_options(pool_class, engine_name: str) -> dict:
+    """Pool settings, with checkouts timed for /metrics under engine_name"""
+    return {
+        "poolclass": timed_pool_class(pool_class, engine_name),
+        "pool_size": DATABASE_POOL_SIZE, "max_overflow": DATABASE_MAX_OVERFLOW,
+        "pool_timeout": DATABASE_POOL_TIMEOUT, "pool_recycle": DATABASE_POOL_RECYCLE,
+    }
+
+
+def _set_pragmas_on_connect(engine, read_only: bool):
+    pragmas = sqlite_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def create_db_engine(url: str, read_only: bool = False):
+    """
+    Engine for url with the configured profile.
+
+    In the tuned profile, SQLite files run in WAL mode (readers and the writer do
+    not block each other, commits do not wait for an fsync) and writers wait up to
+    SQLITE_BUSY_TIMEOUT_MS for the lock instead of failing with "database is
+    locked". A read_only engine refuses writes (PRAGMA query_only).
+    """
+    engine_name = "read" if read_only else "write"
+    if make_url(url).get_backend_name() != "sqlite":
+        if DATABASE_PROFILE == "default":
+            return create_engine(url)
+        return create_engine(url, pool_pre_ping=True, **_pool_options(QueuePool, engine_name))
+    connect_args = {"check_same_thread": False}
+    if DATABASE_PROFILE == "default" or not is_sqlite_file(url):
+        # In-memory databases use one connection per thread: no pool or journal to tune
+        return create_engine(url, connect_args=connect_args)
+
+    engine = create_engine(url, connect_args=connect_args, **_pool_options(QueuePool, engine_name))
+    _set_pragmas_on_connect(engine, read_only)
+    return engine
+
+
+def async_url(url: str) -> str:
+    """url with the async driver of its backend (sqlite+aiosqlite, postgresql+asyncpg)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for {backend} databases")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str, read_only: bool = False):
+    """
+    AsyncEngine for url with the same profile as create_db_engine (pragmas, pool sizing).
+
+    SQLAlchemy gives aiosqlite file databases no pool by default (a connection, and
+    its thread, per session); the tuned profile pools them like the sync engine. The
+    SQLite write engine keeps a single connection: an async transaction holds the
+    write lock across event loop turns, so writers wait their turn for the pool (in
+    order, on the loop) rather than in SQLite's busy handler, where they would
+    time out with "database is locked".
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    engine_name = "async_read" if read_only else "async_write"
+    options = {}
+    if DATABASE_PROFILE == "tuned":
+        if make_url(url).get_backend_name() != "sqlite":
+            options = {"pool_pre_ping": True, **_pool_options(AsyncAdaptedQueuePool, engine_name)}
+        elif is_sqlite_file(url):
+            options = _pool_options(AsyncAdaptedQueuePool, engine_name)
+            if not read_only:
+                options.update(pool_size=1, max_overflow=0)
+    try:
+        engine = create_async_engine(async_url(url), **options)
+    except ImportError as e:
+        raise RuntimeError(f"DATABASE_ASYNC needs the {ASYNC_DRIVERS[make_url(url).get_backend_name()]} package: {e}")
+    if DATABASE_PROFILE == "tuned" and is_sqlite_file(url):
+        _set_pragmas_on_connect(engine.sync_engine, read_only)
+    return engine
+
+
+engine = create_db_engine(DATABASE_URL)
+
+# GET routes read through read_engine: a separate pool, so that long reads (exports,
+# large pages) never hold the connections writes need
+if DATABASE_READ_ENGINE and DATABASE_PROFILE == "tuned" and is_sqlite_file(DATABASE_URL):
+    read_engine = create_db_engine(DATABASE_URL, read_only=True)
+else:
+    read_engine = engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
+# Async engines, with the same split, only created when the async routes are enabled.
+# Objects stay loaded after commit: an expired attribute cannot be lazy-loaded from async code
+async_engine = async_read_engine = AsyncSessionLocal = AsyncReadSessionLocal = None
+if DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = create_async_db_engine(DATABASE_URL)
+    if read_engine is not engine:
+        async_read_engine = create_async_db_engine(DATABASE_URL, read_only=True)
+    else:
+        async_read_engine = async_engine
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db():
     """Dependency to get database session"""
@@ -23,6 +188,59 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """Dependency to get a read-only database session (GET routes)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """Dependency to get an async database session (DATABASE_ASYNC routes)"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Dependency to get a read-only async database session (DATABASE_ASYNC GET routes)"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+def insert_returning(db: Session, statement):
+    """
+    Run an INSERT ... RETURNING of an entity and return the new object, or None if no
+    row was inserted (an INSERT ... SELECT whose conditions failed).
+
+    The object is filled from the returned row and detached from the session, so the
+    commit does not expire it and reading it afterwards needs no reload query.
+    """
+    instance = db.scalars(statement).first()
+    if instance is not None:
+        db.expunge(instance)
+    return instance
+
+
+async def insert_returning_async(db, statement):
+    """insert_returning for an AsyncSession"""
+    instance = (await db.scalars(statement)).first()
+    if instance is not None:
+        db.expunge(instance)
+    return instance
+
+
+async def dispose_async_engines():
+    """Close the pooled async connections (their driver threads) at shutdown"""
+    for async_db_engine in {async_engine, async_read_engine} - {None}:
+        await async_db_engine.dispose()
+
+
 def init_db():
-    """Initialize database tables"""
+    """Initialize database tables and apply pending schema migrations"""
+    from app.migrations import run_migrations
+    from app.models import models  # noqa: F401  (registers the tables on Base.metadata)
+
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
@@ -0,0 +1,155 @@
+"""
+In-process publish/subscribe bus for fleet change events.
+
+The service layer publishes a compact event after each committed change (car
+created or updated, rental created or returned, prices updated...). Events get
+a sequential ID and are kept in a ring buffer so that a client reconnecting
+with the last ID it saw (SSE Last-Event-ID) gets what it missed. Subscribers
+are asyncio queues of the /api/events streams: publish() may be called from
+any thread (sync endpoints run in a thread pool) and hands each event to the
+subscribers' event loops.
+
+The bus lives in the process: with several worker processes, a client only
+sees the changes made through the worker it is connected to.
+"""
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime
+import asyncio
+import enum
+import json
+import os
+import threading
+import uuid
+
+# Events kept for replay after a reconnect
+EVENT_BUFFER_SIZE = int(os.getenv("EVENT_BUFFER_SIZE", "10000"))
+
+# Events queued for one subscriber before it is considered too slow and disconnected
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+@dataclass(frozen=True)
+class Event:
+    """A published change, with its SSE message encoded once for every subscriber"""
+    seq: int
+    id: str
+    type: str
+    data: dict
+    message: str
+
+
+class EventBus:
+    """Sequenced change events with a replay buffer and asyncio subscribers"""
+
+    def __init__(self, buffer_size: int = EVENT_BUFFER_SIZE):
+        # Event IDs are "<boot>-<seq>": an ID from before a restart is recognized as unknown
+        self.boot = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._buffer = deque(maxlen=buffer_size)
+        self._subscribers = {}
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def publish(self, type: str, data: dict) -> Event:
+        """
+        Record an event and hand it to every subscriber.
+
+        The hand-off is scheduled under the lock, like the sequence number: events
+        published from several threads reach each subscriber's loop in ID order, so a
+        client resuming from the last ID it received never skips one.
+        """
+        payload = json.dumps({"type": type, "data": data}, default=_plain, separators=(",", ":"))
+        with self._lock:
+            self._seq += 1
+            event_id = f"{self.boot}-{self._seq}"
+            event = Event(self._seq, event_id, type, data, f"id: {event_id}\ndata: {payload}\n\n")
+            self._buffer.append(event)
+            self.published += 1
+            for queue, loop in list(self._subscribers.items()):
+                try:
+                    loop.call_soon_threadsafe(self._deliver, queue, event)
+                except RuntimeError:
+                    # The subscriber's event loop is closed
+                    del self._subscribers[queue]
+        return event
+
+    def _deliver(self, queue: asyncio.Queue, event: Event):
+        """Runs in the subscriber's loop: queue the event, or end a stream that fell too far behind"""
+        if queue not in self._subscribers:
+            return
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.unsubscribe(queue)
+            self.dropped_subscribers += 1
+            # End the stream right away; the client reconnects with the last ID it got and
+            # replays the rest from the buffer
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue receiving every event published from now on (call from the event loop)"""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def since(self, last_event_id: str):
+        """
+        Buffered events published after last_event_id, oldest first.
+
+        Returns None when the ID is unknown (another server run, or older than the
+        buffer): the client missed events that cannot be replayed and must reload.
+        """
+        boot, _, seq = (last_event_id or "").partition("-")
+        if boot != self.boot or not seq.isdigit():
+            return None
+        seq = int(seq)
+        with self._lock:
+            events = list(self._buffer)
+            current = self._seq
+        if seq > current:
+            return None
+        if seq == current:
+            return []
+        if not events or events[0].seq > seq + 1:
+            return None
+        return events[seq - events[0].seq + 1:]
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the last published event"""
+        return self._seq
+
+    @property
+    def last_event_id(self) -> str:
+        return f"{self.boot}-{self._seq}"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "last_event_id": self.last_event_id,
+                "published": self.published,
+                "buffered": len(self._buffer),
+                "buffer_size": self._buffer.maxlen,
+                "subscribers": len(self._subscribers),
+                "dropped_subscribers": self.dropped_subscribers,
+            }
+
+
+event_bus = EventBus()
@@ -0,0 +1,94 @@
+"""File responses with validators (ETag, Last-Modified), 304 Not Modified and byte ranges"""
+from email.utils import formatdate, parsedate_to_datetime
+import os
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+from app.response_cache import etag_matches
+
+# For URLs whose content never changes (content-addressed file names)
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _byte_range(request: Request, etag: str, last_modified: str, size: int):
+    """
+    (start, end) of the single byte range requested, end inclusive.
+
+    None means the whole file: no Range header, a syntax we do not handle (several
+    ranges), or an If-Range validator that no longer matches. Raises ValueError
+    for a range that starts past the end of the file.
+    """
+    header = request.headers.get("range")
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range and if_range != etag and if_range != last_modified:
+        return None
+
+    first, sep, last = header[len("bytes="):].strip().partition("-")
+    if not sep or not (first or last) or (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    end = min(int(last), size - 1) if last else size - 1
+    # A last position before the first makes the header invalid, so it is ignored
+    return (start, end) if end >= start else None
+
+
+def serve_file(request: Request, path: str, media_type: str, etag: str,
+               cache_control: str, headers: dict = None) -> Response:
+    """
+    Serve a file with its validators and caching policy.
+
+    Answers 304 when the client's copy is current (If-None-Match, else
+    If-Modified-Since), 206 with the requested bytes for a single Range, and 416
+    for a range past the end. Raises FileNotFoundError if the file is missing.
+    """
+    stat = os.stat(path)
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        **(headers or {}),
+    }
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        byte_range = _byte_range(request, etag, last_modified, stat.st_size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.st_size}"})
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+
+    start, end = byte_range
+    # Images are a few MB at most: the requested slice is read at once
+    with open(path, "rb") as f:
+        f.seek(start)
+        content = f.read(end - start + 1)
+    return Response(
+        content=content, status_code=206, media_type=media_type,
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{stat.st_size}"},
+    )
@@ -1,9 +1,17 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from app.startup import startup_report
+
+with startup_report.measure("import fastapi"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
 import logging
+import os
+import threading
 
-from app.database import init_db
-from app.routers import cars, customers, rentals, stats, ml, images
+with startup_report.measure("import app.database"):
+    from app.database import DATABASE_ASYNC, dispose_async_engines, init_db
+from app import metrics
+from app.middleware import BodySizeLimitMiddleware, MetricsMiddleware
+from app.services.image_service import IMAGE_MAX_BYTES
 
 # Logging configuration
 logging.basicConfig(
@@ -12,6 +20,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Load the ML model in a background thread at startup instead of on the first prediction
+ML_WARMUP = os.getenv("ML_WARMUP", "true").lower() in ("1", "true", "yes")
+
+# Build the autocomplete index in a background thread at startup (otherwise /api/autocomplete answers 503)
+AUTOCOMPLETE_ENABLED = os.getenv("AUTOCOMPLETE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Router modules, imported in this order
+ROUTER_MODULES = ["cars", "customers", "rentals", "reservations", "imports", "exports", "autocomplete", "events", "stats", "ml", "images"]
+if metrics.METRICS_ENABLED:
+    ROUTER_MODULES.append("metrics")
+
+# With DATABASE_ASYNC, these routes are served by async def handlers over an AsyncSession
+ASYNC_ROUTER_MODULES = {"cars": "cars_async", "customers": "customers_async", "rentals": "rentals_async"}
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Car Rental Management System API",
@@ -22,6 +44,10 @@ app = FastAPI(
     openapi_url="/api/openapi.json"
 )
 
+# Image uploads: refuse bodies over the image size limit (plus room for the multipart
+# headers) before they are read. Added first so that CORS headers still wrap the 413
+app.add_middleware(BodySizeLimitMiddleware, limits={"/api/images/": IMAGE_MAX_BYTES + 64 * 1024})
+
 # CORS Middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -31,13 +57,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts and latencies for /metrics. Added last (outermost) so that it also
+# counts the responses of the middleware above (413, CORS preflights)
+if metrics.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
-app.include_router(cars.router)
-app.include_router(customers.router)
-app.include_router(rentals.router)
-app.include_router(stats.router)
-app.include_router(ml.router)
-app.include_router(images.router)
+for module_name in ROUTER_MODULES:
+    if DATABASE_ASYNC:
+        module_name = ASYNC_ROUTER_MODULES.get(module_name, module_name)
+    app.include_router(startup_report.import_module(f"app.routers.{module_name}").router)
 
 # Root endpoint
 @app.get("/")
@@ -50,26 +79,61 @@ def read_root():
         "health": "/api/health"
     }
 
-# Health check endpoint
-@app.get("/api/health")
-def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "message": "Application is running"
-    }
+# Startup timing report
+@app.get("/api/health/startup")
+def startup_timings():
+    """Import and initialization time of each startup phase"""
+    return startup_report.to_dict()
+
+
+def _warm_up_ml():
+    """Load the ML model off the request path"""
+    from app.services import ml_service
+    try:
+        with startup_report.measure("ml warm-up"):
+            ml_service.warm_up()
+    except Exception as e:
+        logger.error(f"ML warm-up failed: {e}")
+
+def _load_autocomplete():
+    """Build the in-memory autocomplete index off the request path"""
+    from app.database import SessionLocal
+    from app.services.autocomplete import autocomplete_index
+
+    db = SessionLocal()
+    try:
+        with startup_report.measure("autocomplete load"):
+            autocomplete_index.load(db)
+    except Exception as e:
+        logger.error(f"Autocomplete load failed: {e}")
+    finally:
+        db.close()
 
 # Initialize database on startup
 @app.on_event("startup")
 def startup_event():
     """Initialize database on startup"""
-    init_db()
+    with startup_report.measure("init_db"):
+        init_db()
     logger.info("Database initialized")
 
+    if ML_WARMUP:
+        threading.Thread(target=_warm_up_ml, name="ml-warmup", daemon=True).start()
+    if AUTOCOMPLETE_ENABLED:
+        threading.Thread(target=_load_autocomplete, name="autocomplete-load", daemon=True).start()
+    if metrics.METRICS_ENABLED:
+        metrics.start_flusher()
+
+    startup_report.mark_ready()
+    logger.info(f"Application ready in {startup_report.ready_ms} ms")
+
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Application shutting down")
+    if metrics.METRICS_ENABLED:
+        metrics.stop_flusher()
+    await dispose_async_engines()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,340 @@
+"""
+Prometheus metrics: counters, gauges and histograms served by /metrics.
+
+Recording takes no lock: each thread adds to its own shard (a dict that only
+that thread writes), and a scrape sums the shards. Sync endpoints run on up to
+40 pool threads and async ones on the event loop thread, so there are never
+more than a few dozen shards.
+
+Each uvicorn worker process has its own metrics. With METRICS_DIR set, every
+worker writes a snapshot of them to METRICS_DIR/metrics-<pid>.json every
+METRICS_FLUSH_SECONDS, and the worker answering /metrics adds up its own live
+values and the other workers' snapshots: counters and histograms from every
+snapshot (those of a worker that exited keep counting), gauges only from
+snapshots written recently. Empty METRICS_DIR before starting the server, as
+its files outlive the processes.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+import glob
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Request middleware and /metrics endpoint
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Shared directory of the per-worker snapshots (unset: a single worker, nothing written)
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+
+# Seconds between two snapshots of a worker
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# Text exposition format (the response adds charset=utf-8)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Request latency, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Wait for a pooled connection, in seconds (most are immediate)
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class Registry:
+    """Metrics of the process and the per-thread shards holding their values"""
+
+    def __init__(self):
+        self.metrics = {}
+        self._shards = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def shard(self) -> dict:
+        """The calling thread's shard: {(name, label values): value}"""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def snapshot(self) -> dict:
+        """Values of the process, summed over the threads' shards"""
+        with self._lock:
+            shards = list(self._shards)
+        totals = {}
+        for shard in shards:
+            # dict.copy() runs under the GIL: safe while the owning thread keeps writing
+            for key, value in shard.copy().items():
+                totals[key] = _add(totals.get(key), value)
+        return totals
+
+    def write_snapshot(self, directory: str = None):
+        """Write the process snapshot for the other workers (atomically replaced)"""
+        directory = directory or METRICS_DIR
+        path = os.path.join(directory, f"metrics-{os.getpid()}.json")
+        samples = [[name, list(labels), value] for (name, labels), value in self.snapshot().items()]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"pid": os.getpid(), "samples": samples}, f)
+        os.replace(tmp_path, path)
+
+    def collect(self, directory: str = None) -> dict:
+        """
+        Values to expose: this process, plus the other workers' snapshots when
+        directory (default METRICS_DIR) is set
+        """
+        totals = self.snapshot()
+        directory = directory if directory is not None else METRICS_DIR
+        if not directory:
+            return totals
+
+        own_file = f"metrics-{os.getpid()}.json"
+        fresh_after = time.time() - 3 * METRICS_FLUSH_SECONDS
+        for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+            if os.path.basename(path) == own_file:
+                continue
+            try:
+                fresh = os.path.getmtime(path) >= fresh_after
+                with open(path) as f:
+                    samples = json.load(f)["samples"]
+            except (OSError, ValueError, KeyError):
+                continue  # replaced or removed while reading
+            for name, labels, value in samples:
+                metric = self.metrics.get(name)
+                if metric is None or (metric.kind == "gauge" and not fresh):
+                    continue
+                key = (name, tuple(labels))
+                totals[key] = _add(totals.get(key), value)
+        return totals
+
+    def render(self, values: dict = None, directory: str = None) -> str:
+        """
+        Text exposition format. values ({gauge: {label values: value}}) sets gauges
+        measured by the caller at scrape time instead of recorded by the workers
+        """
+        totals = self.collect(directory)
+        for metric, samples in (values or {}).items():
+            for labels, value in samples.items():
+                totals[(metric.name, tuple(labels))] = value
+
+        by_metric = {}
+        for (name, labels), value in totals.items():
+            by_metric.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            samples = sorted(by_metric.get(name, []))
+            if not samples and not metric.labelnames and metric.kind != "histogram":
+                samples = [((), 0)]
+            for labels, value in samples:
+                lines.extend(metric.exposition(labels, value))
+        return "\n".join(lines) + "\n"
+
+
+def _add(total, value):
+    """Sum of two sample values: numbers, or histogram bucket lists"""
+    if total is None:
+        return list(value) if isinstance(value, list) else value
+    if isinstance(value, list):
+        return [a + b for a, b in zip(total, value)]
+    return total + value
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: tuple, labels: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), registry: Registry = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+    def _key(self, labels: tuple) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {labels}")
+        return self.name, labels
+
+    def exposition(self, labels: tuple, value) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """Monotonic total"""
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        shard = self.registry.shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (summed over the threads and live workers)"""
+    kind = "gauge"
+
+    def inc(self, *labels, amount: float = 1):
+        shard = self.registry.shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in fixed buckets. A sample is a list: the
+    count of each bucket (not cumulative, the last one is +Inf), then the sum
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS,
+                 registry: Registry = None):
+        super().__init__(name, help, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        shard = self.registry.shard()
+        key = self._key(labels)
+        counts = shard.get(key)
+        if counts is None:
+            counts = shard[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        """Observe the duration of a block, in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def exposition(self, labels: tuple, value) -> list:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), value[:-1]):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"' if bound == math.inf else f'le="{bound!r}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+        label_text = _format_labels(self.labelnames, labels)
+        lines.append(f"{self.name}_sum{label_text} {_format_value(value[-1])}")
+        lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requests handled, by method, route and status", ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to handle a request, by method and route", ("method", "route")
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being handled")
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds", "Time to get a pooled database connection (one sample per checkout), by engine",
+    ("engine",), buckets=WAIT_BUCKETS
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after DATABASE_POOL_TIMEOUT, by engine", ("engine",)
+)
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections in use, by engine", ("engine",))
+ML_INFERENCE_SECONDS = Histogram(
+    "ml_inference_seconds", "Price model prediction time, single car or batch", ("kind",)
+)
+FLEET_CARS = Gauge("fleet_cars", "Cars in the fleet, by state (at scrape time)", ("state",))
+RENTALS_ACTIVE = Gauge("rentals_active", "Rentals not returned yet (at scrape time)")
+
+
+def timed_pool_class(pool_class, engine_name: str):
+    """
+    Subclass of a SQLAlchemy QueuePool class that times each checkout (waiting
+    for a free connection, or opening one) and counts the connections in use
+    """
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+    class TimedPool(pool_class):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                DB_POOL_TIMEOUTS.inc(engine_name)
+                raise
+            finally:
+                DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - start, engine_name)
+            DB_POOL_CHECKED_OUT.inc(engine_name)
+            return connection
+
+        def _do_return_conn(self, record):
+            DB_POOL_CHECKED_OUT.dec(engine_name)
+            super()._do_return_conn(record)
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{pool_class.__name__}"
+    return TimedPool
+
+
+def _flush_loop(stop: threading.Event):
+    while not stop.wait(METRICS_FLUSH_SECONDS):
+        try:
+            REGISTRY.write_snapshot()
+        except OSError as e:
+            logger.error(f"Metrics snapshot failed: {e}")
+
+
+_flusher_stop = threading.Event()
+
+
+def start_flusher():
+    """Write this worker's snapshot to METRICS_DIR periodically (no-op without METRICS_DIR)"""
+    if not METRICS_DIR:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    REGISTRY.write_snapshot()
+    threading.Thread(target=_flush_loop, args=(_flusher_stop,), name="metrics-flush", daemon=True).start()
+
+
+def stop_flusher():
+    """Stop the periodic snapshots and write a last one"""
+    if not METRICS_DIR:
+        return
+    _flusher_stop.set()
+    try:
+        REGISTRY.write_snapshot()
+    except OSError as e:
+        logger.error(f"Metrics snapshot failed: {e}")
@@ -0,0 +1,136 @@
+"""ASGI middleware"""
+import json
+import time
+
+from starlette.exceptions import HTTPException
+
+from app.metrics import HTTP_REQUESTS, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT
+
+
+class RequestBodyTooLarge(HTTPException):
+    def __init__(self, max_size: int):
+        super().__init__(status_code=413, detail=f"Request body too large (max {max_size} bytes)")
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies over a size limit before they are read into the app.
+
+    limits maps a path prefix to the largest body accepted under it. A request
+    whose Content-Length is over the limit gets 413 right away, without reading
+    the body. A body sent without a length (chunked) is counted as it arrives and
+    the request fails with 413 as soon as the limit is crossed, so an oversized
+    upload is never spooled to disk in full.
+
+    Pure ASGI (not BaseHTTPMiddleware) so the body keeps streaming chunk by chunk.
+    """
+
+    def __init__(self, app, limits: dict):
+        self.app = app
+        # Longest prefix first, so the most specific limit applies
+        self.limits = sorted(limits.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _limit(self, path: str):
+        for prefix, max_size in self.limits:
+            if path.startswith(prefix):
+                return max_size
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        max_size = self._limit(scope["path"])
+        if max_size is None:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if not value.isdigit() or int(value) > max_size:
+                    await self._reject(send, max_size)
+                    return
+                break
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_size:
+                    # FastAPI passes HTTPExceptions raised while reading the body through unchanged
+                    raise RequestBodyTooLarge(max_size)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestBodyTooLarge:
+            # The body was read outside a route (no exception handler in between)
+            if response_started:
+                raise
+            await self._reject(send, max_size)
+
+    @staticmethod
+    async def _reject(send, max_size: int):
+        body = json.dumps({"detail": RequestBodyTooLarge(max_size).detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class MetricsMiddleware:
+    """
+    Count and time every HTTP request for /metrics.
+
+    Requests are labelled with the path template of the route that handled them
+    (/api/cars/{car_id}, not the car's URL), read from the scope once routing has
+    run, so the number of series stays bounded; requests no route matched are
+    labelled "unmatched". The duration runs until the response is fully sent. A
+    request that fails with an exception counts as a 500.
+
+    Pure ASGI (not BaseHTTPMiddleware) so responses keep streaming.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def recording_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            HTTP_REQUESTS.inc(scope["method"], route_path, str(status))
+            HTTP_REQUEST_SECONDS.observe(elapsed, scope["method"], route_path)
@@ -0,0 +1,212 @@
+"""
+Schema migrations applied on top of create_all.
+
+create_all only creates missing tables; it never adds indexes or columns to a
+table that already exists. Each migration below is applied once per database
+and recorded in the schema_migrations table. Steps are SQL strings or
+callables taking a connection, and must be idempotent so that a database
+created from the current models (which already has the objects) is fine.
+"""
+from datetime import datetime
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+logger = logging.getLogger(__name__)
+
+
+def customer_id_key_sql(column: str) -> str:
+    """SQL for the search key of a customer ID: the ID without separators (CL-00042 -> CL00042)"""
+    for separator in ("-", "/", ".", "_", " "):
+        column = f"replace({column}, '{separator}', '')"
+    return column
+
+
+def customer_id_tokens_sql(column: str) -> str:
+    """
+    SQL for the indexed text of a customer ID: its search key, then its number without
+    the leading letters and zeros, so that an ID is also found by its number
+    (CL-00042 -> 'CL00042 42')
+    """
+    key = customer_id_key_sql(column)
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+    return f"{key} || ' ' || ltrim(ltrim({key}, '{letters}'), '0')"
+
+
+# (Re)fill customers_fts from the customers table
+CUSTOMERS_FTS_FILL = (
+    "INSERT INTO customers_fts (rowid, id_loc, nom, prenom) "
+    f"SELECT id, {customer_id_tokens_sql('id_loc')}, nom, prenom FROM customers"
+)
+
+
+def _create_customers_fts(conn):
+    """
+    FTS5 index over customer ID and names (SQLite only), kept in sync by triggers.
+
+    Contentless table: the index only stores tokens, the text stays in customers.
+    unicode61 with remove_diacritics folds case and accents (Hélène = helene), the
+    prefix indexes make 'du*'-style typeahead queries index lookups, and IDs are
+    indexed without separators so that 'CL-0004' is one prefix, not 'CL' AND '0004'
+    (followed by their number, see customer_id_tokens_sql).
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    if not conn.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar():
+        logger.warning("SQLite was built without FTS5: customer search falls back to LIKE scans")
+        return
+
+    def values(row: str) -> str:
+        return f"{row}.id, {customer_id_tokens_sql(f'{row}.id_loc')}, {row}.nom, {row}.prenom"
+
+    conn.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5("
+        "id_loc, nom, prenom, content='', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS customers_fts_insert AFTER INSERT ON customers BEGIN "
+        f"INSERT INTO customers_fts (rowid, id_loc, nom, prenom) VALUES ({values('new')}); "
+        "END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS customers_fts_delete AFTER DELETE ON customers BEGIN "
+        f"INSERT INTO customers_fts (customers_fts, rowid, id_loc, nom, prenom) VALUES ('delete', {values('old')}); "
+        "END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS customers_fts_update AFTER UPDATE OF id_loc, nom, prenom ON customers BEGIN "
+        f"INSERT INTO customers_fts (customers_fts, rowid, id_loc, nom, prenom) VALUES ('delete', {values('old')}); "
+        f"INSERT INTO customers_fts (rowid, id_loc, nom, prenom) VALUES ({values('new')}); "
+        "END"
+    ))
+    # Index the customers that existed before the table
+    conn.execute(text(CUSTOMERS_FTS_FILL))
+
+
+def _rebuild_customers_fts(conn):
+    """Recreate customers_fts and its triggers with the current indexed text (SQLite only)"""
+    if conn.dialect.name != "sqlite":
+        return
+    for trigger in ("customers_fts_insert", "customers_fts_delete", "customers_fts_update"):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    conn.execute(text("DROP TABLE IF EXISTS customers_fts"))
+    _create_customers_fts(conn)
+
+
+def _create_table_versions(conn):
+    """One version counter row per cached table (the table itself is created by create_all)"""
+    for table in ("cars", "customers", "rentals", "reservations"):
+        conn.execute(
+            text(
+                "INSERT INTO table_versions (table_name, version) SELECT :table, 0 "
+                "WHERE NOT EXISTS (SELECT 1 FROM table_versions WHERE table_name = :table)"
+            ),
+            {"table": table}
+        )
+
+
+def _add_rental_checkout_columns(conn):
+    """Price and mileage of the car at checkout (NULL for the rentals created before)"""
+    columns = {column["name"] for column in inspect(conn).get_columns("rentals")}
+    if "prix_location" not in columns:
+        conn.execute(text("ALTER TABLE rentals ADD COLUMN prix_location FLOAT"))
+    if "kilometrage" not in columns:
+        conn.execute(text("ALTER TABLE rentals ADD COLUMN kilometrage INTEGER"))
+
+
+MIGRATIONS = [
+    (1, "Indexes for rental lookups and the alphabetical customer listing", [
+        "CREATE INDEX IF NOT EXISTS ix_rentals_car_id ON rentals (car_id)",
+        "CREATE INDEX IF NOT EXISTS ix_rentals_customer_id ON rentals (customer_id)",
+        "CREATE INDEX IF NOT EXISTS ix_rentals_active ON rentals (car_id) WHERE date_retour IS NULL",
+        "CREATE INDEX IF NOT EXISTS ix_customers_nom_prenom_id ON customers (nom, prenom, id)",
+    ]),
+    (2, "Full-text search index over customers (SQLite FTS5)", [_create_customers_fts]),
+    (3, "Per-table version counters (response cache invalidation)", [_create_table_versions]),
+    (4, "Active rentals index keyed on (car_id, date_retour), preferred over ix_rentals_car_id", [
+        "DROP INDEX IF EXISTS ix_rentals_active",
+        "CREATE INDEX ix_rentals_active ON rentals (car_id, date_retour) WHERE date_retour IS NULL",
+    ]),
+    (5, "Car price and mileage recorded on each rental at checkout", [_add_rental_checkout_columns]),
+    (6, "Customer IDs also indexed by their number for search (CL-00042 found by 42)", [_rebuild_customers_fts]),
+]
+
+
+def _ensure_migrations_table(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, description VARCHAR NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+
+
+def get_applied_versions(engine) -> set:
+    """Versions already applied to the database"""
+    _ensure_migrations_table(engine)
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(engine) -> list:
+    """Apply pending migrations in order; returns the versions applied by this call"""
+    applied = get_applied_versions(engine)
+    newly_applied = []
+    for version, description, steps in MIGRATIONS:
+        if version in applied:
+            continue
+        try:
+            with engine.begin() as conn:
+                for step in steps:
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(text(step))
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+                    {"v": version, "d": description, "t": datetime.utcnow()}
+                )
+        except (IntegrityError, OperationalError):
+            # Another worker applied it concurrently
+            if version not in get_applied_versions(engine):
+                raise
+            continue
+        logger.info(f"Applied migration {version}: {description}")
+        newly_applied.append(version)
+    return newly_applied
+
+
+# Hot queries and the index each one must use (checked with EXPLAIN QUERY PLAN on SQLite)
+HOT_QUERIES = [
+    ("rental history of a customer", "SELECT * FROM rentals WHERE customer_id = 1", "ix_rentals_customer_id"),
+    ("rental history of a car", "SELECT * FROM rentals WHERE car_id = 1", "ix_rentals_car_id"),
+    ("active rentals", "SELECT * FROM rentals WHERE date_retour IS NULL", "ix_rentals_active"),
+    ("count active rentals", "SELECT count(*) FROM rentals WHERE date_retour IS NULL", "ix_rentals_active"),
+    ("active rental of a car", "SELECT * FROM rentals WHERE car_id = 1 AND date_retour IS NULL",
+     "ix_rentals_active"),
+    ("reservations overlapping a window for a car",
+     "SELECT 1 FROM reservations WHERE car_id = 1 AND date_fin > '2024-01-01' AND date_debut < '2024-02-01'",
+     "ix_reservations_car_period"),
+    ("customers keyset page",
+     "SELECT * FROM customers WHERE (nom, prenom, id) > ('a', 'b', 1) ORDER BY nom, prenom, id LIMIT 100",
+     "ix_customers_nom_prenom_id"),
+]
+
+
+def check_query_plans(engine) -> list:
+    """Run EXPLAIN QUERY PLAN on the hot queries; returns one result dict per query"""
+    if engine.dialect.name != "sqlite":
+        raise RuntimeError("Query plan checks are only implemented for SQLite")
+
+    results = []
+    with engine.connect() as conn:
+        for name, sql, index in HOT_QUERIES:
+            plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+            results.append({
+                "query": name,
+                "expected_index": index,
+                "plan": plan,
+                "ok": any(index in step for step in plan),
+            })
+    return results
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum as SQLEnum, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum as SQLEnum, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -26,6 +26,7 @@ class Car(Base):
 
     # Relationships
     rentals = relationship("Rental", back_populates="car")
+    reservations = relationship("Reservation", back_populates="car", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Car {self.num_imma} - {self.marque} {self.modele}>"
@@ -34,6 +35,10 @@ class Car(Base):
 class Customer(Base):
     """Customer model"""
     __tablename__ = "customers"
+    __table_args__ = (
+        # Sort key of the alphabetical listing (keyset pagination)
+        Index("ix_customers_nom_prenom_id", "nom", "prenom", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     id_loc = Column(String, unique=True, index=True, nullable=False)  # Customer ID
@@ -43,6 +48,7 @@ class Customer(Base):
 
     # Relationships
     rentals = relationship("Rental", back_populates="customer")
+    reservations = relationship("Reservation", back_populates="customer", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Customer {self.id_loc} - {self.prenom} {self.nom}>"
@@ -51,13 +57,25 @@ class Customer(Base):
 class Rental(Base):
     """Rental model"""
     __tablename__ = "rentals"
+    __table_args__ = (
+        # Active rentals (not returned yet), optionally per car. date_retour is in the key so
+        # that "car_id = ? AND date_retour IS NULL" matches two columns here and one in
+        # ix_rentals_car_id: SQLite then always picks this index, whatever the creation order
+        Index(
+            "ix_rentals_active", "car_id", "date_retour",
+            sqlite_where=text("date_retour IS NULL"),
+            postgresql_where=text("date_retour IS NULL")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    car_id = Column(Integer, ForeignKey("cars.id"), nullable=False)
-    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
+    car_id = Column(Integer, ForeignKey("cars.id"), nullable=False, index=True)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, index=True)
     date_debut = Column(DateTime, default=datetime.utcnow)  # Start date
     date_fin = Column(DateTime, nullable=True)  # End date (null if not returned)
     date_retour = Column(DateTime, nullable=True)  # Return date
+    prix_location = Column(Float, nullable=True)  # Car's rental price at checkout
+    kilometrage = Column(Integer, nullable=True)  # Car's mileage at checkout
 
     # Relationships
     car = relationship("Car", back_populates="rentals")
@@ -65,3 +83,53 @@ class Rental(Base):
 
     def __repr__(self):
         return f"<Rental Car:{self.car_id} - Customer:{self.customer_id}>"
+
+
+class Reservation(Base):
+    """Planned booking of a car over [date_debut, date_fin)"""
+    __tablename__ = "reservations"
+    __table_args__ = (
+        # Per-car interval index. The reservations of a car never overlap, so ordered by
+        # end date they are also ordered by start date: the first one ending after a
+        # window starts is the only one that can overlap it.
+        Index("ix_reservations_car_period", "car_id", "date_fin", "date_debut"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    car_id = Column(Integer, ForeignKey("cars.id"), nullable=False)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, index=True)
+    date_debut = Column(DateTime, nullable=False)  # Planned start
+    date_fin = Column(DateTime, nullable=False)  # Planned end (exclusive)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    car = relationship("Car", back_populates="reservations")
+    customer = relationship("Customer", back_populates="reservations")
+
+    def __repr__(self):
+        return f"<Reservation Car:{self.car_id} {self.date_debut:%Y-%m-%d} - {self.date_fin:%Y-%m-%d}>"
+
+
+class TableVersion(Base):
+    """Change counter of a table, bumped by the service layer on every write"""
+    __tablename__ = "table_versions"
+
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TableVersion {self.table_name} v{self.version}>"
+
+
+class FleetStats(Base):
+    """Fleet counters maintained by the service layer (single row)"""
+    __tablename__ = "fleet_stats"
+
+    id = Column(Integer, primary_key=True)
+    total_cars = Column(Integer, nullable=False, default=0)
+    available_cars = Column(Integer, nullable=False, default=0)
+    rented_cars = Column(Integer, nullable=False, default=0)
+    total_mileage = Column(Integer, nullable=False, default=0)  # Sum of all car mileages
+
+    def __repr__(self):
+        return f"<FleetStats {self.total_cars} cars>"
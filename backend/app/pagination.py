@@ -0,0 +1,23 @@
+"""Opaque cursors for keyset pagination"""
+import base64
+import json
+
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row of a page"""
+    payload = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: tuple) -> tuple:
+    """Decode a cursor produced by encode_cursor; raises ValueError if it does not match types"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+    if not all(isinstance(value, expected) and not isinstance(value, bool) for value, expected in zip(values, types)):
+        raise ValueError("Invalid cursor")
+    return tuple(values)
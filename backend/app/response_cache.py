@@ -0,0 +1,154 @@
+"""
+Versioned cache of serialized JSON responses for read-heavy GET endpoints.
+
+An entry is keyed on the route path and query string and stores the response
+body with the version counters of the tables it was built from (see
+VersionService). A request first reads those counters (one primary-key query):
+if they have not moved, the cached bytes are returned without running the
+endpoint query or serializing anything. Every response carries a strong ETag
+(a hash of the body, so all worker processes agree on it) and a matching
+If-None-Match gets 304 Not Modified. Entries are evicted least recently used
+first to stay within RESPONSE_CACHE_BYTES.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import os
+import threading
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.services.version_service import VersionService
+
+# Memory budget for cached response bodies (0 disables caching; ETags and 304s still apply)
+RESPONSE_CACHE_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    versions: tuple
+    body: bytes
+    etag: str
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as required for GET)"""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ResponseCache:
+    """LRU of response bodies bounded by their total size, with hit counters"""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get(self, key, versions: tuple):
+        """The entry for key if it was built from these table versions"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.versions == versions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def put(self, key, versions: tuple, body: bytes) -> CachedResponse:
+        entry = CachedResponse(versions, body, _etag(body))
+        if versions is None or len(body) > self.max_bytes:
+            return entry
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous.body)
+            self._entries[key] = entry
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.body)
+                self.evictions += 1
+        return entry
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def _cache_key(request: Request):
+    return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+
+def _cached_response(request: Request, entry: CachedResponse) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, entry.etag):
+        response_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def cached_json(request: Request, db: Session, tables: tuple, adapter: TypeAdapter, build) -> Response:
+    """
+    Serve a GET endpoint from the response cache.
+
+    tables are the tables the response is built from; build() returns the data
+    (ORM objects or dicts) that adapter validates and serializes on a miss. The
+    counters are read before build() runs, so a write committed in between can
+    only make the entry look older than it is, never newer.
+    """
+    versions = VersionService.get(db, tables)
+    key = _cache_key(request)
+    entry = response_cache.get(key, versions) if versions is not None else None
+    if entry is None:
+        body = adapter.dump_json(adapter.validate_python(build(), from_attributes=True))
+        entry = response_cache.put(key, versions, body)
+    return _cached_response(request, entry)
+
+
+async def cached_json_async(request: Request, db: AsyncSession, tables: tuple, adapter: TypeAdapter, build) -> Response:
+    """cached_json for AsyncSession routes: build is a coroutine function"""
+    versions = await db.run_sync(VersionService.get, tables)
+    key = _cache_key(request)
+    entry = response_cache.get(key, versions) if versions is not None else None
+    if entry is None:
+        body = adapter.dump_json(adapter.validate_python(await build(), from_attributes=True))
+        entry = response_cache.put(key, versions, body)
+    return _cached_response(request, entry)
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app.schemas.schemas import AutocompleteResponse
+from app.services.autocomplete import autocomplete_index, AUTOCOMPLETE_TYPES
+
+router = APIRouter(prefix="/api/autocomplete", tags=["autocomplete"])
+
+
+@router.get("/", response_model=AutocompleteResponse)
+def autocomplete(
+    q: str = Query(..., min_length=1),
+    type: Optional[str] = Query(None, description="car or customer (default: both)"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Typeahead suggestions: cars by plate, customers by ID or "nom prenom".
+
+    Matching ignores case, accents and separators (ab123 finds AB-123-CD). Served from
+    an in-memory index, without a database query.
+    """
+    if type is not None and type not in AUTOCOMPLETE_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown type. Values: {', '.join(AUTOCOMPLETE_TYPES)}")
+    if not autocomplete_index.ready:
+        raise HTTPException(status_code=503, detail="Autocomplete index is not loaded")
+
+    types = (type,) if type else AUTOCOMPLETE_TYPES
+    return {"query": q, "items": autocomplete_index.search(q, types, limit)}
+
+
+@router.get("/stats")
+def autocomplete_stats():
+    """Size and load time of the autocomplete index"""
+    return autocomplete_index.stats()
+
+
+@router.post("/reload")
+def reload_autocomplete(db: Session = Depends(get_db)):
+    """
+    Rebuild the autocomplete index from the database.
+
+    Each server process keeps its own index and only sees its own writes: with several
+    worker processes, call this (on each worker) to pick up the others' changes.
+    """
+    autocomplete_index.load(db)
+    return autocomplete_index.stats()
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.schemas import CarCreate, CarResponse, CarUpdate
+from typing import Optional, Union
+from app.database import get_db, get_read_db
+from app.pagination import encode_cursor, decode_cursor
+from app.response_cache import cached_json
+from app.schemas.schemas import CarCreate, CarResponse, CarUpdate, CarPage
 from app.services.car_service import CarService
 
 router = APIRouter(prefix="/api/cars", tags=["cars"])
 
+_CAR_LIST = TypeAdapter(list[CarResponse])
+_CAR_PAGE = TypeAdapter(CarPage)
+
 
 @router.post("/", response_model=CarResponse, status_code=201)
 def create_car(car: CarCreate, db: Session = Depends(get_db)):
@@ -19,7 +26,7 @@ def create_car(car: CarCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{car_id}", response_model=CarResponse)
-def get_car(car_id: int, db: Session = Depends(get_db)):
+def get_car(car_id: int, db: Session = Depends(get_read_db)):
     """Get car by ID"""
     car = CarService.get_car(db, car_id)
     if not car:
@@ -27,10 +34,29 @@ def get_car(car_id: int, db: Session = Depends(get_db)):
     return car
 
 
-@router.get("/", response_model=list[CarResponse])
-def get_all_cars(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
-    """Get all cars"""
-    return CarService.get_all_cars(db, skip, limit)
+@router.get("/", response_model=Union[list[CarResponse], CarPage])
+def get_all_cars(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor pagination: empty for the first page, then next_cursor"),
+    db: Session = Depends(get_read_db)
+):
+    """Get all cars (offset pagination, or keyset pagination when cursor is given). Cached, with ETags"""
+    if cursor is None:
+        return cached_json(request, db, ("cars",), _CAR_LIST, lambda: CarService.get_all_cars(db, skip, limit))
+
+    try:
+        after = decode_cursor(cursor, (int,))[0] if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    def page():
+        cars = CarService.get_cars_after(db, after, limit)
+        next_cursor = encode_cursor(cars[-1].id) if len(cars) == limit else None
+        return {"items": cars, "next_cursor": next_cursor}
+
+    return cached_json(request, db, ("cars",), _CAR_PAGE, page)
 
 
 @router.put("/{car_id}", response_model=CarResponse)
@@ -53,12 +79,12 @@ def delete_car(car_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/search/available", response_model=list[CarResponse])
-def get_available_cars(db: Session = Depends(get_db)):
-    """Get all available cars"""
-    return CarService.get_available_cars(db)
+def get_available_cars(request: Request, db: Session = Depends(get_read_db)):
+    """Get all available cars (cached, with ETags)"""
+    return cached_json(request, db, ("cars",), _CAR_LIST, lambda: CarService.get_available_cars(db))
 
 
 @router.get("/search/rented", response_model=list[CarResponse])
-def get_rented_cars(db: Session = Depends(get_db)):
-    """Get all rented cars"""
-    return CarService.get_rented_cars(db)
+def get_rented_cars(request: Request, db: Session = Depends(get_read_db)):
+    """Get all rented cars (cached, with ETags)"""
+    return cached_json(request, db, ("cars",), _CAR_LIST, lambda: CarService.get_rented_cars(db))
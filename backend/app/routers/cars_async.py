@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Union
+from app.database import get_async_db, get_async_read_db
+from app.pagination import encode_cursor, decode_cursor
+from app.response_cache import cached_json_async
+from app.schemas.schemas import CarCreate, CarResponse, CarUpdate, CarPage
+from app.services.car_service import AsyncCarService
+
+# Same routes as app.routers.cars, served on the event loop (DATABASE_ASYNC=true)
+router = APIRouter(prefix="/api/cars", tags=["cars"])
+
+_CAR_LIST = TypeAdapter(list[CarResponse])
+_CAR_PAGE = TypeAdapter(CarPage)
+
+
+@router.post("/", response_model=CarResponse, status_code=201)
+async def create_car(car: CarCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new car"""
+    # Check if car with same license plate exists
+    existing_car = await AsyncCarService.get_car_by_imma(db, car.num_imma)
+    if existing_car:
+        raise HTTPException(status_code=400, detail="Car with this license plate already exists")
+
+    return await AsyncCarService.create_car(db, car)
+
+
+@router.get("/{car_id}", response_model=CarResponse)
+async def get_car(car_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Get car by ID"""
+    car = await AsyncCarService.get_car(db, car_id)
+    if not car:
+        raise HTTPException(status_code=404, detail="Car not found")
+    return car
+
+
+@router.get("/", response_model=Union[list[CarResponse], CarPage])
+async def get_all_cars(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor pagination: empty for the first page, then next_cursor"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get all cars (offset pagination, or keyset pagination when cursor is given). Cached, with ETags"""
+    if cursor is None:
+        return await cached_json_async(
+            request, db, ("cars",), _CAR_LIST, lambda: AsyncCarService.get_all_cars(db, skip, limit)
+        )
+
+    try:
+        after = decode_cursor(cursor, (int,))[0] if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def page():
+        cars = await AsyncCarService.get_cars_after(db, after, limit)
+        next_cursor = encode_cursor(cars[-1].id) if len(cars) == limit else None
+        return {"items": cars, "next_cursor": next_cursor}
+
+    return await cached_json_async(request, db, ("cars",), _CAR_PAGE, page)
+
+
+@router.put("/{car_id}", response_model=CarResponse)
+async def update_car(car_id: int, car: CarUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Update car details"""
+    db_car = await AsyncCarService.get_car(db, car_id)
+    if not db_car:
+        raise HTTPException(status_code=404, detail="Car not found")
+
+    return await AsyncCarService.update_car(db, car_id, car)
+
+
+@router.delete("/{car_id}", status_code=204)
+async def delete_car(car_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a car"""
+    success = await AsyncCarService.delete_car(db, car_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Car not found")
+    return None
+
+
+@router.get("/search/available", response_model=list[CarResponse])
+async def get_available_cars(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """Get all available cars (cached, with ETags)"""
+    return await cached_json_async(request, db, ("cars",), _CAR_LIST, lambda: AsyncCarService.get_available_cars(db))
+
+
+@router.get("/search/rented", response_model=list[CarResponse])
+async def get_rented_cars(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """Get all rented cars (cached, with ETags)"""
+    return await cached_json_async(request, db, ("cars",), _CAR_LIST, lambda: AsyncCarService.get_rented_cars(db))
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.schemas import CustomerCreate, CustomerResponse, CustomerUpdate
+from typing import Optional, Union
+from app.database import get_db, get_read_db
+from app.pagination import encode_cursor, decode_cursor
+from app.response_cache import cached_json
+from app.schemas.schemas import CustomerCreate, CustomerResponse, CustomerUpdate, CustomerPage
 from app.services.customer_service import CustomerService
 
 router = APIRouter(prefix="/api/customers", tags=["customers"])
 
+_CUSTOMER_LIST = TypeAdapter(list[CustomerResponse])
+_CUSTOMER_PAGE = TypeAdapter(CustomerPage)
+
 
 @router.post("/", response_model=CustomerResponse, status_code=201)
 def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
@@ -19,7 +26,7 @@ def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{customer_id}", response_model=CustomerResponse)
-def get_customer(customer_id: int, db: Session = Depends(get_db)):
+def get_customer(customer_id: int, db: Session = Depends(get_read_db)):
     """Get customer by ID"""
     customer = CustomerService.get_customer(db, customer_id)
     if not customer:
@@ -27,10 +34,37 @@ def get_customer(customer_id: int, db: Session = Depends(get_db)):
     return customer
 
 
-@router.get("/", response_model=list[CustomerResponse])
-def get_all_customers(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
-    """Get all customers sorted alphabetically"""
-    return CustomerService.get_all_customers(db, skip, limit)
+@router.get("/", response_model=Union[list[CustomerResponse], CustomerPage])
+def get_all_customers(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor pagination: empty for the first page, then next_cursor"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get all customers sorted alphabetically (offset, or keyset pagination when cursor is given).
+    Cached, with ETags.
+    """
+    if cursor is None:
+        return cached_json(
+            request, db, ("customers",), _CUSTOMER_LIST, lambda: CustomerService.get_all_customers(db, skip, limit)
+        )
+
+    try:
+        after = decode_cursor(cursor, (str, str, int)) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    def page():
+        customers = CustomerService.get_customers_after(db, after, limit)
+        next_cursor = None
+        if len(customers) == limit:
+            last = customers[-1]
+            next_cursor = encode_cursor(last.nom, last.prenom, last.id)
+        return {"items": customers, "next_cursor": next_cursor}
+
+    return cached_json(request, db, ("customers",), _CUSTOMER_PAGE, page)
 
 
 @router.put("/{customer_id}", response_model=CustomerResponse)
@@ -53,7 +87,7 @@ def delete_customer(customer_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/search/by-id-loc/{id_loc}", response_model=CustomerResponse)
-def get_customer_by_id_loc(id_loc: str, db: Session = Depends(get_db)):
+def get_customer_by_id_loc(id_loc: str, db: Session = Depends(get_read_db)):
     """Search customer by ID"""
     customer = CustomerService.get_customer_by_id_loc(db, id_loc)
     if not customer:
@@ -62,9 +96,13 @@ def get_customer_by_id_loc(id_loc: str, db: Session = Depends(get_db)):
 
 
 @router.get("/search/by-name", response_model=list[CustomerResponse])
-def search_customers(q: str = Query(..., min_length=1), db: Session = Depends(get_db)):
-    """Search customers by name or ID"""
-    customers = CustomerService.search_customers(db, q)
+def search_customers(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_read_db)
+):
+    """Search customers by name or ID (prefix of each word, case and accent insensitive, ranked)"""
+    customers = CustomerService.search_customers(db, q, limit)
     if not customers:
         raise HTTPException(status_code=404, detail="No customers found")
     return customers
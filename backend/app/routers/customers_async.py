@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Union
+from app.database import get_async_db, get_async_read_db
+from app.pagination import encode_cursor, decode_cursor
+from app.response_cache import cached_json_async
+from app.schemas.schemas import CustomerCreate, CustomerResponse, CustomerUpdate, CustomerPage
+from app.services.customer_service import AsyncCustomerService
+
+# Same routes as app.routers.customers, served on the event loop (DATABASE_ASYNC=true)
+router = APIRouter(prefix="/api/customers", tags=["customers"])
+
+_CUSTOMER_LIST = TypeAdapter(list[CustomerResponse])
+_CUSTOMER_PAGE = TypeAdapter(CustomerPage)
+
+
+@router.post("/", response_model=CustomerResponse, status_code=201)
+async def create_customer(customer: CustomerCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new customer"""
+    # Check if customer with same ID already exists
+    existing_customer = await AsyncCustomerService.get_customer_by_id_loc(db, customer.id_loc)
+    if existing_customer:
+        raise HTTPException(status_code=400, detail="Customer with this ID already exists")
+
+    return await AsyncCustomerService.create_customer(db, customer)
+
+
+@router.get("/{customer_id}", response_model=CustomerResponse)
+async def get_customer(customer_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Get customer by ID"""
+    customer = await AsyncCustomerService.get_customer(db, customer_id)
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return customer
+
+
+@router.get("/", response_model=Union[list[CustomerResponse], CustomerPage])
+async def get_all_customers(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor pagination: empty for the first page, then next_cursor"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Get all customers sorted alphabetically (offset, or keyset pagination when cursor is given).
+    Cached, with ETags.
+    """
+    if cursor is None:
+        return await cached_json_async(
+            request, db, ("customers",), _CUSTOMER_LIST,
+            lambda: AsyncCustomerService.get_all_customers(db, skip, limit)
+        )
+
+    try:
+        after = decode_cursor(cursor, (str, str, int)) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def page():
+        customers = await AsyncCustomerService.get_customers_after(db, after, limit)
+        next_cursor = None
+        if len(customers) == limit:
+            last = customers[-1]
+            next_cursor = encode_cursor(last.nom, last.prenom, last.id)
+        return {"items": customers, "next_cursor": next_cursor}
+
+    return await cached_json_async(request, db, ("customers",), _CUSTOMER_PAGE, page)
+
+
+@router.put("/{customer_id}", response_model=CustomerResponse)
+async def update_customer(customer_id: int, customer: CustomerUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Update customer details"""
+    db_customer = await AsyncCustomerService.get_customer(db, customer_id)
+    if not db_customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    return await AsyncCustomerService.update_customer(db, customer_id, customer)
+
+
+@router.delete("/{customer_id}", status_code=204)
+async def delete_customer(customer_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a customer"""
+    success = await AsyncCustomerService.delete_customer(db, customer_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return None
+
+
+@router.get("/search/by-id-loc/{id_loc}", response_model=CustomerResponse)
+async def get_customer_by_id_loc(id_loc: str, db: AsyncSession = Depends(get_async_read_db)):
+    """Search customer by ID"""
+    customer = await AsyncCustomerService.get_customer_by_id_loc(db, id_loc)
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return customer
+
+
+@router.get("/search/by-name", response_model=list[CustomerResponse])
+async def search_customers(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Search customers by name or ID (prefix of each word, case and accent insensitive, ranked)"""
+    customers = await AsyncCustomerService.search_customers(db, q, limit)
+    if not customers:
+        raise HTTPException(status_code=404, detail="No customers found")
+    return customers
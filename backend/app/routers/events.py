@@ -0,0 +1,87 @@
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import asyncio
+import json
+import os
+from app.events import event_bus
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+# Seconds between keep-alive comments on an idle stream (keeps proxies from closing it)
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))
+
+# Client reconnection delay sent to EventSource, in milliseconds
+RETRY_MS = 3000
+
+
+def _matches(event_type: str, types: Optional[tuple]) -> bool:
+    return types is None or event_type.split(".", 1)[0] in types
+
+
+async def _event_stream(last_event_id: Optional[str], types: Optional[tuple]):
+    """
+    SSE stream: replay of the missed events (or a reset event), then live events.
+
+    The subscription is taken before reading the replay buffer, so an event published
+    in between is in both: the live loop skips anything already sent.
+    """
+    queue = event_bus.subscribe()
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        sent = 0
+        if last_event_id:
+            missed = event_bus.since(last_event_id)
+            if missed is None:
+                # The missed events are gone (restart or buffer overrun): the client reloads its lists
+                sent = event_bus.seq
+                reset = json.dumps({"type": "reset", "data": {}})
+                yield f"id: {event_bus.boot}-{sent}\ndata: {reset}\n\n"
+            else:
+                for event in missed:
+                    if _matches(event.type, types):
+                        yield event.message
+                    sent = event.seq
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                # Too slow to keep up: end the stream, the client resumes from its last event ID
+                return
+            if event.seq > sent and _matches(event.type, types):
+                yield event.message
+    finally:
+        event_bus.unsubscribe(queue)
+
+
+@router.get("/")
+async def stream_events(
+    types: Optional[str] = Query(None, description="Comma-separated event families, e.g. car,rental (default: all)"),
+    last_event_id: Optional[str] = Query(None, description="Resume after this event ID (same as the Last-Event-ID header)"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-sent events stream of fleet changes.
+
+    Each message is {"type": ..., "data": ...} with a compact payload: car.created,
+    car.updated (changed fields only), car.deleted, cars.repriced, rental.created,
+    rental.returned, rental.deleted, customer.*, reservation.*, import.completed.
+    A client reconnecting with Last-Event-ID gets the events it missed, or a "reset"
+    event if they are no longer buffered.
+    """
+    families = tuple(part.strip() for part in types.split(",") if part.strip()) if types else None
+    return StreamingResponse(
+        _event_stream(last_event_id_header or last_event_id, families),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+def event_stats():
+    """Event bus counters: last event ID, buffered events, connected streams"""
+    return event_bus.stats()
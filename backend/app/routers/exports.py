@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from datetime import date, datetime
+from typing import Optional
+from app.services.export_service import ExportService, EXPORT_ENTITIES, EXPORT_FORMATS, EXPORT_MEDIA_TYPES
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+
+@router.get("/{entity}")
+def export_entity(
+    entity: str,
+    format: str = Query("ndjson", description="ndjson or csv"),
+    date_from: Optional[date] = Query(None, description="Rentals only: started on or after this day"),
+    date_to: Optional[date] = Query(None, description="Rentals only: started before this day"),
+    batch_size: int = Query(1000, ge=1, le=50000, description="Rows fetched and sent per chunk"),
+):
+    """
+    Stream every car, customer or rental as NDJSON or CSV.
+
+    Rows are read from a database cursor and written to the response batch by batch,
+    so the export of a large table never sits in memory as a whole.
+    """
+    if entity not in EXPORT_ENTITIES:
+        raise HTTPException(status_code=404, detail=f"Unknown entity. Values: {', '.join(EXPORT_ENTITIES)}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format. Values: {', '.join(EXPORT_FORMATS)}")
+    if entity != "rentals" and (date_from or date_to):
+        raise HTTPException(status_code=400, detail="Date filters only apply to rentals")
+    if date_from and date_to and date_to <= date_from:
+        raise HTTPException(status_code=400, detail="date_to must be after date_from")
+
+    filename = f"{entity}-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        ExportService.stream(entity, format, batch_size, date_from, date_to),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,126 +1,172 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Query, Request
 from sqlalchemy.orm import Session
+from typing import Optional
 import os
-import shutil
-from datetime import datetime
-import uuid
+import re
 
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.file_serving import IMMUTABLE, serve_file
 from app.models.models import Car
+from app.schemas.schemas import image_url
+from app.services.image_service import (
+    ImageService, ImageTooLargeError, ALLOWED_EXTENSIONS, IMAGE_MAX_BYTES, IMAGE_MEDIA_TYPES, allowed_file,
+    image_path, derivative_cache
+)
+from app.services.image_variants import (
+    VariantUnavailable, VARIANT_FORMATS, VARIANT_WIDTHS, negotiate_format, snap_width
+)
 
 router = APIRouter(prefix="/api/images", tags=["images"])
 
-# Create uploads directory
-UPLOAD_DIR = os.path.join(os.path.dirname(__file__), '../../uploads/cars')
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Stored image names: content hash (or car_<id>_<uuid> for older uploads) and extension
+_IMAGE_FILENAME = re.compile(r"^[A-Za-z0-9_-]+\.(jpg|jpeg|png|gif|webp)$")
 
-# Allowed extensions
-ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
+_WIDTH_QUERY = Query(None, ge=1, le=4096, description=f"Width in pixels, rounded up to one of {VARIANT_WIDTHS}")
+_FORMAT_QUERY = Query(None, description="webp, jpeg or png (default: WebP if the client accepts it)")
 
 
-def allowed_file(filename: str) -> bool:
-    """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+def _image_response(request: Request, filename: str, w: Optional[int], format: Optional[str], cache_control: str):
+    """
+    The stored image, or its variant when a width or format is asked for.
+
+    The ETag is the name of the file served: names are derived from the content.
+    """
+    if format is not None and format not in VARIANT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format. Values: {', '.join(VARIANT_FORMATS)}")
+
+    path = image_path(filename)
+    served = filename
+    media_type = IMAGE_MEDIA_TYPES.get(filename.rsplit(".", 1)[-1].lower(), "application/octet-stream")
+    headers = {}
+    if w is not None or format is not None:
+        if not os.path.exists(path):
+            raise HTTPException(status_code=404, detail="Image file not found")
+        fmt = format or negotiate_format(request.headers.get("accept"), filename)
+        if format is None:
+            headers["Vary"] = "Accept"
+        try:
+            path = derivative_cache.get(path, filename, snap_width(w or VARIANT_WIDTHS[-1]), fmt)
+            served = os.path.basename(path)
+            media_type = VARIANT_FORMATS[fmt]
+        except VariantUnavailable:
+            pass
+
+    try:
+        return serve_file(request, path, media_type, f'"{served}"', cache_control, headers)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Image file not found")
 
 
 @router.post("/cars/{car_id}")
-async def upload_car_image(
+def upload_car_image(
     car_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    """Upload image for a car"""
-    
+    """
+    Upload image for a car.
+
+    The request body is capped by BodySizeLimitMiddleware and spooled to disk while
+    it is parsed; this handler runs in the thread pool and copies it into place.
+    """
+
     # Check if car exists
     car = db.query(Car).filter(Car.id == car_id).first()
     if not car:
         raise HTTPException(status_code=404, detail="Car not found")
-    
+
     # Validate file
     if not file.filename:
         raise HTTPException(status_code=400, detail="No filename")
-    
+
     if not allowed_file(file.filename):
         raise HTTPException(
             status_code=400,
             detail=f"File type not allowed. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
         )
-    
-    # Limit file size (5MB)
-    contents = await file.read()
-    if len(contents) > 5 * 1024 * 1024:  # 5MB
-        raise HTTPException(status_code=400, detail="File too large (max 5MB)")
-    
+
     try:
-        # Create unique filename
-        file_ext = file.filename.rsplit('.', 1)[1].lower()
-        unique_filename = f"car_{car_id}_{uuid.uuid4().hex}.{file_ext}"
-        file_path = os.path.join(UPLOAD_DIR, unique_filename)
-        
-        # Save file
-        with open(file_path, 'wb') as f:
-            f.write(contents)
-        
-        # Delete old image if exists
-        if car.image_filename:
-            old_path = os.path.join(UPLOAD_DIR, car.image_filename)
-            if os.path.exists(old_path):
-                os.remove(old_path)
-        
-        # Update car
-        car.image_filename = unique_filename
-        db.commit()
-        
-        return {
-            "status": "success",
-            "message": "Image uploaded successfully",
-            "filename": unique_filename,
-            "url": f"/api/images/cars/{car_id}/download"
-        }
-    
+        unique_filename = ImageService.set_car_image(db, car, file.file, file.filename)
+    except ImageTooLargeError:
+        raise HTTPException(status_code=413, detail=f"File too large (max {IMAGE_MAX_BYTES // (1024 * 1024)}MB)")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
+    return {
+        "status": "success",
+        "message": "Image uploaded successfully",
+        "filename": unique_filename,
+        "url": image_url(unique_filename)
+    }
+
+
+@router.get("/files/{filename}")
+def get_image_file(
+    filename: str,
+    request: Request,
+    w: Optional[int] = _WIDTH_QUERY,
+    format: Optional[str] = _FORMAT_QUERY,
+):
+    """
+    Serve an image by file name (the `image_url` of a car), or a resized variant
+    with `?w=` and/or `?format=`.
+
+    No database lookup: the name is the content hash, so the response never changes
+    and is cacheable forever (`Cache-Control: immutable`). Supports conditional
+    requests (ETag, Last-Modified) and byte ranges.
+    """
+    if not _IMAGE_FILENAME.match(filename):
+        raise HTTPException(status_code=404, detail="Image file not found")
+    return _image_response(request, filename, w, format, IMMUTABLE)
+
 
 @router.get("/cars/{car_id}/download")
-async def download_car_image(car_id: int, db: Session = Depends(get_db)):
-    """Download car image"""
-    
+def download_car_image(
+    car_id: int,
+    request: Request,
+    w: Optional[int] = _WIDTH_QUERY,
+    format: Optional[str] = _FORMAT_QUERY,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Download the current image of a car: the original, or a resized variant with
+    `?w=` and/or `?format=`.
+
+    Looks the car up on every request and must be revalidated by clients (the
+    image of a car can change); prefer the car's `image_url`.
+    """
     car = db.query(Car).filter(Car.id == car_id).first()
     if not car or not car.image_filename:
         raise HTTPException(status_code=404, detail="Image not found")
-    
-    file_path = os.path.join(UPLOAD_DIR, car.image_filename)
-    if not os.path.exists(file_path):
+    if not _IMAGE_FILENAME.match(car.image_filename):
         raise HTTPException(status_code=404, detail="Image file not found")
-    
-    return FileResponse(file_path, media_type='image/*')
+
+    return _image_response(request, car.image_filename, w, format, "no-cache")
+
+
+@router.get("/cache")
+def image_cache_stats():
+    """Variant cache counters: variants on disk, bytes used, hits, renders, evictions"""
+    return derivative_cache.stats()
 
 
 @router.delete("/cars/{car_id}")
-async def delete_car_image(car_id: int, db: Session = Depends(get_db)):
+def delete_car_image(car_id: int, db: Session = Depends(get_db)):
     """Delete car image"""
-    
+
     car = db.query(Car).filter(Car.id == car_id).first()
     if not car:
         raise HTTPException(status_code=404, detail="Car not found")
-    
+
     if not car.image_filename:
         raise HTTPException(status_code=404, detail="No image to delete")
-    
+
     try:
-        file_path = os.path.join(UPLOAD_DIR, car.image_filename)
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
-        car.image_filename = None
-        db.commit()
-        
-        return {
-            "status": "success",
-            "message": "Image deleted successfully"
-        }
-    
+        ImageService.delete_car_image(db, car)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Delete failed: {str(e)}")
+
+    return {
+        "status": "success",
+        "message": "Image deleted successfully"
+    }
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app.schemas.schemas import ImportReport
+from app.services.import_service import ImportService, IMPORT_ENTITIES, IMPORT_FORMATS
+
+router = APIRouter(prefix="/api/import", tags=["import"])
+
+
+@router.post("/{entity}", response_model=ImportReport)
+def import_entity(
+    entity: str,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson (default: from the file name or content type)"),
+    chunk_size: int = Query(1000, ge=1, le=10000, description="Rows validated and inserted per transaction"),
+    dry_run: bool = Query(False, description="Validate only, write nothing"),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import cars, customers or rentals from a CSV or NDJSON file.
+
+    Cars and customers use the same fields as their create endpoints. Rentals reference
+    the car by `num_imma` and the customer by `id_loc`, with optional `date_debut`,
+    `date_fin` and `date_retour`. Rows are parsed from the uploaded file as they are read;
+    rejected rows are listed with their line number and the rest are inserted. A file
+    that is not valid UTF-8 is imported up to the line that fails to decode, which is
+    reported as a rejected row.
+    """
+    if entity not in IMPORT_ENTITIES:
+        raise HTTPException(status_code=404, detail=f"Unknown entity. Values: {', '.join(IMPORT_ENTITIES)}")
+
+    fmt = format or ImportService.detect_format(file.filename, file.content_type)
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format. Values: {', '.join(IMPORT_FORMATS)}")
+
+    return ImportService.import_records(
+        db, entity, ImportService.iter_records(ImportService.decode_lines(file.file), fmt),
+        fmt=fmt, chunk_size=chunk_size, dry_run=dry_run
+    )
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from app.database import get_read_db
+from app.metrics import CONTENT_TYPE, FLEET_CARS, REGISTRY, RENTALS_ACTIVE
+from app.models.models import FleetStats
+from app.services.rental_service import RentalService
+from app.services.stats_service import STATS_ROW_ID, StatsService
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=Response)
+def get_metrics(db: Session = Depends(get_read_db)):
+    """Prometheus metrics of every worker, with the fleet gauges read from the database"""
+    stats = db.get(FleetStats, STATS_ROW_ID)
+    # Read-only session: compute the counters if their row was not created yet
+    counters = StatsService.compute(db) if stats is None else {
+        "available_cars": stats.available_cars, "rented_cars": stats.rented_cars
+    }
+    values = {
+        RENTALS_ACTIVE: {(): RentalService.count_active_rentals(db)},
+        FLEET_CARS: {("available",): counters["available_cars"], ("rented",): counters["rented_cars"]},
+    }
+    return Response(REGISTRY.render(values), media_type=CONTENT_TYPE)
@@ -1,9 +1,20 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from app.services.ml_service import predict_rental_price, MARQUES
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+import json
+from app.services.ml_service import (
+    predict_rental_price, predict_rental_prices, list_model_versions, model_registry, MARQUES
+)
+from app.services.jobs import job_manager
+from app.services.prediction_cache import prediction_cache
+from app.services.repricing_service import RepricingService, DEFAULT_ANNEE
+from app.services.training_service import TrainingService, TRAINING_SOURCES
 
 router = APIRouter(prefix="/api/ml", tags=["ML Predictions"])
 
+# Nombre maximal de lignes acceptées par un appel de prédiction par lot
+MAX_BATCH_SIZE = 10000
+
 
 class PricePredictor(BaseModel):
     """Modèle pour la prédiction de prix"""
@@ -23,6 +34,56 @@ class PredictionResponse(BaseModel):
     error: str = None
 
 
+class BatchPredictionItem(PredictionResponse):
+    """Résultat d'une ligne d'une prédiction par lot"""
+    index: int
+
+
+class BatchPredictionResponse(BaseModel):
+    """Réponse de prédiction par lot"""
+    success: bool
+    count: int
+    succeeded: int
+    failed: int
+    results: list[BatchPredictionItem]
+
+
+def validate_prediction_input(data: PricePredictor) -> str:
+    """Retourne le message d'erreur de validation, ou None si les données sont valides"""
+    if not data.marque or not data.marque.strip():
+        return "La marque est requise"
+
+    if data.kilometrage < 0 or data.kilometrage > 300000:
+        return "Kilométrage doit être entre 0 et 300000"
+
+    if data.annee < 1990 or data.annee > 2026:
+        return "Année doit être entre 1990 et 2026"
+
+    return None
+
+
+def _parse_batch_body(body: bytes, content_type: str) -> list:
+    """Découpe le corps de la requête en lignes brutes (liste JSON ou NDJSON)"""
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        rows = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(e)
+        return rows
+
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Corps JSON invalide")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Une liste de voitures est attendue")
+    return rows
+
+
 @router.post("/predict-price", response_model=PredictionResponse)
 async def predict_price(data: PricePredictor):
     """
@@ -36,16 +97,14 @@ async def predict_price(data: PricePredictor):
     """
     
     # Validation
-    if not data.marque or not data.marque.strip():
-        raise HTTPException(status_code=400, detail="La marque est requise")
-    
-    if data.kilometrage < 0 or data.kilometrage > 300000:
-        raise HTTPException(status_code=400, detail="Kilométrage doit être entre 0 et 300000")
-    
-    if data.annee < 1990 or data.annee > 2026:
-        raise HTTPException(status_code=400, detail="Année doit être entre 1990 et 2026")
+    error = validate_prediction_input(data)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
 
-    result = predict_rental_price(
+    # Hors de la boucle d'événements: un rechargement ou un premier chargement du modèle
+    # (lecture, SHA-256, désérialisation) bloquerait sinon toutes les autres requêtes
+    result = await run_in_threadpool(
+        predict_rental_price,
         marque=data.marque,
         kilometrage=data.kilometrage,
         annee=data.annee
@@ -54,6 +113,58 @@ async def predict_price(data: PricePredictor):
     return result
 
 
+@router.post("/predict-price/batch", response_model=BatchPredictionResponse)
+async def predict_price_batch(request: Request):
+    """
+    Prédit le prix de location d'un lot de voitures en un seul appel au modèle
+
+    Le corps est soit une liste JSON, soit un flux NDJSON (`Content-Type: application/x-ndjson`)
+    de lignes `{marque, kilometrage, annee}`. Les résultats et les erreurs sont renvoyés
+    ligne par ligne, dans l'ordre d'entrée (au plus 10000 lignes par appel).
+    """
+    body = await request.body()
+    rows = _parse_batch_body(body, request.headers.get("content-type", ""))
+    if len(rows) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Maximum {MAX_BATCH_SIZE} lignes par lot")
+
+    results = [None] * len(rows)
+    valid_indexes = []
+    valid_rows = []
+    for index, row in enumerate(rows):
+        if isinstance(row, Exception):
+            results[index] = {"success": False, "error": f"JSON invalide: {row}"}
+            continue
+        try:
+            data = PricePredictor.model_validate(row)
+        except ValidationError as e:
+            results[index] = {"success": False, "error": "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            )}
+            continue
+        error = validate_prediction_input(data)
+        if error:
+            results[index] = {"success": False, "error": error}
+            continue
+        valid_indexes.append(index)
+        valid_rows.append((data.marque, data.kilometrage, data.annee))
+
+    predictions = await run_in_threadpool(predict_rental_prices, valid_rows)
+    for index, prediction in zip(valid_indexes, predictions):
+        results[index] = prediction
+
+    for index, result in enumerate(results):
+        result["index"] = index
+    succeeded = sum(1 for result in results if result["success"])
+
+    return {
+        "success": succeeded == len(results),
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    }
+
+
 @router.get("/supported-marques")
 async def get_supported_marques():
     """Retourne la liste des marques supportées par le modèle ML"""
@@ -73,5 +184,94 @@ async def get_ml_info():
         "max_depth": 10,
         "size_mb": "~0.5",
         "impact_pc": "Très faible (< 1% CPU, < 50MB RAM)",
-        "supported_marques": MARQUES
+        "supported_marques": MARQUES,
+        "registry": model_registry.info(),
+        "cache": prediction_cache.stats()
     }
+
+
+@router.get("/cache")
+def get_cache_stats():
+    """Compteurs du cache de prédictions (succès, échecs, évictions)"""
+    return prediction_cache.stats()
+
+
+@router.delete("/cache", status_code=204)
+def clear_cache():
+    """Vide le cache de prédictions"""
+    prediction_cache.clear()
+    return None
+
+
+@router.post("/reload-model")
+def reload_model():
+    """Force la relecture de l'artefact du modèle s'il a changé sur disque"""
+    model = model_registry.reload()
+    if model is None:
+        raise HTTPException(status_code=503, detail="Modèle ML non disponible")
+    return model_registry.info()
+
+
+@router.post("/reprice-fleet", status_code=202)
+def reprice_fleet(
+    dry_run: bool = Query(False, description="Ne rien écrire, seulement lister les changements"),
+    chunk_size: int = Query(500, ge=1, le=10000),
+    annee: int = Query(DEFAULT_ANNEE, ge=1990, le=2026)
+):
+    """
+    Lance en tâche de fond le recalcul du prix de location de toute la flotte
+
+    Suivre l'avancement avec GET /api/ml/jobs/{job_id}.
+    """
+    job = job_manager.submit(
+        "reprice-fleet",
+        lambda job, **params: RepricingService.reprice_fleet(progress=job.report_progress, **params),
+        dry_run=dry_run,
+        chunk_size=chunk_size,
+        annee=annee
+    )
+    return job.to_dict()
+
+
+@router.post("/train", status_code=202)
+def train(
+    source: str = Query("synthetic", description="Données d'entraînement: synthetic ou history"),
+    chunk_size: int = Query(50000, ge=1000, le=1000000)
+):
+    """
+    Lance en tâche de fond l'entraînement d'un nouveau modèle
+
+    Le modèle est sauvegardé comme artefact versionné puis publié; le registre le
+    recharge automatiquement. Suivre l'avancement avec GET /api/ml/jobs/{job_id}.
+    """
+    if source not in TRAINING_SOURCES:
+        raise HTTPException(status_code=400, detail=f"Source inconnue. Valeurs: {', '.join(TRAINING_SOURCES)}")
+
+    job = job_manager.submit(
+        "train",
+        lambda job, **params: TrainingService.train(progress=job.report_progress, **params),
+        source=source,
+        chunk_size=chunk_size
+    )
+    return job.to_dict()
+
+
+@router.get("/models")
+def get_model_versions():
+    """Liste les versions du modèle entraînées et conservées sur disque"""
+    return list_model_versions()
+
+
+@router.get("/jobs")
+def list_jobs():
+    """Liste les tâches de fond ML"""
+    return [job.to_dict() for job in job_manager.list()]
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Etat et avancement d'une tâche de fond ML"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Tâche introuvable")
+    return job.to_dict()
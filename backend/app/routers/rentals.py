@@ -1,8 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.schemas import RentalCreate, RentalResponse, RentalReturn, RentalDetail
-from app.services.rental_service import RentalService
+from typing import Optional, Union
+from app.database import get_db, get_read_db
+from app.pagination import encode_cursor, decode_cursor
+from app.schemas.schemas import (
+    RentalCreate, RentalResponse, RentalReturn, RentalDetail, RentalPage, RentalExpanded, RentalExpandedPage
+)
+from app.services.rental_service import (
+    RentalService, CarNotFoundError, CustomerNotFoundError, CarNotAvailableError
+)
 
 router = APIRouter(prefix="/api/rentals", tags=["rentals"])
 
@@ -10,42 +16,66 @@ router = APIRouter(prefix="/api/rentals", tags=["rentals"])
 @router.post("/", response_model=RentalResponse, status_code=201)
 def create_rental(rental: RentalCreate, db: Session = Depends(get_db)):
     """Create a new rental (rent a car to a customer)"""
-    # Verify car exists and is available
-    from app.services.car_service import CarService
-    car = CarService.get_car(db, rental.car_id)
-    if not car:
+    try:
+        return RentalService.create_rental(db, rental)
+    except CarNotFoundError:
         raise HTTPException(status_code=404, detail="Car not found")
-    
-    # Verify customer exists
-    from app.services.customer_service import CustomerService
-    customer = CustomerService.get_customer(db, rental.customer_id)
-    if not customer:
+    except CustomerNotFoundError:
         raise HTTPException(status_code=404, detail="Customer not found")
-    
-    # Check if car is available
-    if not RentalService.is_car_available(db, rental.car_id):
-        raise HTTPException(status_code=400, detail="Car is not available for rental")
-    
-    db_rental = RentalService.create_rental(db, rental)
-    if not db_rental:
-        raise HTTPException(status_code=400, detail="Failed to create rental")
-    
-    return db_rental
+    except CarNotAvailableError:
+        raise HTTPException(status_code=409, detail="Car is not available for rental")
+
+
+@router.get("/expanded", response_model=Union[list[RentalExpanded], RentalExpandedPage])
+def get_expanded_rentals(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor pagination: empty for the first page, then next_cursor"),
+    active_only: bool = Query(False, description="Only rentals not returned yet"),
+    db: Session = Depends(get_read_db)
+):
+    """Get rentals with car plate/brand/model and customer ID/name, in a single joined query"""
+    if cursor is None:
+        return RentalService.get_expanded_rentals(db, skip, limit, active_only=active_only)
+
+    try:
+        after = decode_cursor(cursor, (int,))[0] if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rentals = RentalService.get_expanded_rentals(db, limit=limit, after_id=after, active_only=active_only)
+    next_cursor = encode_cursor(rentals[-1].id) if len(rentals) == limit else None
+    return {"items": rentals, "next_cursor": next_cursor}
 
 
 @router.get("/{rental_id}", response_model=RentalDetail)
-def get_rental(rental_id: int, db: Session = Depends(get_db)):
+def get_rental(rental_id: int, db: Session = Depends(get_read_db)):
     """Get rental details by ID"""
-    rental = RentalService.get_rental(db, rental_id)
+    rental = RentalService.get_rental_detail(db, rental_id)
     if not rental:
         raise HTTPException(status_code=404, detail="Rental not found")
     return rental
 
 
-@router.get("/", response_model=list[RentalResponse])
-def get_all_rentals(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
-    """Get all rentals"""
-    return RentalService.get_all_rentals(db, skip, limit)
+@router.get("/", response_model=Union[list[RentalResponse], RentalPage])
+def get_all_rentals(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor pagination: empty for the first page, then next_cursor"),
+    db: Session = Depends(get_read_db)
+):
+    """Get all rentals by ID (offset pagination, or keyset pagination when cursor is given)"""
+    if cursor is None:
+        return RentalService.get_all_rentals(db, skip, limit)
+
+    try:
+        after = decode_cursor(cursor, (int,))[0] if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rentals = RentalService.get_rentals_after(db, after, limit)
+    next_cursor = encode_cursor(rentals[-1].id) if len(rentals) == limit else None
+    return {"items": rentals, "next_cursor": next_cursor}
 
 
 @router.post("/{rental_id}/return", response_model=RentalResponse)
@@ -71,13 +101,13 @@ def delete_rental(rental_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/search/active", response_model=list[RentalResponse])
-def get_active_rentals(db: Session = Depends(get_db)):
+def get_active_rentals(db: Session = Depends(get_read_db)):
     """Get active rentals (not yet returned)"""
     return RentalService.get_active_rentals(db)
 
 
 @router.get("/search/customer/{customer_id}", response_model=list[RentalResponse])
-def get_customer_rentals(customer_id: int, db: Session = Depends(get_db)):
+def get_customer_rentals(customer_id: int, db: Session = Depends(get_read_db)):
     """Get rental history for a customer"""
     from app.services.customer_service import CustomerService
     customer = CustomerService.get_customer(db, customer_id)
@@ -88,7 +118,7 @@ def get_customer_rentals(customer_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/search/car/{car_id}", response_model=list[RentalResponse])
-def get_car_rentals(car_id: int, db: Session = Depends(get_db)):
+def get_car_rentals(car_id: int, db: Session = Depends(get_read_db)):
     """Get rental history for a car"""
     from app.services.car_service import CarService
     car = CarService.get_car(db, car_id)
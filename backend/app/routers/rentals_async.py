@@ -0,0 +1,129 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Union
+from app.database import get_async_db, get_async_read_db
+from app.pagination import encode_cursor, decode_cursor
+from app.schemas.schemas import (
+    RentalCreate, RentalResponse, RentalReturn, RentalDetail, RentalPage, RentalExpanded, RentalExpandedPage
+)
+from app.services.car_service import AsyncCarService
+from app.services.customer_service import AsyncCustomerService
+from app.services.rental_service import (
+    AsyncRentalService, CarNotFoundError, CustomerNotFoundError, CarNotAvailableError
+)
+
+# Same routes as app.routers.rentals, served on the event loop (DATABASE_ASYNC=true)
+router = APIRouter(prefix="/api/rentals", tags=["rentals"])
+
+
+@router.post("/", response_model=RentalResponse, status_code=201)
+async def create_rental(rental: RentalCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new rental (rent a car to a customer)"""
+    try:
+        return await AsyncRentalService.create_rental(db, rental)
+    except CarNotFoundError:
+        raise HTTPException(status_code=404, detail="Car not found")
+    except CustomerNotFoundError:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    except CarNotAvailableError:
+        raise HTTPException(status_code=409, detail="Car is not available for rental")
+
+
+@router.get("/expanded", response_model=Union[list[RentalExpanded], RentalExpandedPage])
+async def get_expanded_rentals(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor pagination: empty for the first page, then next_cursor"),
+    active_only: bool = Query(False, description="Only rentals not returned yet"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get rentals with car plate/brand/model and customer ID/name, in a single joined query"""
+    if cursor is None:
+        return await AsyncRentalService.get_expanded_rentals(db, skip, limit, active_only=active_only)
+
+    try:
+        after = decode_cursor(cursor, (int,))[0] if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rentals = await AsyncRentalService.get_expanded_rentals(db, limit=limit, after_id=after, active_only=active_only)
+    next_cursor = encode_cursor(rentals[-1].id) if len(rentals) == limit else None
+    return {"items": rentals, "next_cursor": next_cursor}
+
+
+@router.get("/{rental_id}", response_model=RentalDetail)
+async def get_rental(rental_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Get rental details by ID"""
+    rental = await AsyncRentalService.get_rental_detail(db, rental_id)
+    if not rental:
+        raise HTTPException(status_code=404, detail="Rental not found")
+    return rental
+
+
+@router.get("/", response_model=Union[list[RentalResponse], RentalPage])
+async def get_all_rentals(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor pagination: empty for the first page, then next_cursor"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get all rentals by ID (offset pagination, or keyset pagination when cursor is given)"""
+    if cursor is None:
+        return await AsyncRentalService.get_all_rentals(db, skip, limit)
+
+    try:
+        after = decode_cursor(cursor, (int,))[0] if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rentals = await AsyncRentalService.get_rentals_after(db, after, limit)
+    next_cursor = encode_cursor(rentals[-1].id) if len(rentals) == limit else None
+    return {"items": rentals, "next_cursor": next_cursor}
+
+
+@router.post("/{rental_id}/return", response_model=RentalResponse)
+async def return_rental(rental_id: int, return_data: RentalReturn, db: AsyncSession = Depends(get_async_db)):
+    """Return a rented car"""
+    rental = await AsyncRentalService.get_rental(db, rental_id)
+    if not rental:
+        raise HTTPException(status_code=404, detail="Rental not found")
+
+    if rental.date_retour is not None:
+        raise HTTPException(status_code=400, detail="Car has already been returned")
+
+    return await AsyncRentalService.return_rental(db, rental_id, return_data)
+
+
+@router.delete("/{rental_id}", status_code=204)
+async def delete_rental(rental_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a rental record"""
+    success = await AsyncRentalService.delete_rental(db, rental_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Rental not found")
+    return None
+
+
+@router.get("/search/active", response_model=list[RentalResponse])
+async def get_active_rentals(db: AsyncSession = Depends(get_async_read_db)):
+    """Get active rentals (not yet returned)"""
+    return await AsyncRentalService.get_active_rentals(db)
+
+
+@router.get("/search/customer/{customer_id}", response_model=list[RentalResponse])
+async def get_customer_rentals(customer_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Get rental history for a customer"""
+    customer = await AsyncCustomerService.get_customer(db, customer_id)
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    return await AsyncRentalService.get_rental_history(db, customer_id)
+
+
+@router.get("/search/car/{car_id}", response_model=list[RentalResponse])
+async def get_car_rentals(car_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Get rental history for a car"""
+    car = await AsyncCarService.get_car(db, car_id)
+    if not car:
+        raise HTTPException(status_code=404, detail="Car not found")
+
+    return await AsyncRentalService.get_car_rental_history(db, car_id)
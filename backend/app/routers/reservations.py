@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import datetime
+from app.database import get_db, get_read_db
+from app.schemas.schemas import ReservationCreate, ReservationResponse, AvailabilityResponse, naive_utc
+from app.services.rental_service import CarNotFoundError, CustomerNotFoundError
+from app.services.reservation_service import ReservationService, ReservationConflictError
+
+router = APIRouter(prefix="/api/reservations", tags=["reservations"])
+
+
+@router.post("/", response_model=ReservationResponse, status_code=201)
+def create_reservation(reservation: ReservationCreate, db: Session = Depends(get_db)):
+    """Book a car over [date_debut, date_fin) (409 if the period overlaps another booking or an active rental)"""
+    try:
+        return ReservationService.create_reservation(db, reservation)
+    except CarNotFoundError:
+        raise HTTPException(status_code=404, detail="Car not found")
+    except CustomerNotFoundError:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    except ReservationConflictError:
+        raise HTTPException(status_code=409, detail="Car is already booked or rented during this period")
+
+
+@router.get("/availability", response_model=AvailabilityResponse)
+def get_availability(
+    date_debut: datetime = Query(..., description="Window start (ISO datetime)"),
+    date_fin: datetime = Query(..., description="Window end, exclusive (ISO datetime)"),
+    db: Session = Depends(get_read_db)
+):
+    """Cars with no reservation and no active rental during the whole window"""
+    date_debut, date_fin = naive_utc(date_debut), naive_utc(date_fin)
+    if date_fin <= date_debut:
+        raise HTTPException(status_code=400, detail="date_fin must be after date_debut")
+    cars = ReservationService.get_available_cars(db, date_debut, date_fin)
+    return {"date_debut": date_debut, "date_fin": date_fin, "count": len(cars), "cars": cars}
+
+
+@router.get("/{reservation_id}", response_model=ReservationResponse)
+def get_reservation(reservation_id: int, db: Session = Depends(get_read_db)):
+    """Get reservation by ID"""
+    reservation = ReservationService.get_reservation(db, reservation_id)
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return reservation
+
+
+@router.delete("/{reservation_id}", status_code=204)
+def cancel_reservation(reservation_id: int, db: Session = Depends(get_db)):
+    """Cancel a reservation"""
+    success = ReservationService.cancel_reservation(db, reservation_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return None
+
+
+@router.get("/search/car/{car_id}", response_model=list[ReservationResponse])
+def get_car_reservations(
+    car_id: int,
+    upcoming_only: bool = Query(True, description="Only reservations not over yet"),
+    db: Session = Depends(get_read_db)
+):
+    """Get the reservations of a car in date order"""
+    from app.services.car_service import CarService
+    car = CarService.get_car(db, car_id)
+    if not car:
+        raise HTTPException(status_code=404, detail="Car not found")
+
+    return ReservationService.get_car_reservations(db, car_id, upcoming_only)
+
+
+@router.get("/search/customer/{customer_id}", response_model=list[ReservationResponse])
+def get_customer_reservations(customer_id: int, db: Session = Depends(get_read_db)):
+    """Get the reservations of a customer"""
+    from app.services.customer_service import CustomerService
+    customer = CustomerService.get_customer(db, customer_id)
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    return ReservationService.get_customer_reservations(db, customer_id)
@@ -1,33 +1,50 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from datetime import datetime
-from app.database import get_db
+import time
+from app.database import get_db, get_read_db
+from app.response_cache import cached_json, response_cache
 from app.schemas.schemas import StatisticsResponse, HealthResponse
-from app.services.car_service import CarService
+from app.services.stats_service import StatsService
 
 router = APIRouter(prefix="/api", tags=["stats"])
 
+_STATISTICS = TypeAdapter(StatisticsResponse)
+
 
 @router.get("/statistics", response_model=StatisticsResponse)
-def get_statistics(db: Session = Depends(get_db)):
-    """Get system statistics"""
-    total_cars = CarService.get_total_cars(db)
-    available_cars = CarService.count_available_cars(db)
-    rented_cars = CarService.count_rented_cars(db)
-    average_mileage = CarService.get_average_mileage(db)
-    
-    return StatisticsResponse(
-        total_cars=total_cars,
-        available_cars=available_cars,
-        rented_cars=rented_cars,
-        average_mileage=average_mileage
-    )
+def get_statistics(request: Request, db: Session = Depends(get_db)):
+    """Get system statistics (read from the maintained counters; cached, with ETags)"""
+    # Read-write session: the counters row is rebuilt on the first request if missing
+    return cached_json(request, db, ("cars",), _STATISTICS, lambda: StatsService.get_statistics(db))
+
+
+@router.get("/response-cache")
+def response_cache_stats():
+    """Response cache counters: entries, memory used, hit rate, 304 responses"""
+    return response_cache.stats()
+
+
+@router.delete("/response-cache", status_code=204)
+def clear_response_cache():
+    """Drop every cached response (the next requests rebuild them)"""
+    response_cache.clear()
+    return None
 
 
 @router.get("/health", response_model=HealthResponse)
-def health_check():
-    """Health check endpoint"""
+def health_check(db: Session = Depends(get_read_db)):
+    """Health check: the database answers a trivial query (503 otherwise)"""
+    start = time.perf_counter()
+    try:
+        db.execute(text("SELECT 1"))
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {type(e).__name__}")
     return HealthResponse(
         status="healthy",
-        timestamp=datetime.utcnow()
+        timestamp=datetime.utcnow(),
+        database_ms=round((time.perf_counter() - start) * 1000, 2)
     )
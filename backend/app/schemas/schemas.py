@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field, model_validator
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
 
@@ -9,7 +9,19 @@ class CarStatusEnum(str, Enum):
     RENTED = "rented"
 
 
+def naive_utc(value: datetime) -> datetime:
+    """A datetime as stored in the database: naive UTC (timezone-aware values are converted)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 # Car Schemas
+def image_url(image_filename: Optional[str]) -> Optional[str]:
+    """Direct URL of an image file (its name is content addressed, so the URL is immutable)"""
+    return f"/api/images/files/{image_filename}" if image_filename else None
+
+
 class CarBase(BaseModel):
     """Base car schema"""
     num_imma: str = Field(..., min_length=1, description="License plate number")
@@ -39,10 +51,21 @@ class CarResponse(CarBase):
     """Schema for car response"""
     id: int
 
+    @computed_field
+    @property
+    def image_url(self) -> Optional[str]:
+        return image_url(self.image_filename)
+
     class Config:
         from_attributes = True
 
 
+class CarPage(BaseModel):
+    """A page of cars with the cursor of the next page"""
+    items: list[CarResponse]
+    next_cursor: Optional[str] = None
+
+
 # Customer Schemas
 class CustomerBase(BaseModel):
     """Base customer schema"""
@@ -72,6 +95,12 @@ class CustomerResponse(CustomerBase):
         from_attributes = True
 
 
+class CustomerPage(BaseModel):
+    """A page of customers with the cursor of the next page"""
+    items: list[CustomerResponse]
+    next_cursor: Optional[str] = None
+
+
 # Rental Schemas
 class RentalBase(BaseModel):
     """Base rental schema"""
@@ -90,6 +119,17 @@ class RentalReturn(BaseModel):
     date_retour: Optional[datetime] = None
 
 
+class RentalImport(BaseModel):
+    """Schema for an imported rental (car and customer referenced by their business keys)"""
+    num_imma: str = Field(..., min_length=1, description="License plate of the rented car")
+    id_loc: str = Field(..., min_length=1, description="Customer ID")
+    date_debut: Optional[datetime] = None
+    date_fin: Optional[datetime] = None
+    date_retour: Optional[datetime] = None
+    prix_location: Optional[float] = Field(None, ge=0, description="Car's rental price at checkout")
+    kilometrage: Optional[int] = Field(None, ge=0, description="Car's mileage at checkout")
+
+
 class RentalResponse(RentalBase):
     """Schema for rental response"""
     id: int
@@ -101,12 +141,105 @@ class RentalResponse(RentalBase):
         from_attributes = True
 
 
+class RentalPage(BaseModel):
+    """A page of rentals with the cursor of the next page"""
+    items: list[RentalResponse]
+    next_cursor: Optional[str] = None
+
+
 class RentalDetail(RentalResponse):
     """Detailed rental response with car and customer info"""
     car: CarResponse
     customer: CustomerResponse
 
 
+class RentalExpanded(RentalResponse):
+    """Rental listing row with the car and customer columns needed for display"""
+    car_num_imma: Optional[str] = None
+    car_marque: Optional[str] = None
+    car_modele: Optional[str] = None
+    customer_id_loc: Optional[str] = None
+    customer_nom: Optional[str] = None
+    customer_prenom: Optional[str] = None
+
+
+class RentalExpandedPage(BaseModel):
+    """A page of expanded rentals with the cursor of the next page"""
+    items: list[RentalExpanded]
+    next_cursor: Optional[str] = None
+
+
+# Reservation Schemas
+class ReservationCreate(BaseModel):
+    """Schema for booking a car over [date_debut, date_fin)"""
+    car_id: int
+    customer_id: int
+    date_debut: datetime = Field(..., description="Planned start")
+    date_fin: datetime = Field(..., description="Planned end (exclusive)")
+
+    @model_validator(mode="after")
+    def check_period(self):
+        self.date_debut = naive_utc(self.date_debut)
+        self.date_fin = naive_utc(self.date_fin)
+        if self.date_fin <= self.date_debut:
+            raise ValueError("date_fin must be after date_debut")
+        return self
+
+
+class ReservationResponse(ReservationCreate):
+    """Schema for reservation response"""
+    id: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class AvailabilityResponse(BaseModel):
+    """Cars free over a whole window"""
+    date_debut: datetime
+    date_fin: datetime
+    count: int
+    cars: list[CarResponse]
+
+
+# Import Schemas
+class ImportRowError(BaseModel):
+    """A rejected row of a bulk import"""
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    """Outcome of a bulk import"""
+    entity: str
+    format: str
+    dry_run: bool
+    received: int
+    valid: int
+    inserted: int
+    failed: int
+    errors: list[ImportRowError]
+    errors_truncated: bool
+    seconds: float
+    rows_per_second: float
+
+
+# Autocomplete Schemas
+class AutocompleteItem(BaseModel):
+    """A typeahead suggestion"""
+    type: str
+    id: int
+    label: str
+    detail: str
+
+
+class AutocompleteResponse(BaseModel):
+    """Typeahead suggestions for a query"""
+    query: str
+    items: list[AutocompleteItem]
+
+
 # Statistics Schema
 class StatisticsResponse(BaseModel):
     """Schema for statistics response"""
@@ -121,3 +254,4 @@ class HealthResponse(BaseModel):
     """Schema for health check response"""
     status: str
     timestamp: datetime
+    database_ms: float  # Round trip of a trivial query
@@ -0,0 +1,263 @@
+"""In-memory prefix index for typeahead on car plates, customer IDs and customer names"""
+from bisect import bisect_left, insort
+from datetime import datetime
+from functools import lru_cache
+import heapq
+import re
+import threading
+import time
+
+from sqlalchemy import select
+
+from app.models.models import Car, Customer
+from app.services.search_service import fold_text
+
+# Rows fetched per database round trip while loading
+LOAD_CHUNK_SIZE = 50000
+
+# Entries per block of the sorted array
+BLOCK_SIZE = 512
+
+# Separates the key from the entity ID in an index entry (sorts before any key character)
+_SEPARATOR = "\x00"
+
+AUTOCOMPLETE_TYPES = ("car", "customer")
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+
+
+def normalize_key(value: str) -> str:
+    """Lookup key: case and accent folded, letters and digits only (AB-123-CD -> ab123cd)"""
+    if not value.isascii():
+        value = fold_text(value)
+    return _NON_ALNUM.sub("", value).lower()
+
+
+# Names repeat a lot (and folding accents is the slow part), so their keys are cached
+_name_key = lru_cache(maxsize=65536)(normalize_key)
+
+
+class PrefixIndex:
+    """
+    Sorted array of "key\\0id" strings with the display label of each entity.
+
+    The array is split into blocks of a few hundred entries, with the last entry of
+    each block kept in a separate sorted list: a lookup is two binary searches and a
+    scan of the matching run, and an insert or delete only shifts one block instead
+    of the whole array. Not thread safe on its own: AutocompleteIndex serializes access.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._blocks = []
+        self._maxes = []
+        self._entities = {}
+        self.entries = 0
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    @classmethod
+    def build(cls, kind: str, rows) -> "PrefixIndex":
+        """Bulk-build from (entity id, keys, label, detail) tuples with a single sort"""
+        index = cls(kind)
+        entries = []
+        for entity_id, keys, label, detail in rows:
+            index._entities[entity_id] = (keys, label, detail)
+            entries.extend(f"{key}{_SEPARATOR}{entity_id}" for key in keys)
+        entries.sort()
+        index._blocks = [entries[i:i + BLOCK_SIZE] for i in range(0, len(entries), BLOCK_SIZE)]
+        index._maxes = [block[-1] for block in index._blocks]
+        index.entries = len(entries)
+        return index
+
+    def _insert(self, entry: str):
+        if not self._blocks:
+            self._blocks.append([entry])
+            self._maxes.append(entry)
+            self.entries += 1
+            return
+        i = min(bisect_left(self._maxes, entry), len(self._blocks) - 1)
+        block = self._blocks[i]
+        insort(block, entry)
+        self._maxes[i] = block[-1]
+        if len(block) > 2 * BLOCK_SIZE:
+            self._blocks[i:i + 1] = [block[:BLOCK_SIZE], block[BLOCK_SIZE:]]
+            self._maxes[i:i + 1] = [block[BLOCK_SIZE - 1], block[-1]]
+        self.entries += 1
+
+    def _delete(self, entry: str):
+        i = bisect_left(self._maxes, entry)
+        if i == len(self._blocks):
+            return
+        block = self._blocks[i]
+        j = bisect_left(block, entry)
+        if j == len(block) or block[j] != entry:
+            return
+        del block[j]
+        if block:
+            self._maxes[i] = block[-1]
+        else:
+            del self._blocks[i]
+            del self._maxes[i]
+        self.entries -= 1
+
+    def put_many(self, rows: list):
+        """Add or replace entities given as (entity id, keys, label, detail) tuples"""
+        for entity_id, keys, label, detail in rows:
+            self.remove(entity_id)
+            self._entities[entity_id] = (keys, label, detail)
+            for key in keys:
+                self._insert(f"{key}{_SEPARATOR}{entity_id}")
+
+    def remove(self, entity_id: int):
+        """Remove an entity (no-op if absent)"""
+        entity = self._entities.pop(entity_id, None)
+        if entity is None:
+            return
+        for key in entity[0]:
+            self._delete(f"{key}{_SEPARATOR}{entity_id}")
+
+    def search(self, prefix: str, limit: int) -> list:
+        """Up to `limit` (key, item) pairs whose key starts with prefix, in key order"""
+        results = []
+        seen = set()
+        i = bisect_left(self._maxes, prefix)
+        position = bisect_left(self._blocks[i], prefix) if i < len(self._blocks) else 0
+        while i < len(self._blocks) and len(results) < limit:
+            block = self._blocks[i]
+            while position < len(block) and len(results) < limit:
+                entry = block[position]
+                if not entry.startswith(prefix):
+                    return results
+                key, entity_id = entry.split(_SEPARATOR)
+                entity_id = int(entity_id)
+                if entity_id not in seen:
+                    seen.add(entity_id)
+                    _, label, detail = self._entities[entity_id]
+                    results.append((key, {"type": self.kind, "id": entity_id, "label": label, "detail": detail}))
+                position += 1
+            i += 1
+            position = 0
+        return results
+
+
+class AutocompleteIndex:
+    """
+    Plates, customer IDs and customer names ("nom prenom") of the whole database,
+    loaded once and then kept current by the service write paths.
+
+    Updates are ignored until a load has started, so processes that never serve
+    autocomplete (CLI, benchmarks) pay nothing. Updates made while the load is
+    reading the tables are replayed once it has finished.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = {kind: PrefixIndex(kind) for kind in AUTOCOMPLETE_TYPES}
+        self._loading = False
+        self._pending = []
+        self.loaded_at = None
+        self.load_seconds = None
+
+    @property
+    def active(self) -> bool:
+        """Whether updates are being tracked (loading or loaded)"""
+        return self._loading or self.loaded_at is not None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    @staticmethod
+    def car_row(car) -> tuple:
+        return (car.id, (normalize_key(car.num_imma),), car.num_imma, f"{car.marque} {car.modele}")
+
+    @staticmethod
+    def customer_row(customer) -> tuple:
+        keys = tuple(dict.fromkeys(key for key in (
+            normalize_key(customer.id_loc),
+            _name_key(customer.nom) + _name_key(customer.prenom),
+        ) if key))
+        return (customer.id, keys, customer.id_loc, f"{customer.prenom} {customer.nom}")
+
+    def load(self, db):
+        """(Re)build the index from the cars and customers tables, then swap it in"""
+        start = time.perf_counter()
+        with self._lock:
+            self._loading = True
+            self._pending = []
+
+        try:
+            indexes = {}
+            for kind, query, to_row in (
+                ("car", select(Car.id, Car.num_imma, Car.marque, Car.modele), self.car_row),
+                ("customer", select(Customer.id, Customer.id_loc, Customer.nom, Customer.prenom), self.customer_row),
+            ):
+                result = db.execute(query.execution_options(yield_per=LOAD_CHUNK_SIZE))
+                indexes[kind] = PrefixIndex.build(kind, (to_row(row) for row in result))
+
+            with self._lock:
+                for kind, operation, argument in self._pending:
+                    if operation == "put":
+                        indexes[kind].put_many(argument)
+                    else:
+                        indexes[kind].remove(argument)
+                self._indexes = indexes
+                self._pending = []
+                self.loaded_at = datetime.utcnow()
+                self.load_seconds = round(time.perf_counter() - start, 3)
+        finally:
+            with self._lock:
+                self._loading = False
+
+    def _apply(self, kind: str, operation: str, argument):
+        if not self.active:
+            return
+        with self._lock:
+            if self._loading:
+                self._pending.append((kind, operation, argument))
+            if operation == "put":
+                self._indexes[kind].put_many(argument)
+            else:
+                self._indexes[kind].remove(argument)
+
+    def put_cars(self, cars):
+        """Index new or updated cars (ORM objects or rows with id, num_imma, marque, modele)"""
+        self._apply("car", "put", [self.car_row(car) for car in cars])
+
+    def remove_car(self, car_id: int):
+        self._apply("car", "remove", car_id)
+
+    def put_customers(self, customers):
+        """Index new or updated customers (ORM objects or rows with id, id_loc, nom, prenom)"""
+        self._apply("customer", "put", [self.customer_row(customer) for customer in customers])
+
+    def remove_customer(self, customer_id: int):
+        self._apply("customer", "remove", customer_id)
+
+    def search(self, query: str, types=AUTOCOMPLETE_TYPES, limit: int = 10) -> list:
+        """Top `limit` cars and/or customers whose plate, ID or name starts with the query"""
+        prefix = normalize_key(query)
+        if not prefix:
+            return []
+        with self._lock:
+            per_type = [self._indexes[kind].search(prefix, limit) for kind in types]
+        merged = heapq.merge(*per_type, key=lambda result: result[0])
+        return [item for _, item in list(merged)[:limit]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {f"{kind}s": len(index) for kind, index in self._indexes.items()}
+            entries = sum(index.entries for index in self._indexes.values())
+        return {
+            "ready": self.ready,
+            "loading": self._loading,
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+            "entries": entries,
+            **counts,
+        }
+
+
+autocomplete_index = AutocompleteIndex()
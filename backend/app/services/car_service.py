@@ -1,7 +1,27 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
+from app.events import event_bus
 from app.models.models import Car, CarStatus
-from app.schemas.schemas import CarCreate, CarUpdate
+from app.schemas.schemas import CarCreate, CarUpdate, image_url
+from app.services.autocomplete import autocomplete_index
+from app.services.stats_service import StatsService
+from app.services.version_service import VersionService
+
+
+def car_event_data(car) -> dict:
+    """Columns of a car as sent in change events"""
+    return {
+        "id": car.id,
+        "num_imma": car.num_imma,
+        "marque": car.marque,
+        "modele": car.modele,
+        "kilometrage": car.kilometrage,
+        "etat": car.etat,
+        "prix_location": car.prix_location,
+        "image_filename": car.image_filename,
+        "image_url": image_url(car.image_filename),
+    }
 
 
 class CarService:
@@ -12,8 +32,12 @@ class CarService:
         """Create a new car"""
         db_car = Car(**car.dict())
         db.add(db_car)
+        StatsService.apply_car_change(db, after=StatsService.car_contribution(db_car))
+        VersionService.bump(db, "cars")
         db.commit()
         db.refresh(db_car)
+        autocomplete_index.put_cars([db_car])
+        event_bus.publish("car.created", car_event_data(db_car))
         return db_car
 
     @staticmethod
@@ -29,18 +53,31 @@ class CarService:
     @staticmethod
     def get_all_cars(db: Session, skip: int = 0, limit: int = 100):
         """Get all cars with pagination"""
-        return db.query(Car).offset(skip).limit(limit).all()
+        return db.query(Car).order_by(Car.id).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def get_cars_after(db: Session, after_id: int = None, limit: int = 100):
+        """Get the next page of cars after a given ID (keyset pagination)"""
+        query = db.query(Car)
+        if after_id is not None:
+            query = query.filter(Car.id > after_id)
+        return query.order_by(Car.id).limit(limit).all()
 
     @staticmethod
     def update_car(db: Session, car_id: int, car_update: CarUpdate) -> Car:
         """Update car details"""
         db_car = db.query(Car).filter(Car.id == car_id).first()
         if db_car:
+            before = StatsService.car_contribution(db_car)
             update_data = car_update.dict(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_car, field, value)
+            StatsService.apply_car_change(db, before, StatsService.car_contribution(db_car))
+            VersionService.bump(db, "cars")
             db.commit()
             db.refresh(db_car)
+            autocomplete_index.put_cars([db_car])
+            event_bus.publish("car.updated", {"id": car_id, **update_data})
         return db_car
 
     @staticmethod
@@ -48,8 +85,12 @@ class CarService:
         """Delete a car"""
         db_car = db.query(Car).filter(Car.id == car_id).first()
         if db_car:
+            StatsService.apply_car_change(db, before=StatsService.car_contribution(db_car))
             db.delete(db_car)
+            VersionService.bump(db, "cars", "reservations")
             db.commit()
+            autocomplete_index.remove_car(car_id)
+            event_bus.publish("car.deleted", {"id": car_id})
             return True
         return False
 
@@ -83,3 +124,89 @@ class CarService:
     def get_total_cars(db: Session) -> int:
         """Count total cars"""
         return db.query(Car).count()
+
+
+class AsyncCarService:
+    """
+    CarService for AsyncSession (DATABASE_ASYNC routes).
+
+    Same statements and side effects (counters, table versions, autocomplete index,
+    events); the counter and version updates reuse the sync helpers through run_sync.
+    """
+
+    @staticmethod
+    async def create_car(db: AsyncSession, car: CarCreate) -> Car:
+        """Create a new car"""
+        db_car = Car(**car.dict())
+        db.add(db_car)
+        await db.run_sync(StatsService.apply_car_change, None, StatsService.car_contribution(db_car))
+        await db.run_sync(VersionService.bump, "cars")
+        await db.commit()
+        await db.refresh(db_car)
+        autocomplete_index.put_cars([db_car])
+        event_bus.publish("car.created", car_event_data(db_car))
+        return db_car
+
+    @staticmethod
+    async def get_car(db: AsyncSession, car_id: int) -> Car:
+        """Get car by ID"""
+        return await db.get(Car, car_id)
+
+    @staticmethod
+    async def get_car_by_imma(db: AsyncSession, num_imma: str) -> Car:
+        """Get car by license plate"""
+        return await db.scalar(select(Car).where(Car.num_imma == num_imma).limit(1))
+
+    @staticmethod
+    async def get_all_cars(db: AsyncSession, skip: int = 0, limit: int = 100):
+        """Get all cars with pagination"""
+        return (await db.scalars(select(Car).order_by(Car.id).offset(skip).limit(limit))).all()
+
+    @staticmethod
+    async def get_cars_after(db: AsyncSession, after_id: int = None, limit: int = 100):
+        """Get the next page of cars after a given ID (keyset pagination)"""
+        query = select(Car)
+        if after_id is not None:
+            query = query.where(Car.id > after_id)
+        return (await db.scalars(query.order_by(Car.id).limit(limit))).all()
+
+    @staticmethod
+    async def update_car(db: AsyncSession, car_id: int, car_update: CarUpdate) -> Car:
+        """Update car details"""
+        db_car = await db.get(Car, car_id)
+        if db_car:
+            before = StatsService.car_contribution(db_car)
+            update_data = car_update.dict(exclude_unset=True)
+            for field, value in update_data.items():
+                setattr(db_car, field, value)
+            await db.run_sync(StatsService.apply_car_change, before, StatsService.car_contribution(db_car))
+            await db.run_sync(VersionService.bump, "cars")
+            await db.commit()
+            await db.refresh(db_car)
+            autocomplete_index.put_cars([db_car])
+            event_bus.publish("car.updated", {"id": car_id, **update_data})
+        return db_car
+
+    @staticmethod
+    async def delete_car(db: AsyncSession, car_id: int) -> bool:
+        """Delete a car"""
+        db_car = await db.get(Car, car_id)
+        if db_car:
+            await db.run_sync(StatsService.apply_car_change, StatsService.car_contribution(db_car))
+            await db.delete(db_car)
+            await db.run_sync(VersionService.bump, "cars", "reservations")
+            await db.commit()
+            autocomplete_index.remove_car(car_id)
+            event_bus.publish("car.deleted", {"id": car_id})
+            return True
+        return False
+
+    @staticmethod
+    async def get_available_cars(db: AsyncSession):
+        """Get all available cars"""
+        return (await db.scalars(select(Car).where(Car.etat == CarStatus.AVAILABLE))).all()
+
+    @staticmethod
+    async def get_rented_cars(db: AsyncSession):
+        """Get all rented cars"""
+        return (await db.scalars(select(Car).where(Car.etat == CarStatus.RENTED))).all()
@@ -1,7 +1,20 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, tuple_
+from app.events import event_bus
 from app.models.models import Customer
 from app.schemas.schemas import CustomerCreate, CustomerUpdate
+from app.services.autocomplete import autocomplete_index
+from app.services.search_service import SearchService
+from app.services.version_service import VersionService
+
+
+def customer_event_data(customer) -> dict:
+    """Columns of a customer as sent in change events"""
+    return {
+        "id": customer.id, "id_loc": customer.id_loc, "nom": customer.nom,
+        "prenom": customer.prenom, "adresse": customer.adresse,
+    }
 
 
 class CustomerService:
@@ -12,8 +25,11 @@ class CustomerService:
         """Create a new customer"""
         db_customer = Customer(**customer.dict())
         db.add(db_customer)
+        VersionService.bump(db, "customers")
         db.commit()
         db.refresh(db_customer)
+        autocomplete_index.put_customers([db_customer])
+        event_bus.publish("customer.created", customer_event_data(db_customer))
         return db_customer
 
     @staticmethod
@@ -36,7 +52,15 @@ class CustomerService:
     @staticmethod
     def get_all_customers(db: Session, skip: int = 0, limit: int = 100):
         """Get all customers with pagination, sorted alphabetically"""
-        return db.query(Customer).order_by(Customer.nom, Customer.prenom).offset(skip).limit(limit).all()
+        return db.query(Customer).order_by(Customer.nom, Customer.prenom, Customer.id).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def get_customers_after(db: Session, after: tuple = None, limit: int = 100):
+        """Get the next page of customers after a given (nom, prenom, id) key (keyset pagination)"""
+        query = db.query(Customer)
+        if after is not None:
+            query = query.filter(tuple_(Customer.nom, Customer.prenom, Customer.id) > tuple_(*after))
+        return query.order_by(Customer.nom, Customer.prenom, Customer.id).limit(limit).all()
 
     @staticmethod
     def get_customers_sorted(db: Session):
@@ -44,14 +68,9 @@ class CustomerService:
         return db.query(Customer).order_by(Customer.nom, Customer.prenom).all()
 
     @staticmethod
-    def search_customers(db: Session, query: str):
-        """Search customers by name or ID"""
-        search_term = f"%{query}%"
-        return db.query(Customer).filter(
-            (Customer.nom.ilike(search_term)) |
-            (Customer.prenom.ilike(search_term)) |
-            (Customer.id_loc.ilike(search_term))
-        ).all()
+    def search_customers(db: Session, query: str, limit: int = 50):
+        """Search customers by name or ID prefix (full-text index, best matches first)"""
+        return SearchService.search_customers(db, query, limit)
 
     @staticmethod
     def update_customer(db: Session, customer_id: int, customer_update: CustomerUpdate) -> Customer:
@@ -61,8 +80,11 @@ class CustomerService:
             update_data = customer_update.dict(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_customer, field, value)
+            VersionService.bump(db, "customers")
             db.commit()
             db.refresh(db_customer)
+            autocomplete_index.put_customers([db_customer])
+            event_bus.publish("customer.updated", {"id": customer_id, **update_data})
         return db_customer
 
     @staticmethod
@@ -71,7 +93,10 @@ class CustomerService:
         db_customer = db.query(Customer).filter(Customer.id == customer_id).first()
         if db_customer:
             db.delete(db_customer)
+            VersionService.bump(db, "customers", "reservations")
             db.commit()
+            autocomplete_index.remove_customer(customer_id)
+            event_bus.publish("customer.deleted", {"id": customer_id})
             return True
         return False
 
@@ -79,3 +104,77 @@ class CustomerService:
     def get_total_customers(db: Session) -> int:
         """Count total customers"""
         return db.query(Customer).count()
+
+
+class AsyncCustomerService:
+    """CustomerService for AsyncSession (DATABASE_ASYNC routes)"""
+
+    @staticmethod
+    async def create_customer(db: AsyncSession, customer: CustomerCreate) -> Customer:
+        """Create a new customer"""
+        db_customer = Customer(**customer.dict())
+        db.add(db_customer)
+        await db.run_sync(VersionService.bump, "customers")
+        await db.commit()
+        await db.refresh(db_customer)
+        autocomplete_index.put_customers([db_customer])
+        event_bus.publish("customer.created", customer_event_data(db_customer))
+        return db_customer
+
+    @staticmethod
+    async def get_customer(db: AsyncSession, customer_id: int) -> Customer:
+        """Get customer by ID"""
+        return await db.get(Customer, customer_id)
+
+    @staticmethod
+    async def get_customer_by_id_loc(db: AsyncSession, id_loc: str) -> Customer:
+        """Get customer by customer ID"""
+        return await db.scalar(select(Customer).where(Customer.id_loc == id_loc).limit(1))
+
+    @staticmethod
+    async def get_all_customers(db: AsyncSession, skip: int = 0, limit: int = 100):
+        """Get all customers with pagination, sorted alphabetically"""
+        return (await db.scalars(
+            select(Customer).order_by(Customer.nom, Customer.prenom, Customer.id).offset(skip).limit(limit)
+        )).all()
+
+    @staticmethod
+    async def get_customers_after(db: AsyncSession, after: tuple = None, limit: int = 100):
+        """Get the next page of customers after a given (nom, prenom, id) key (keyset pagination)"""
+        query = select(Customer)
+        if after is not None:
+            query = query.where(tuple_(Customer.nom, Customer.prenom, Customer.id) > tuple_(*after))
+        return (await db.scalars(query.order_by(Customer.nom, Customer.prenom, Customer.id).limit(limit))).all()
+
+    @staticmethod
+    async def search_customers(db: AsyncSession, query: str, limit: int = 50):
+        """Search customers by name or ID prefix (full-text index, best matches first)"""
+        return await db.run_sync(SearchService.search_customers, query, limit)
+
+    @staticmethod
+    async def update_customer(db: AsyncSession, customer_id: int, customer_update: CustomerUpdate) -> Customer:
+        """Update customer details"""
+        db_customer = await db.get(Customer, customer_id)
+        if db_customer:
+            update_data = customer_update.dict(exclude_unset=True)
+            for field, value in update_data.items():
+                setattr(db_customer, field, value)
+            await db.run_sync(VersionService.bump, "customers")
+            await db.commit()
+            await db.refresh(db_customer)
+            autocomplete_index.put_customers([db_customer])
+            event_bus.publish("customer.updated", {"id": customer_id, **update_data})
+        return db_customer
+
+    @staticmethod
+    async def delete_customer(db: AsyncSession, customer_id: int) -> bool:
+        """Delete a customer"""
+        db_customer = await db.get(Customer, customer_id)
+        if db_customer:
+            await db.delete(db_customer)
+            await db.run_sync(VersionService.bump, "customers", "reservations")
+            await db.commit()
+            autocomplete_index.remove_customer(customer_id)
+            event_bus.publish("customer.deleted", {"id": customer_id})
+            return True
+        return False
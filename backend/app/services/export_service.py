@@ -0,0 +1,108 @@
+from datetime import date, datetime, time
+import csv
+import enum
+import io
+import json
+
+from sqlalchemy import select
+
+from app.database import ReadSessionLocal
+from app.models.models import Car, Customer, Rental
+
+EXPORT_ENTITIES = ("cars", "customers", "rentals")
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value):
+    """Column value as written to the export (ISO dates, enum values)"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _as_datetime(value):
+    """A date filter as a datetime (a plain date means midnight)"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time.min)
+
+
+class ExportService:
+    """Service layer for streaming table exports"""
+
+    @staticmethod
+    def build_query(entity: str, date_from: date = None, date_to: date = None):
+        """
+        Column-only SELECT for an export, in primary-key order.
+
+        Rentals also carry the car plate and customer ID (the keys used by the bulk
+        import) and can be limited to those started in [date_from, date_to).
+        """
+        if entity == "cars":
+            return select(
+                Car.id, Car.num_imma, Car.marque, Car.modele, Car.kilometrage,
+                Car.etat, Car.prix_location, Car.image_filename
+            ).order_by(Car.id)
+        if entity == "customers":
+            return select(
+                Customer.id, Customer.id_loc, Customer.nom, Customer.prenom, Customer.adresse
+            ).order_by(Customer.id)
+        if entity == "rentals":
+            query = (
+                select(
+                    Rental.id, Rental.car_id, Car.num_imma, Rental.customer_id, Customer.id_loc,
+                    Rental.date_debut, Rental.date_fin, Rental.date_retour, Rental.prix_location, Rental.kilometrage
+                )
+                .outerjoin(Car, Car.id == Rental.car_id)
+                .outerjoin(Customer, Customer.id == Rental.customer_id)
+                .order_by(Rental.id)
+            )
+            if date_from is not None:
+                query = query.where(Rental.date_debut >= _as_datetime(date_from))
+            if date_to is not None:
+                query = query.where(Rental.date_debut < _as_datetime(date_to))
+            return query
+        raise ValueError(f"Unknown export entity: {entity}")
+
+    @staticmethod
+    def stream(entity: str, fmt: str = "ndjson", batch_size: int = 1000,
+               date_from: date = None, date_to: date = None):
+        """
+        Yield an export as text chunks, one chunk per batch_size rows.
+
+        Rows are fetched from the cursor batch by batch (yield_per) as plain tuples and
+        encoded directly, without ORM objects or response models, so memory does not
+        grow with the table. The generator owns its session, which stays open only
+        while it is being consumed.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        query = ExportService.build_query(entity, date_from, date_to)
+
+        db = ReadSessionLocal()
+        try:
+            result = db.execute(query.execution_options(yield_per=batch_size))
+            keys = list(result.keys())
+
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(keys)
+                for rows in result.partitions():
+                    writer.writerows([_plain(value) for value in row] for row in rows)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue()
+                return
+
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(keys, row)), default=_plain, ensure_ascii=False) + "\n" for row in rows
+                )
+        finally:
+            db.close()
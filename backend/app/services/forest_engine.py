@@ -0,0 +1,107 @@
+"""
+Moteur d'inférence NumPy pour la forêt de prix.
+
+Les arbres d'un RandomForestRegressor entraîné sont aplatis dans des tableaux
+contigus (feature, seuil, fils gauche, fils droit, valeur) et parcourus niveau par
+niveau pour toutes les lignes et tous les arbres à la fois. L'inférence n'a donc
+besoin ni de scikit-learn ni de son coût fixe par appel.
+"""
+import os
+
+import numpy as np
+
+_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+
+class FlatForest:
+    """Forêt de régression stockée sous forme de tableaux de noeuds plats"""
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth: int, n_features_in: int):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features_in)
+        # Fils gauche et droit entrelacés: le fils de `node` est _children[2 * node + va_a_droite]
+        self._children = np.column_stack([self.left, self.right]).ravel()
+
+    @classmethod
+    def from_sklearn(cls, model) -> "FlatForest":
+        """Aplatit un RandomForestRegressor (ou un arbre de régression) entraîné"""
+        estimators = getattr(model, "estimators_", [model])
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            nodes = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            # Une feuille pointe sur elle-même: le parcours s'y arrête naturellement
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            np.concatenate(features), np.concatenate(thresholds),
+            np.concatenate(lefts), np.concatenate(rights),
+            np.concatenate(values), np.asarray(roots),
+            max_depth, model.n_features_in_
+        )
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        """Taille des tableaux de noeuds en mémoire"""
+        return sum(getattr(self, name).nbytes for name in _ARRAYS)
+
+    def apply(self, X) -> np.ndarray:
+        """Indice de la feuille atteinte par chaque ligne dans chaque arbre (n_lignes x n_arbres)"""
+        # Comme scikit-learn, comparer les features converties en float32 aux seuils float64
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self._children[2 * nodes + 1 - go_left]
+        return nodes
+
+    def predict(self, X) -> np.ndarray:
+        """Prédiction moyenne des arbres, même interface que RandomForestRegressor.predict"""
+        X = np.atleast_2d(X)
+        return self.value[self.apply(X)].mean(axis=1)
+
+    def save(self, path: str):
+        """Écrit la forêt au format .npz (écriture atomique)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                max_depth=self.max_depth,
+                n_features_in=self.n_features_in_,
+                **{name: getattr(self, name) for name in _ARRAYS}
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "FlatForest":
+        """Charge une forêt écrite par save()"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                *(data[name] for name in _ARRAYS),
+                max_depth=int(data["max_depth"]),
+                n_features_in=int(data["n_features_in"])
+            )
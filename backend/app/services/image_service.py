@@ -0,0 +1,164 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+from sqlalchemy.orm import Session
+
+from app.events import event_bus
+from app.models.models import Car
+from app.schemas.schemas import image_url
+from app.services.image_variants import DerivativeCache
+from app.services.version_service import VersionService
+
+# Directory of the uploaded car images
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(os.path.dirname(__file__), '../../uploads/cars'))
+
+# Largest image accepted, in bytes
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(5 * 1024 * 1024)))
+
+# Allowed extensions
+ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
+
+# Media type of each allowed extension
+IMAGE_MEDIA_TYPES = {
+    'jpg': 'image/jpeg', 'jpeg': 'image/jpeg', 'png': 'image/png', 'gif': 'image/gif', 'webp': 'image/webp'
+}
+
+# Bytes copied per read from the uploaded file
+COPY_CHUNK_SIZE = 256 * 1024
+
+# Directory of the resized variants (thumbnails, WebP), and its size limit in bytes
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(UPLOAD_DIR, os.pardir, "variants"))
+IMAGE_CACHE_BYTES = int(os.getenv("IMAGE_CACHE_BYTES", str(256 * 1024 * 1024)))
+
+# Threads rendering variants (each holds one decoded image in memory)
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+
+class ImageError(Exception):
+    """An image could not be stored"""
+
+
+class ImageTooLargeError(ImageError):
+    """The image is over IMAGE_MAX_BYTES"""
+
+
+def allowed_file(filename: str) -> bool:
+    """Check if file extension is allowed"""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def image_path(filename: str) -> str:
+    return os.path.join(UPLOAD_DIR, filename)
+
+
+derivative_cache = DerivativeCache(os.path.normpath(IMAGE_CACHE_DIR), IMAGE_CACHE_BYTES, IMAGE_WORKERS)
+
+# Serializes placing, linking and deleting files (shared by cars with identical images)
+_files_lock = threading.Lock()
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ImageService:
+    """
+    Service layer for car images.
+
+    Originals are content addressed: an image is stored once under the SHA-256 of
+    its bytes, and cars uploading the same photo share the file. A file is deleted
+    when no car points to it any more.
+
+    Blocking calls (file copy, rename, database): the image routes are sync and run
+    in the thread pool, so an upload never holds the event loop.
+    """
+
+    @staticmethod
+    def receive_upload(source, filename: str) -> tuple:
+        """
+        Copy an uploaded file to a temporary file in UPLOAD_DIR chunk by chunk,
+        hashing it on the way; returns (temporary path, content-addressed name).
+
+        Raises ImageTooLargeError past IMAGE_MAX_BYTES.
+        """
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        extension = filename.rsplit('.', 1)[1].lower()
+        extension = "jpg" if extension == "jpeg" else extension
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=UPLOAD_DIR, prefix=".upload-", suffix=".part")
+        try:
+            size = 0
+            with os.fdopen(fd, "wb") as out:
+                while chunk := source.read(COPY_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > IMAGE_MAX_BYTES:
+                        raise ImageTooLargeError()
+                    digest.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            _remove_quietly(temp_path)
+            raise
+        return temp_path, f"{digest.hexdigest()}.{extension}"
+
+    @staticmethod
+    def _place(temp_path: str, name: str) -> bool:
+        """Move a received file under its name, or drop it if that content is already stored"""
+        if os.path.exists(image_path(name)):
+            _remove_quietly(temp_path)
+            return False
+        # A partial upload never shows up under a real name: the file is renamed once complete
+        os.replace(temp_path, image_path(name))
+        return True
+
+    @staticmethod
+    def _release_locked(db: Session, filename: str):
+        if db.query(Car.id).filter(Car.image_filename == filename).first() is None:
+            _remove_quietly(image_path(filename))
+            derivative_cache.discard_source(filename)
+
+    @staticmethod
+    def release_file(db: Session, filename: str):
+        """Delete an image file (and its variants) if no car uses it any more"""
+        with _files_lock:
+            ImageService._release_locked(db, filename)
+
+    @staticmethod
+    def set_car_image(db: Session, car: Car, source, filename: str) -> str:
+        """
+        Store an uploaded image as the car's image; returns its file name.
+
+        The previous file is only deleted once the database points to the new one.
+        Placing the file and committing happen under one lock, so that a file is
+        never deleted while another upload of the same content is being linked to it.
+        """
+        temp_path, stored = ImageService.receive_upload(source, filename)
+        previous = car.image_filename
+        with _files_lock:
+            ImageService._place(temp_path, stored)
+            try:
+                car.image_filename = stored
+                VersionService.bump(db, "cars")
+                db.commit()
+            except BaseException:
+                db.rollback()
+                ImageService._release_locked(db, stored)
+                raise
+        if previous and previous != stored:
+            ImageService.release_file(db, previous)
+        event_bus.publish("car.updated", {"id": car.id, "image_filename": stored, "image_url": image_url(stored)})
+        return stored
+
+    @staticmethod
+    def delete_car_image(db: Session, car: Car):
+        """Clear the car's image, then delete its file if no other car uses it"""
+        previous = car.image_filename
+        car.image_filename = None
+        VersionService.bump(db, "cars")
+        db.commit()
+        ImageService.release_file(db, previous)
+        event_bus.publish("car.updated", {"id": car.id, "image_filename": None, "image_url": None})
@@ -0,0 +1,236 @@
+"""
+Resized and re-encoded variants of car images, generated on demand.
+
+A variant is named after its source file (content addressed), width and format,
+so it never goes stale: it is rendered once by a small worker pool, then served
+from a cache directory bounded by size, least recently used variants first out.
+
+Pillow is optional: without it (or for a file it cannot decode) no variant is
+made and the caller serves the original.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Widths a variant can have: requested widths are rounded up to one of these so
+# that arbitrary values cannot fill the cache
+VARIANT_WIDTHS = (160, 320, 640, 1280)
+
+# Output formats and their media types
+VARIANT_FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg", "png": "image/png"}
+
+# EXIF orientations that swap width and height
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+class VariantUnavailable(Exception):
+    """No variant can be made (Pillow missing, or the source cannot be decoded)"""
+
+
+def snap_width(width: int) -> int:
+    """Smallest variant width at least as large as the requested one"""
+    return next((w for w in VARIANT_WIDTHS if w >= width), VARIANT_WIDTHS[-1])
+
+
+def negotiate_format(accept: str, source_filename: str) -> str:
+    """WebP for clients that accept it, otherwise the closest format to the source"""
+    if "image/webp" in (accept or ""):
+        return "webp"
+    return "png" if source_filename.rsplit(".", 1)[-1].lower() in ("png", "gif") else "jpeg"
+
+
+def variant_name(source_filename: str, width: int, fmt: str) -> str:
+    stem = source_filename.rsplit(".", 1)[0]
+    return f"{stem}-w{width}.{'jpg' if fmt == 'jpeg' else fmt}"
+
+
+def _pillow():
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        raise VariantUnavailable("Pillow is not installed")
+    return Image, ImageOps
+
+
+@lru_cache(maxsize=1)
+def pillow_available() -> bool:
+    try:
+        _pillow()
+    except VariantUnavailable:
+        logger.warning("Pillow is not installed: image variants are disabled, originals are served")
+        return False
+    return True
+
+
+def render_variant(source_path: str, target_path: str, width: int, fmt: str):
+    """Write source_path scaled down to `width` pixels wide (never up) in format fmt"""
+    Image, ImageOps = _pillow()
+    try:
+        with Image.open(source_path) as img:
+            transposed = img.getexif().get(0x0112) in _TRANSPOSED_ORIENTATIONS
+            src_width, src_height = (img.height, img.width) if transposed else img.size
+            height = max(1, round(src_height * width / src_width))
+            if img.format == "JPEG":
+                # Let the decoder downscale by a power of two: most of the work for large photos
+                img.draft("RGB", (height, width) if transposed else (width, height))
+            img = ImageOps.exif_transpose(img)
+            if img.width > width:
+                img = img.resize((width, height), Image.Resampling.LANCZOS)
+
+            has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+            if fmt == "jpeg" or not has_alpha:
+                img = img.convert("RGB")
+            elif img.mode != "RGBA":
+                img = img.convert("RGBA")
+
+            options = {
+                "webp": {"quality": 80, "method": 4},
+                "jpeg": {"quality": 82, "optimize": True, "progressive": True},
+                "png": {"optimize": True},
+            }[fmt]
+            img.save(target_path, format=fmt.upper(), **options)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise VariantUnavailable(f"Cannot render {os.path.basename(source_path)}: {e}")
+
+
+class DerivativeCache:
+    """
+    Directory of rendered variants, bounded by total size with LRU eviction.
+
+    Concurrent requests for a variant that is not rendered yet wait for a single
+    rendering. The worker pool bounds how many images are decoded at once (a large
+    photo takes tens of MB while it is decoded). The recency order is kept in
+    memory; after a restart it starts from the files' modification times. Each
+    worker process accounts for the variants it knows about, so with several
+    processes the directory can go over the limit until they evict.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, workers: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._rendering = {}
+        # Variants whose source cannot be decoded (sources are content addressed: it will not change)
+        self._failed = set()
+        self._executor = None
+        self._loaded = False
+        self.size = 0
+        self.hits = 0
+        self.renders = 0
+        self.failures = 0
+        self.evictions = 0
+
+    def _load_locked(self):
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.endswith(".part"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self.size += size
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image")
+        self._loaded = True
+        self._evict_locked()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def get(self, source_path: str, source_filename: str, width: int, fmt: str) -> str:
+        """
+        Path of the variant, rendered first if needed (blocks until it is ready).
+
+        Raises VariantUnavailable if it cannot be rendered.
+        """
+        if not pillow_available():
+            raise VariantUnavailable("Pillow is not installed")
+        name = variant_name(source_filename, width, fmt)
+        with self._lock:
+            if not self._loaded:
+                self._load_locked()
+            if name in self._failed:
+                raise VariantUnavailable(f"Cannot render {source_filename}")
+            if name in self._entries:
+                if os.path.exists(self.path(name)):
+                    self._entries.move_to_end(name)
+                    self.hits += 1
+                    return self.path(name)
+                # Evicted by another worker process
+                self.size -= self._entries.pop(name)
+            future = self._rendering.get(name)
+            if future is None:
+                future = self._executor.submit(self._render, name, source_path, width, fmt)
+                self._rendering[name] = future
+        return future.result()
+
+    def _render(self, name: str, source_path: str, width: int, fmt: str) -> str:
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".variant-", suffix=".part")
+        os.close(fd)
+        try:
+            render_variant(source_path, temp_path, width, fmt)
+            os.replace(temp_path, self.path(name))
+            size = os.path.getsize(self.path(name))
+        except BaseException as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            with self._lock:
+                self._rendering.pop(name, None)
+                self.failures += 1
+                if isinstance(e, VariantUnavailable):
+                    self._failed.add(name)
+            if isinstance(e, VariantUnavailable):
+                logger.warning(str(e))
+            raise
+        with self._lock:
+            self._rendering.pop(name, None)
+            self._entries[name] = size
+            self.size += size
+            self.renders += 1
+            self._evict_locked()
+        return self.path(name)
+
+    def _evict_locked(self):
+        # The most recent variant is kept even if it is larger than the whole budget
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            try:
+                os.remove(self.path(name))
+            except FileNotFoundError:
+                pass
+
+    def discard_source(self, source_filename: str):
+        """Delete the variants of a source image that was deleted"""
+        prefix = source_filename.rsplit(".", 1)[0] + "-w"
+        with self._lock:
+            self._failed = {name for name in self._failed if not name.startswith(prefix)}
+            for name in [name for name in self._entries if name.startswith(prefix)]:
+                self.size -= self._entries.pop(name)
+                try:
+                    os.remove(self.path(name))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "variants": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "renders": self.renders,
+                "failures": self.failures,
+                "evictions": self.evictions,
+                "rendering": len(self._rendering),
+            }
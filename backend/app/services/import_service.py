@@ -0,0 +1,317 @@
+from collections import Counter
+from datetime import datetime
+import csv
+import json
+import os
+import time
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.events import event_bus
+from app.models.models import Car, Customer, Rental, CarStatus
+from app.schemas.schemas import CarCreate, CustomerCreate, RentalImport
+from app.services.autocomplete import autocomplete_index
+from app.services.stats_service import StatsService
+from app.services.version_service import VersionService
+
+IMPORT_ENTITIES = ("cars", "customers", "rentals")
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# File extensions and content types recognised when no format is given
+_EXTENSION_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+_CONTENT_TYPE_FORMATS = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}
+
+# Maximum number of rejected rows listed in a report (all of them are counted)
+MAX_ERROR_ROWS = 1000
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+
+class ImportService:
+    """Service layer for bulk imports of cars, customers and rentals"""
+
+    @staticmethod
+    def detect_format(filename: str = None, content_type: str = None) -> str:
+        """Guess the import format from a file name or content type (None if unknown)"""
+        if filename:
+            fmt = _EXTENSION_FORMATS.get(os.path.splitext(filename)[1].lower())
+            if fmt:
+                return fmt
+        if content_type:
+            return _CONTENT_TYPE_FORMATS.get(content_type.split(";")[0].strip().lower())
+        return None
+
+    @staticmethod
+    def decode_lines(stream):
+        """
+        Decode a binary stream as UTF-8 one line at a time (a leading BOM is dropped).
+
+        An invalid byte raises UnicodeDecodeError once every line before it has been
+        returned, so the import reports the line it is on (a text stream decodes whole
+        blocks ahead of the parser).
+        """
+        for number, line in enumerate(stream):
+            text = line.decode("utf-8")
+            yield text[1:] if number == 0 and text.startswith("\ufeff") else text
+
+    @staticmethod
+    def iter_records(stream, fmt: str):
+        """
+        Parse a text stream lazily into (line number, record) pairs.
+
+        The stream is any iterable of lines, such as a text file or decode_lines. A
+        record is a dict of raw field values, or an error message for a line that
+        could not be parsed. Empty CSV cells are dropped so schema defaults apply.
+        """
+        if fmt == "csv":
+            reader = csv.DictReader(stream)
+            for row in reader:
+                if None in row:
+                    yield reader.line_num, "more fields than the header"
+                    continue
+                yield reader.line_num, {key: value for key, value in row.items() if value not in ("", None)}
+            return
+
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, "expected a JSON object"
+                continue
+            yield line_number, record
+
+    @staticmethod
+    def _reject_duplicates(db: Session, column, key: str, chunk: list, seen: set, added: set):
+        """
+        Split a chunk into new rows and rows whose key is already in the import (seen in
+        the previous chunks or added by this one) or in the table
+        """
+        keys = {getattr(item, key) for _, item in chunk}
+        existing = set(db.scalars(select(column).where(column.in_(keys))))
+        accepted = []
+        errors = []
+        for line, item in chunk:
+            value = getattr(item, key)
+            if value in seen or value in added:
+                errors.append((line, f"duplicate {key} '{value}' in the import"))
+            elif value in existing:
+                errors.append((line, f"{key} '{value}' already exists"))
+            else:
+                added.add(value)
+                accepted.append((line, item))
+        return accepted, errors
+
+    @staticmethod
+    def _import_cars(db: Session, chunk: list, seen: set, added: set, dry_run: bool):
+        accepted, errors = ImportService._reject_duplicates(db, Car.num_imma, "num_imma", chunk, seen, added)
+        if accepted and not dry_run:
+            db.execute(insert(Car), [item.model_dump() for _, item in accepted])
+            deltas = Counter()
+            for _, item in accepted:
+                deltas.update(StatsService.car_contribution(item))
+            StatsService.apply(db, **deltas)
+            VersionService.bump(db, "cars")
+        return accepted, errors
+
+    @staticmethod
+    def _import_customers(db: Session, chunk: list, seen: set, added: set, dry_run: bool):
+        accepted, errors = ImportService._reject_duplicates(db, Customer.id_loc, "id_loc", chunk, seen, added)
+        if accepted and not dry_run:
+            db.execute(insert(Customer), [item.model_dump() for _, item in accepted])
+            VersionService.bump(db, "customers")
+        return accepted, errors
+
+    @staticmethod
+    def _import_rentals(db: Session, chunk: list, rented_car_ids: set, added: set, dry_run: bool):
+        """
+        Resolve plates and customer IDs with one query each and insert the rentals.
+
+        A rental without date_retour is still active: its car must be available (in the
+        table and in the import so far) and is marked rented in the same transaction.
+        """
+        plates = {item.num_imma for _, item in chunk}
+        id_locs = {item.id_loc for _, item in chunk}
+        cars = {
+            row.num_imma: row
+            for row in db.execute(select(Car.id, Car.num_imma, Car.etat).where(Car.num_imma.in_(plates)))
+        }
+        customers = dict(db.execute(select(Customer.id_loc, Customer.id).where(Customer.id_loc.in_(id_locs))).all())
+
+        now = datetime.utcnow()
+        accepted = []
+        errors = []
+        rows = []
+        newly_rented = []
+        for line, item in chunk:
+            car = cars.get(item.num_imma)
+            if car is None:
+                errors.append((line, f"car '{item.num_imma}' not found"))
+                continue
+            customer_id = customers.get(item.id_loc)
+            if customer_id is None:
+                errors.append((line, f"customer '{item.id_loc}' not found"))
+                continue
+            date_debut = item.date_debut or now
+            if item.date_retour is not None and item.date_retour < date_debut:
+                errors.append((line, "date_retour is before date_debut"))
+                continue
+            if item.date_retour is None:
+                if car.etat != CarStatus.AVAILABLE or car.id in rented_car_ids or car.id in added:
+                    errors.append((line, f"car '{item.num_imma}' is not available for rental"))
+                    continue
+                added.add(car.id)
+                newly_rented.append(car.id)
+            accepted.append((line, item))
+            rows.append({
+                "car_id": car.id,
+                "customer_id": customer_id,
+                "date_debut": date_debut,
+                "date_fin": item.date_fin,
+                "date_retour": item.date_retour,
+                "prix_location": item.prix_location,
+                "kilometrage": item.kilometrage,
+            })
+
+        if rows and not dry_run:
+            db.execute(insert(Rental), rows)
+            VersionService.bump(db, "rentals")
+            if newly_rented:
+                db.execute(
+                    update(Car)
+                    .where(Car.id.in_(newly_rented))
+                    .values(etat=CarStatus.RENTED)
+                    .execution_options(synchronize_session=False)
+                )
+                StatsService.apply(db, available_cars=-len(newly_rented), rented_cars=len(newly_rented))
+                VersionService.bump(db, "cars")
+        return accepted, errors
+
+    @staticmethod
+    def _index_imported(db: Session, entity: str, accepted: list):
+        """Add committed cars and customers to the autocomplete index (one query per chunk)"""
+        if not accepted or not autocomplete_index.active:
+            return
+        if entity == "cars":
+            plates = [item.num_imma for _, item in accepted]
+            autocomplete_index.put_cars(db.execute(
+                select(Car.id, Car.num_imma, Car.marque, Car.modele).where(Car.num_imma.in_(plates))
+            ).all())
+        elif entity == "customers":
+            id_locs = [item.id_loc for _, item in accepted]
+            autocomplete_index.put_customers(db.execute(
+                select(Customer.id, Customer.id_loc, Customer.nom, Customer.prenom).where(Customer.id_loc.in_(id_locs))
+            ).all())
+
+    @staticmethod
+    def import_records(db: Session, entity: str, records, fmt: str = "ndjson", chunk_size: int = 1000,
+                       dry_run: bool = False) -> dict:
+        """
+        Validate and insert a stream of (line number, record) pairs.
+
+        Rows are validated with the entity's Pydantic schema, then handled chunk_size
+        at a time: duplicates are detected against the import so far and against the
+        table with one IN query per chunk, valid rows are inserted with one executemany
+        INSERT and the chunk is committed. Rejected rows are reported by line number.
+        With dry_run, every check runs but nothing is written.
+
+        A stream that is not valid UTF-8 (see decode_lines) stops the import at the line
+        that fails to decode: the rows before it are imported (earlier chunks are
+        already committed) and that line is reported as an error.
+        """
+        if entity not in IMPORT_ENTITIES:
+            raise ValueError(f"Unknown import entity: {entity}")
+        schema, handler = {
+            "cars": (CarCreate, ImportService._import_cars),
+            "customers": (CustomerCreate, ImportService._import_customers),
+            "rentals": (RentalImport, ImportService._import_rentals),
+        }[entity]
+
+        start = time.perf_counter()
+        received = 0
+        valid = 0
+        failed = 0
+        errors = []
+        seen = set()
+        chunk = []
+
+        def reject(rejected: list):
+            nonlocal failed
+            failed += len(rejected)
+            for line, message in rejected[:MAX_ERROR_ROWS - len(errors)]:
+                errors.append({"line": line, "error": message})
+
+        def flush():
+            nonlocal valid
+            # Keys claimed by this chunk only join seen once it is committed: a chunk
+            # rolled back on an IntegrityError leaves them free for the next chunks
+            added = set()
+            try:
+                accepted, rejected = handler(db, chunk, seen, added, dry_run)
+                if dry_run:
+                    db.rollback()
+                else:
+                    db.commit()
+                    ImportService._index_imported(db, entity, accepted)
+                seen.update(added)
+            except IntegrityError as e:
+                db.rollback()
+                accepted, rejected = [], [(line, f"database error: {e.orig}") for line, _ in chunk]
+            valid += len(accepted)
+            reject(rejected)
+            chunk.clear()
+
+        line = 0
+        records = iter(records)
+        while True:
+            try:
+                line, record = next(records)
+            except StopIteration:
+                break
+            except UnicodeDecodeError as e:
+                received += 1
+                reject([(line + 1, f"not valid UTF-8 ({e.reason}), import stopped at this line")])
+                break
+            received += 1
+            if isinstance(record, str):
+                reject([(line, record)])
+                continue
+            try:
+                chunk.append((line, schema.model_validate(record)))
+            except ValidationError as e:
+                reject([(line, _format_validation_error(e))])
+                continue
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+
+        errors.sort(key=lambda error: error["line"])
+        if valid and not dry_run:
+            # A single event for the whole import: clients reload the affected list
+            event_bus.publish("import.completed", {"entity": entity, "inserted": valid})
+        seconds = time.perf_counter() - start
+        return {
+            "entity": entity,
+            "format": fmt,
+            "dry_run": dry_run,
+            "received": received,
+            "valid": valid,
+            "inserted": 0 if dry_run else valid,
+            "failed": failed,
+            "errors": errors,
+            "errors_truncated": failed > len(errors),
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(received / seconds, 1) if seconds else 0.0,
+        }
@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import logging
+import os
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Number of background worker threads for long-running jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+
+# Number of finished jobs kept in memory for status queries
+MAX_FINISHED_JOBS = 100
+
+
+class Job:
+    """A long-running task executed by the background worker"""
+
+    def __init__(self, kind: str, params: dict):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = "pending"
+        self.processed = 0
+        self.total = None
+        self.result = None
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+
+    def report_progress(self, processed: int, total: int = None):
+        """Record job progress"""
+        self.processed = processed
+        if total is not None:
+            self.total = total
+
+    def to_dict(self) -> dict:
+        """Serialize the job state"""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "processed": self.processed,
+            "total": self.total,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """Runs jobs on a small thread pool and keeps track of their state"""
+
+    def __init__(self, max_workers: int = JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, func, **params) -> Job:
+        """Schedule func(job, **params) in the background and return the job"""
+        job = Job(kind, params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, func, params)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """Get job by ID"""
+        return self._jobs.get(job_id)
+
+    def list(self) -> list:
+        """Get all known jobs, most recent first"""
+        return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def _run(self, job: Job, func, params: dict):
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        try:
+            job.result = func(job, **params)
+            job.status = "completed"
+        except Exception as e:
+            logger.exception(f"Job {job.kind} {job.id} failed")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.utcnow()
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.finished_at is not None]
+        if len(finished) > MAX_FINISHED_JOBS:
+            finished.sort(key=lambda job: job.finished_at)
+            for job in finished[:len(finished) - MAX_FINISHED_JOBS]:
+                del self._jobs[job.id]
+
+
+job_manager = JobManager()
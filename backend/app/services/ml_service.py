@@ -1,62 +1,148 @@
-import joblib
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import LabelEncoder
+import glob
+import hashlib
+import json
 import os
 import logging
+import shutil
+import threading
+import time
+from datetime import datetime
+
+from app.metrics import ML_INFERENCE_SECONDS
+from app.services.forest_engine import FlatForest
+from app.services.prediction_cache import prediction_cache
 
 logger = logging.getLogger(__name__)
 
 # Chemin du modèle
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "../../models/price_model.pkl")
 ENCODER_PATH = os.path.join(os.path.dirname(__file__), "../../models/encoder.pkl")
+FLAT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "../../models/price_model.npz")
+
+# Moteur d'inférence: "flat" (tableaux NumPy, sans scikit-learn) ou "sklearn"
+ML_ENGINE = os.getenv("ML_ENGINE", "flat")
+
+# Intervalle minimal (secondes) entre deux vérifications de l'artefact sur disque
+MODEL_CHECK_INTERVAL = float(os.getenv("ML_MODEL_CHECK_INTERVAL", "2.0"))
+
+# Entraînement: nombre de workers (-1 = tous les coeurs) et pool joblib ("threading" ou "loky")
+TRAIN_N_JOBS = int(os.getenv("ML_TRAIN_N_JOBS", "-1"))
+TRAIN_BACKEND = os.getenv("ML_TRAIN_BACKEND", "threading")
+
+# Nombre d'artefacts versionnés conservés dans le dossier des modèles
+MODEL_KEEP_VERSIONS = int(os.getenv("ML_KEEP_VERSIONS", "5"))
 
 # Marques communes
 MARQUES = ["Toyota", "Honda", "Ford", "Peugeot", "Renault", "BMW", "Mercedes", "Audi", "Volkswagen", "Nissan"]
+_MARQUE_INDEX = {marque: idx for idx, marque in enumerate(MARQUES)}
+
+
+def generate_synthetic_data():
+    """
+    Génère la grille de données synthétiques d'entraînement (marques x kilométrages x années)
+
+    Returns:
+        (X, y): features [marque_encoded, kilométrage, âge] et prix cibles
+    """
+    marque_idx, km, annee = np.meshgrid(
+        np.arange(len(MARQUES)),
+        np.arange(10000, 200000, 20000),
+        np.arange(2015, 2024),
+        indexing="ij"
+    )
+    age_voiture = 2026 - annee
+
+    # Logique de prix
+    prix = 50 - (km * 0.01) - (age_voiture * 2) + (marque_idx * 3)
+    prix = np.maximum(prix, 20)  # Prix minimum
+
+    X = np.column_stack([marque_idx.ravel(), km.ravel(), age_voiture.ravel()]).astype(np.float64)
+    return X, prix.ravel().astype(np.float64)
+
+
+def fit_model(X, y, n_jobs: int = TRAIN_N_JOBS, backend: str = TRAIN_BACKEND):
+    """Entraîne la forêt sur (X, y) avec un pool de threads ou de processus configurable"""
+    # Imports différés: scikit-learn n'est chargé qu'au premier besoin
+    from joblib import parallel_backend
+    from sklearn.ensemble import RandomForestRegressor
+
+    model = RandomForestRegressor(
+        n_estimators=50,  # Léger
+        max_depth=10,
+        random_state=42,
+        n_jobs=n_jobs
+    )
+    with parallel_backend(backend, n_jobs=n_jobs):
+        model.fit(X, y)
+    return model
+
+
+def save_model(model, metadata: dict = None) -> str:
+    """
+    Sauvegarde le modèle sous un artefact versionné puis le publie comme modèle courant
+
+    La publication est atomique (copie temporaire + rename): le registre ne voit jamais
+    un fichier partiel et recharge le nouveau modèle à sa prochaine vérification.
+
+    Returns:
+        la version de l'artefact
+    """
+    import joblib
+
+    models_dir = os.path.dirname(MODEL_PATH)
+    os.makedirs(models_dir, exist_ok=True)
+
+    version = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+    version_path = os.path.join(models_dir, f"price_model-{version}.pkl")
+    joblib.dump(model, version_path)
+    flat_version_path = os.path.join(models_dir, f"price_model-{version}.npz")
+    FlatForest.from_sklearn(model).save(flat_version_path)
+    with open(os.path.join(models_dir, f"price_model-{version}.json"), "w") as f:
+        json.dump({"version": version, **(metadata or {})}, f, indent=2, default=str)
+
+    for source, target in ((flat_version_path, FLAT_MODEL_PATH), (version_path, MODEL_PATH)):
+        tmp_path = f"{target}.tmp"
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, target)
+    logger.info(f"Modèle {version} sauvegardé à {version_path} et publié à {MODEL_PATH}")
+
+    _prune_model_versions(models_dir)
+    return version
+
+
+def list_model_versions() -> list:
+    """Liste les artefacts versionnés (métadonnées), du plus récent au plus ancien"""
+    models_dir = os.path.dirname(MODEL_PATH)
+    versions = []
+    for path in sorted(glob.glob(os.path.join(models_dir, "price_model-*.json")), reverse=True):
+        with open(path) as f:
+            versions.append(json.load(f))
+    return versions
+
+
+def _prune_model_versions(models_dir: str):
+    """Ne garde que les MODEL_KEEP_VERSIONS artefacts les plus récents"""
+    artifacts = sorted(glob.glob(os.path.join(models_dir, "price_model-*.pkl")), reverse=True)
+    for path in artifacts[MODEL_KEEP_VERSIONS:]:
+        base = path[:-len(".pkl")]
+        for old in (path, f"{base}.npz", f"{base}.json"):
+            if os.path.exists(old):
+                os.remove(old)
 
 
 def train_model():
     """Entraîne le modèle ML avec des données synthétiques"""
     try:
-        # Créer les dossiers s'ils n'existent pas
-        models_dir = os.path.dirname(MODEL_PATH)
-        os.makedirs(models_dir, exist_ok=True)
-
-        # Données synthétiques d'entraînement
-        X_train = []
-        y_train = []
-
-        # Générer des données synthétiques
-        for marque_idx, marque in enumerate(MARQUES):
-            for km in range(10000, 200000, 20000):
-                for annee in range(2015, 2024):
-                    # Features: [marque_encoded, kilométrage, année]
-                    age_voiture = 2026 - annee
-                    prix_base = 50
-                    
-                    # Logique de prix
-                    prix = prix_base - (km * 0.01) - (age_voiture * 2) + (marque_idx * 3)
-                    prix = max(prix, 20)  # Prix minimum
-                    
-                    X_train.append([marque_idx, km, age_voiture])
-                    y_train.append(prix)
-
-        X_train = np.array(X_train)
-        y_train = np.array(y_train)
-
-        # Entraîner le modèle
-        model = RandomForestRegressor(
-            n_estimators=50,  # Léger
-            max_depth=10,
-            random_state=42,
-            n_jobs=1
-        )
-        model.fit(X_train, y_train)
-
-        # Sauvegarder le modèle
-        joblib.dump(model, MODEL_PATH)
-        logger.info(f"Modèle entraîné et sauvegardé à {MODEL_PATH}")
-
+        start = time.perf_counter()
+        X_train, y_train = generate_synthetic_data()
+        model = fit_model(X_train, y_train)
+        save_model(model, {
+            "source": "synthetic",
+            "n_samples": len(y_train),
+            "trained_at": datetime.utcnow(),
+            "training_seconds": round(time.perf_counter() - start, 3)
+        })
         return model
 
     except Exception as e:
@@ -64,26 +150,257 @@ def train_model():
         return None
 
 
-def load_model():
-    """Charge le modèle ML"""
-    try:
-        if os.path.exists(MODEL_PATH):
-            model = joblib.load(MODEL_PATH)
+def _file_sha256(path: str) -> str:
+    """Calcule l'empreinte SHA-256 d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _model_memory_bytes(model) -> int:
+    """Estime l'empreinte mémoire d'une forêt (tableaux de noeuds et de valeurs)"""
+    if isinstance(model, FlatForest):
+        return model.nbytes
+    total = 0
+    for estimator in getattr(model, "estimators_", []):
+        state = estimator.tree_.__getstate__()
+        total += state["nodes"].nbytes + state["values"].nbytes
+    return total
+
+
+def _load_sklearn_model(path: str):
+    """Désérialise un modèle scikit-learn (importe scikit-learn)"""
+    import joblib
+    return joblib.load(path)
+
+
+def export_flat_model():
+    """
+    Exporte le modèle scikit-learn publié vers le format plat (.npz)
+
+    Entraîne d'abord un modèle si aucun n'existe. Retourne la forêt plate, ou None.
+    """
+    if not os.path.exists(MODEL_PATH):
+        if train_model() is None:
+            return None
+        return FlatForest.load(FLAT_MODEL_PATH)
+
+    flat_model = FlatForest.from_sklearn(_load_sklearn_model(MODEL_PATH))
+    flat_model.save(FLAT_MODEL_PATH)
+    logger.info(f"Modèle exporté au format plat: {FLAT_MODEL_PATH}")
+    return flat_model
+
+
+class ModelRegistry:
+    """
+    Garde le modèle chargé en mémoire pour toute la durée du processus.
+
+    L'artefact n'est relu que lorsque sa signature (mtime, taille) change et que
+    son contenu (SHA-256) diffère; le nouveau modèle remplace l'ancien d'un seul
+    coup, les requêtes en cours continuent d'utiliser l'ancienne référence.
+    """
+
+    def __init__(self, path: str, loader, builder, check_interval: float = MODEL_CHECK_INTERVAL):
+        self.path = path
+        self.loader = loader
+        self.builder = builder
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # Protège le couple (_model, _version), sans attendre un chargement en cours
+        self._state_lock = threading.Lock()
+        self._model = None
+        self._signature = None
+        self._sha256 = None
+        self._version = 0
+        self._loaded_at = None
+        self._load_seconds = None
+        self._memory_bytes = None
+        self._artifact_bytes = None
+        self._last_check = 0.0
+
+    @property
+    def version(self) -> int:
+        """Numéro de version du modèle en mémoire (incrémenté à chaque rechargement)"""
+        return self._version
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self):
+        """Retourne le modèle en mémoire, rechargé si l'artefact a changé"""
+        model = self._model
+        if model is not None and time.monotonic() - self._last_check < self.check_interval:
             return model
-        else:
-            logger.info("Modèle non trouvé, entraînement d'un nouveau modèle...")
-            return train_model()
-    except Exception as e:
-        logger.error(f"Erreur lors du chargement du modèle: {e}")
-        return None
+        return self.reload()
+
+    def get_with_version(self) -> tuple:
+        """
+        Retourne (modèle, version) lus ensemble, rechargés si l'artefact a changé
+
+        Le couple est lu sous _state_lock, que _install prend pour remplacer le modèle:
+        un rechargement concurrent ne peut pas associer l'ancien modèle à la nouvelle
+        version (ce que ferait get() suivi de la propriété version).
+        """
+        self.get()
+        with self._state_lock:
+            return self._model, self._version
+
+    def reload(self, force: bool = False):
+        """Vérifie l'artefact sur disque et recharge le modèle si nécessaire"""
+        with self._lock:
+            self._last_check = time.monotonic()
+            signature = self._stat()
+            if self._model is not None and signature == self._signature and not force:
+                return self._model
+
+            if signature is None:
+                if self._model is None:
+                    logger.info(f"Artefact {self.path} non trouvé, construction du modèle...")
+                    built = self.builder()
+                    if built is not None:
+                        self._install(built, self._stat(), 0.0)
+                else:
+                    logger.warning(f"Artefact {self.path} introuvable, conservation du modèle en mémoire")
+                return self._model
+
+            try:
+                sha256 = _file_sha256(self.path)
+                if self._model is not None and sha256 == self._sha256 and not force:
+                    self._signature = signature
+                    return self._model
+
+                start = time.perf_counter()
+                model = self.loader(self.path)
+                self._install(model, signature, time.perf_counter() - start, sha256)
+                logger.info(
+                    f"Modèle chargé depuis {self.path} (version {self._version}, "
+                    f"{self._load_seconds * 1000:.1f} ms)"
+                )
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement du modèle: {e}")
+            return self._model
+
+    def _install(self, model, signature, load_seconds: float, sha256: str = None):
+        if sha256 is None and signature is not None:
+            sha256 = _file_sha256(self.path)
+        self._signature = signature
+        self._sha256 = sha256
+        self._load_seconds = load_seconds
+        self._memory_bytes = _model_memory_bytes(model)
+        self._artifact_bytes = signature[1] if signature else None
+        self._loaded_at = datetime.utcnow()
+        with self._state_lock:
+            self._version += 1
+            self._model = model
+
+    def info(self) -> dict:
+        """Informations sur le modèle en mémoire"""
+        return {
+            "loaded": self._model is not None,
+            "engine": type(self._model).__name__ if self._model is not None else None,
+            "path": os.path.abspath(self.path),
+            "version": self._version,
+            "sha256": self._sha256,
+            "loaded_at": self._loaded_at.isoformat() if self._loaded_at else None,
+            "load_time_ms": round(self._load_seconds * 1000, 2) if self._load_seconds is not None else None,
+            "memory_bytes": self._memory_bytes,
+            "artifact_bytes": self._artifact_bytes,
+        }
+
+
+if ML_ENGINE == "sklearn":
+    model_registry = ModelRegistry(MODEL_PATH, _load_sklearn_model, train_model)
+else:
+    model_registry = ModelRegistry(FLAT_MODEL_PATH, FlatForest.load, export_flat_model)
+
+
+def load_model():
+    """Charge le modèle ML (depuis le registre en mémoire)"""
+    return model_registry.get()
+
+
+def warm_up() -> bool:
+    """Charge le modèle en avance (tâche de fond au démarrage) pour que la première prédiction soit rapide"""
+    return model_registry.get() is not None
 
 
 def encode_marque(marque: str) -> int:
     """Encode la marque en nombre"""
+    return _MARQUE_INDEX.get(marque.capitalize(), 0)  # 0 = valeur par défaut
+
+
+def build_features(rows) -> np.ndarray:
+    """
+    Construit la matrice de features (n x 3) à partir de tuples (marque, kilometrage, annee)
+
+    Les bornes et la quantification du kilométrage (prediction_cache.km_bucket) sont
+    les mêmes que pour une prédiction unitaire.
+    """
+    rows = list(rows)
+    features = np.empty((len(rows), 3), dtype=np.float64)
+    if rows:
+        marques, kilometrages, annees = zip(*rows)
+        features[:, 0] = [encode_marque(marque) for marque in marques]
+        features[:, 1] = prediction_cache.quantize_km_array(
+            np.clip(np.asarray(kilometrages, dtype=np.float64), 0, 300000)
+        )
+        features[:, 2] = np.clip(2026 - np.asarray(annees, dtype=np.float64), 0, 50)
+    return features
+
+
+def predict_prices(rows) -> np.ndarray:
+    """
+    Prédit les prix d'un lot de tuples (marque, kilometrage, annee) en un seul appel au modèle
+
+    Lève RuntimeError si le modèle n'est pas disponible.
+    """
+    model = load_model()
+    if model is None:
+        raise RuntimeError("Modèle ML non disponible")
+    features = build_features(rows)
+    with ML_INFERENCE_SECONDS.time("batch"):
+        predicted = model.predict(features)
+    return np.maximum(predicted, 20.0)  # Prix minimum
+
+
+def predict_rental_prices(rows) -> list:
+    """
+    Prédit le prix de location d'un lot de voitures en un seul appel au modèle
+
+    Args:
+        rows: itérable de tuples (marque, kilometrage, annee)
+
+    Returns:
+        liste de dicts, dans l'ordre d'entrée, au même format que predict_rental_price
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+
     try:
-        return MARQUES.index(marque.capitalize())
-    except ValueError:
-        return 0  # Valeur par défaut
+        predicted = predict_prices(rows)
+
+        return [
+            {
+                "success": True,
+                "predicted_price": round(float(price), 2),
+                "marque": marque,
+                "kilometrage": max(0, min(kilometrage, 300000)),
+                "annee": annee,
+                "confidence": "Modèle léger (Random Forest)"
+            }
+            for (marque, kilometrage, annee), price in zip(rows, predicted)
+        ]
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la prédiction par lot: {e}")
+        return [{"success": False, "error": str(e), "predicted_price": None} for _ in rows]
 
 
 def predict_rental_price(marque: str, kilometrage: int, annee: int = 2023) -> dict:
@@ -99,8 +416,8 @@ def predict_rental_price(marque: str, kilometrage: int, annee: int = 2023) -> di
         dict avec la prédiction de prix
     """
     try:
-        model = load_model()
-        
+        model, model_version = model_registry.get_with_version()
+
         if model is None:
             return {
                 "success": False,
@@ -116,11 +433,21 @@ def predict_rental_price(marque: str, kilometrage: int, annee: int = 2023) -> di
         kilometrage = max(0, min(kilometrage, 300000))
         age_voiture = max(0, min(age_voiture, 50))
 
-        features = np.array([[marque_encoded, kilometrage, age_voiture]])
+        # Prédire sur le kilométrage quantifié, comme build_features: le prix ne dépend
+        # que de la tranche, donc un succès du cache donne le prix que le modèle aurait
+        # calculé, et le cache est indexé sur la version du modèle qui a prédit
+        km_quantifie = prediction_cache.quantize_km(kilometrage)
+        cache_key = (marque_encoded, km_quantifie, age_voiture)
+
+        predicted_price = prediction_cache.get(cache_key, model_version)
+        if predicted_price is None:
+            features = np.array([[marque_encoded, km_quantifie, age_voiture]])
 
-        # Prédiction
-        predicted_price = float(model.predict(features)[0])
-        predicted_price = max(20.0, predicted_price)  # Prix minimum
+            # Prédiction
+            with ML_INFERENCE_SECONDS.time("single"):
+                predicted_price = float(model.predict(features)[0])
+            predicted_price = max(20.0, predicted_price)  # Prix minimum
+            prediction_cache.put(cache_key, predicted_price, model_version)
 
         return {
             "success": True,
@@ -139,6 +466,3 @@ def predict_rental_price(marque: str, kilometrage: int, annee: int = 2023) -> di
             "predicted_price": None
         }
 
-
-# Charger le modèle au démarrage
-_model = load_model()
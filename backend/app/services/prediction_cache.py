@@ -0,0 +1,109 @@
+"""Cache LRU des prédictions de prix, indexé sur les features quantifiées"""
+from collections import OrderedDict
+import os
+import threading
+import time
+
+import numpy as np
+
+# Nombre maximal d'entrées (0 désactive le cache)
+CACHE_SIZE = int(os.getenv("ML_CACHE_SIZE", "4096"))
+# Durée de vie d'une entrée, en secondes (0 = pas d'expiration)
+CACHE_TTL = float(os.getenv("ML_CACHE_TTL", "3600"))
+# Pas de quantification du kilométrage, en km: le modèle prédit sur le kilométrage
+# arrondi à ce pas (prédictions unitaires et par lot), qui sert aussi de clé du cache
+CACHE_KM_BUCKET = int(os.getenv("ML_CACHE_KM_BUCKET", "100"))
+
+
+class PredictionCache:
+    """
+    Cache LRU borné avec expiration, vidé à chaque changement de version du modèle.
+
+    Les clés sont (indice de marque, tranche de kilométrage, âge): les requêtes du
+    guichet ne portent que sur 10 marques, des kilométrages ronds et quelques années.
+    """
+
+    def __init__(self, max_size: int = CACHE_SIZE, ttl: float = CACHE_TTL, km_bucket: int = CACHE_KM_BUCKET):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.km_bucket = max(1, km_bucket)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def quantize_km(self, kilometrage: int) -> int:
+        """Kilométrage arrondi à la tranche la plus proche"""
+        return int(round(kilometrage / self.km_bucket)) * self.km_bucket
+
+    def quantize_km_array(self, kilometrages: np.ndarray) -> np.ndarray:
+        """quantize_km sur un tableau (même arrondi au pair le plus proche que round)"""
+        return np.round(kilometrages / self.km_bucket) * self.km_bucket
+
+    def get(self, key: tuple, model_version: int):
+        """Retourne le prix en cache pour cette clé, ou None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if model_version != self._model_version:
+                self._entries.clear()
+                self._model_version = model_version
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            price, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return price
+
+    def put(self, key: tuple, price: float, model_version: int):
+        """Enregistre un prix prédit par la version donnée du modèle"""
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            if model_version != self._model_version:
+                return
+            self._entries[key] = (price, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Compteurs du cache"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "km_bucket": self.km_bucket,
+            "model_version": self._model_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+prediction_cache = PredictionCache()
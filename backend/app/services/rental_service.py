@@ -1,29 +1,115 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, exists, func, insert, literal, select, update
 from datetime import datetime
-from app.models.models import Rental, Car, CarStatus
+from app.database import insert_returning, insert_returning_async
+from app.events import event_bus
+from app.models.models import Rental, Car, Customer, CarStatus, Reservation
 from app.schemas.schemas import RentalCreate, RentalReturn
+from app.services.stats_service import StatsService
+from app.services.version_service import VersionService
+
+
+class RentalError(Exception):
+    """A rental could not be created"""
+
+
+class CarNotFoundError(RentalError):
+    """The car does not exist"""
+
+
+class CustomerNotFoundError(RentalError):
+    """The customer does not exist"""
+
+
+class CarNotAvailableError(RentalError):
+    """The car is already rented, or reserved by another customer right now"""
 
 
 class RentalService:
     """Service layer for rental operations"""
 
+    @staticmethod
+    def _claim_car(rental: RentalCreate, now: datetime):
+        """UPDATE marking the car rented, if it is available and not reserved by another customer now"""
+        reserved_by_other = exists().where(
+            Reservation.car_id == rental.car_id,
+            Reservation.date_fin > now,
+            Reservation.date_debut <= now,
+            Reservation.customer_id != rental.customer_id,
+        )
+        return (
+            update(Car)
+            .where(Car.id == rental.car_id, Car.etat == CarStatus.AVAILABLE, ~reserved_by_other)
+            .values(etat=CarStatus.RENTED)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _insert_rental(rental: RentalCreate, now: datetime):
+        """
+        INSERT of the rental row, only if the customer exists, returning it. The car's
+        price and mileage are copied onto the rental as they are at checkout
+        """
+        return (
+            insert(Rental)
+            .from_select(
+                ["car_id", "customer_id", "date_debut", "prix_location", "kilometrage"],
+                select(Car.id, Customer.id, literal(now), Car.prix_location, Car.kilometrage)
+                .join(Customer, Customer.id == rental.customer_id)
+                .where(Car.id == rental.car_id)
+            )
+            .returning(Rental)
+        )
+
+    @staticmethod
+    def _publish_rental_created(db_rental: Rental):
+        event_bus.publish("rental.created", {
+            "id": db_rental.id, "car_id": db_rental.car_id, "customer_id": db_rental.customer_id,
+            "date_debut": db_rental.date_debut,
+        })
+        event_bus.publish("car.updated", {"id": db_rental.car_id, "etat": CarStatus.RENTED})
+
+    @staticmethod
+    def _publish_rental_returned(db_rental: Rental, car: Car):
+        event_bus.publish("rental.returned", {
+            "id": db_rental.id, "car_id": db_rental.car_id,
+            "date_retour": db_rental.date_retour, "date_fin": db_rental.date_fin,
+        })
+        if car:
+            event_bus.publish("car.updated", {"id": car.id, "etat": CarStatus.AVAILABLE})
+
     @staticmethod
     def create_rental(db: Session, rental: RentalCreate) -> Rental:
-        """Create a new rental"""
-        # Check if car exists and is available
-        car = db.query(Car).filter(Car.id == rental.car_id).first()
-        if not car:
-            return None
-        if car.etat != CarStatus.AVAILABLE:
-            return None
+        """
+        Create a new rental (check out a car) atomically.
+
+        The car is claimed with a conditional UPDATE (only if it is still available)
+        and the rental is inserted only if the customer exists, in one transaction:
+        two concurrent checkouts of the same car can never both succeed. A car whose
+        reservation by another customer is in progress cannot be claimed. The car and
+        customer are only looked up again on failure, to report why.
+
+        Raises CarNotFoundError, CustomerNotFoundError or CarNotAvailableError.
+        """
+        now = datetime.utcnow()
+        claimed = db.execute(RentalService._claim_car(rental, now))
+        db_rental = None
+        if claimed.rowcount == 1:
+            db_rental = insert_returning(db, RentalService._insert_rental(rental, now))
+
+        if db_rental is None:
+            db.rollback()
+            if db.query(Car.id).filter(Car.id == rental.car_id).first() is None:
+                raise CarNotFoundError()
+            if db.query(Customer.id).filter(Customer.id == rental.customer_id).first() is None:
+                raise CustomerNotFoundError()
+            raise CarNotAvailableError()
 
-        # Create rental and update car status
-        db_rental = Rental(**rental.dict())
-        db.add(db_rental)
-        car.etat = CarStatus.RENTED
+        StatsService.apply(db, available_cars=-1, rented_cars=1)
+        VersionService.bump(db, "cars", "rentals")
         db.commit()
-        db.refresh(db_rental)
+        RentalService._publish_rental_created(db_rental)
         return db_rental
 
     @staticmethod
@@ -31,16 +117,64 @@ class RentalService:
         """Get rental by ID"""
         return db.query(Rental).filter(Rental.id == rental_id).first()
 
+    @staticmethod
+    def get_rental_detail(db: Session, rental_id: int) -> Rental:
+        """Get rental by ID with its car and customer loaded in the same query"""
+        return db.query(Rental).options(
+            joinedload(Rental.car), joinedload(Rental.customer)
+        ).filter(Rental.id == rental_id).first()
+
+    @staticmethod
+    def get_expanded_rentals(db: Session, skip: int = 0, limit: int = 100, after_id: int = None,
+                             active_only: bool = False):
+        """
+        Get rentals joined with the car and customer columns used for display.
+
+        Only the projected columns are selected, in one query, ordered by rental ID.
+        With after_id, pages are read by keyset instead of offset.
+        """
+        query = db.query(
+            Rental.id, Rental.car_id, Rental.customer_id,
+            Rental.date_debut, Rental.date_fin, Rental.date_retour,
+            Car.num_imma.label("car_num_imma"),
+            Car.marque.label("car_marque"),
+            Car.modele.label("car_modele"),
+            Customer.id_loc.label("customer_id_loc"),
+            Customer.nom.label("customer_nom"),
+            Customer.prenom.label("customer_prenom"),
+        ).outerjoin(Car, Rental.car_id == Car.id).outerjoin(Customer, Rental.customer_id == Customer.id)
+
+        if active_only:
+            query = query.filter(Rental.date_retour.is_(None))
+        if after_id is not None:
+            query = query.filter(Rental.id > after_id)
+        else:
+            query = query.offset(skip) if skip else query
+        return query.order_by(Rental.id).limit(limit).all()
+
     @staticmethod
     def get_all_rentals(db: Session, skip: int = 0, limit: int = 100):
         """Get all rentals with pagination"""
-        return db.query(Rental).offset(skip).limit(limit).all()
+        return db.query(Rental).order_by(Rental.id).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def get_rentals_after(db: Session, after_id: int = None, limit: int = 100):
+        """Get the next page of rentals after a given ID (keyset pagination)"""
+        query = db.query(Rental)
+        if after_id is not None:
+            query = query.filter(Rental.id > after_id)
+        return query.order_by(Rental.id).limit(limit).all()
 
     @staticmethod
     def get_active_rentals(db: Session):
         """Get active rentals (not returned)"""
         return db.query(Rental).filter(Rental.date_retour.is_(None)).all()
 
+    @staticmethod
+    def count_active_rentals(db: Session) -> int:
+        """Number of active rentals (counted on the partial index of active rentals)"""
+        return db.scalar(select(func.count()).select_from(Rental).where(Rental.date_retour.is_(None)))
+
     @staticmethod
     def get_rental_history(db: Session, customer_id: int):
         """Get rental history for a customer"""
@@ -65,10 +199,14 @@ class RentalService:
         # Update car status back to available
         car = db.query(Car).filter(Car.id == db_rental.car_id).first()
         if car:
+            before = StatsService.car_contribution(car)
             car.etat = CarStatus.AVAILABLE
+            StatsService.apply_car_change(db, before, StatsService.car_contribution(car))
 
+        VersionService.bump(db, "cars", "rentals")
         db.commit()
         db.refresh(db_rental)
+        RentalService._publish_rental_returned(db_rental, car)
         return db_rental
 
     @staticmethod
@@ -77,7 +215,9 @@ class RentalService:
         db_rental = db.query(Rental).filter(Rental.id == rental_id).first()
         if db_rental:
             db.delete(db_rental)
+            VersionService.bump(db, "rentals")
             db.commit()
+            event_bus.publish("rental.deleted", {"id": rental_id})
             return True
         return False
 
@@ -87,12 +227,118 @@ class RentalService:
         car = db.query(Car).filter(Car.id == car_id).first()
         return car and car.etat == CarStatus.AVAILABLE
 
-    @staticmethod
-    def count_active_rentals(db: Session) -> int:
-        """Count active rentals"""
-        return db.query(Rental).filter(Rental.date_retour.is_(None)).count()
-
     @staticmethod
     def get_total_rentals(db: Session) -> int:
         """Count total rentals"""
         return db.query(Rental).count()
+
+
+class AsyncRentalService:
+    """RentalService for AsyncSession (DATABASE_ASYNC routes): same atomic checkout statements"""
+
+    @staticmethod
+    async def create_rental(db: AsyncSession, rental: RentalCreate) -> Rental:
+        """
+        Create a new rental (check out a car) atomically, as RentalService.create_rental.
+
+        Raises CarNotFoundError, CustomerNotFoundError or CarNotAvailableError.
+        """
+        now = datetime.utcnow()
+        claimed = await db.execute(RentalService._claim_car(rental, now))
+        db_rental = None
+        if claimed.rowcount == 1:
+            db_rental = await insert_returning_async(db, RentalService._insert_rental(rental, now))
+
+        if db_rental is None:
+            await db.rollback()
+            if await db.scalar(select(Car.id).where(Car.id == rental.car_id)) is None:
+                raise CarNotFoundError()
+            if await db.scalar(select(Customer.id).where(Customer.id == rental.customer_id)) is None:
+                raise CustomerNotFoundError()
+            raise CarNotAvailableError()
+
+        await db.run_sync(StatsService.apply, available_cars=-1, rented_cars=1)
+        await db.run_sync(VersionService.bump, "cars", "rentals")
+        await db.commit()
+        RentalService._publish_rental_created(db_rental)
+        return db_rental
+
+    @staticmethod
+    async def get_rental(db: AsyncSession, rental_id: int) -> Rental:
+        """Get rental by ID"""
+        return await db.get(Rental, rental_id)
+
+    @staticmethod
+    async def get_rental_detail(db: AsyncSession, rental_id: int) -> Rental:
+        """Get rental by ID with its car and customer loaded in the same query"""
+        return await db.scalar(
+            select(Rental).options(joinedload(Rental.car), joinedload(Rental.customer)).where(Rental.id == rental_id)
+        )
+
+    @staticmethod
+    async def get_expanded_rentals(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int = None,
+                                   active_only: bool = False):
+        """Rentals joined with the car and customer display columns (see RentalService.get_expanded_rentals)"""
+        return await db.run_sync(RentalService.get_expanded_rentals, skip, limit, after_id, active_only)
+
+    @staticmethod
+    async def get_all_rentals(db: AsyncSession, skip: int = 0, limit: int = 100):
+        """Get all rentals with pagination"""
+        return (await db.scalars(select(Rental).order_by(Rental.id).offset(skip).limit(limit))).all()
+
+    @staticmethod
+    async def get_rentals_after(db: AsyncSession, after_id: int = None, limit: int = 100):
+        """Get the next page of rentals after a given ID (keyset pagination)"""
+        query = select(Rental)
+        if after_id is not None:
+            query = query.where(Rental.id > after_id)
+        return (await db.scalars(query.order_by(Rental.id).limit(limit))).all()
+
+    @staticmethod
+    async def get_active_rentals(db: AsyncSession):
+        """Get active rentals (not returned)"""
+        return (await db.scalars(select(Rental).where(Rental.date_retour.is_(None)))).all()
+
+    @staticmethod
+    async def get_rental_history(db: AsyncSession, customer_id: int):
+        """Get rental history for a customer"""
+        return (await db.scalars(select(Rental).where(Rental.customer_id == customer_id))).all()
+
+    @staticmethod
+    async def get_car_rental_history(db: AsyncSession, car_id: int):
+        """Get rental history for a car"""
+        return (await db.scalars(select(Rental).where(Rental.car_id == car_id))).all()
+
+    @staticmethod
+    async def return_rental(db: AsyncSession, rental_id: int, return_data: RentalReturn) -> Rental:
+        """Return a rented car"""
+        db_rental = await db.get(Rental, rental_id)
+        if not db_rental:
+            return None
+
+        db_rental.date_retour = return_data.date_retour or datetime.utcnow()
+        db_rental.date_fin = datetime.utcnow()
+
+        car = await db.get(Car, db_rental.car_id)
+        if car:
+            before = StatsService.car_contribution(car)
+            car.etat = CarStatus.AVAILABLE
+            await db.run_sync(StatsService.apply_car_change, before, StatsService.car_contribution(car))
+
+        await db.run_sync(VersionService.bump, "cars", "rentals")
+        await db.commit()
+        await db.refresh(db_rental)
+        RentalService._publish_rental_returned(db_rental, car)
+        return db_rental
+
+    @staticmethod
+    async def delete_rental(db: AsyncSession, rental_id: int) -> bool:
+        """Delete a rental"""
+        db_rental = await db.get(Rental, rental_id)
+        if db_rental:
+            await db.delete(db_rental)
+            await db.run_sync(VersionService.bump, "rentals")
+            await db.commit()
+            event_bus.publish("rental.deleted", {"id": rental_id})
+            return True
+        return False
@@ -0,0 +1,90 @@
+from sqlalchemy import select, update, func
+from app.database import SessionLocal
+from app.events import event_bus
+from app.models.models import Car
+from app.services.ml_service import predict_prices, model_registry
+from app.services.version_service import VersionService
+
+# Cars have no manufacturing year column; price them with the same default year as the predictor
+DEFAULT_ANNEE = 2023
+
+# Maximum number of changes listed in a dry-run report
+MAX_DIFF_ROWS = 1000
+
+
+class RepricingService:
+    """Service layer for writing ML-predicted prices back to the fleet"""
+
+    @staticmethod
+    def reprice_fleet(chunk_size: int = 500, dry_run: bool = False, annee: int = DEFAULT_ANNEE,
+                      progress=None) -> dict:
+        """
+        Score every car with the price model and update prix_location.
+
+        Cars are read in primary-key order, chunk_size rows at a time, scored with one
+        vectorized predict call per chunk and written back with a single executemany
+        UPDATE. Each chunk is committed on its own so no long write transaction is held.
+        With dry_run, nothing is written and the report lists the price changes instead.
+        """
+        db = SessionLocal()
+        try:
+            total = db.execute(select(func.count(Car.id))).scalar()
+            if progress:
+                progress(0, total)
+
+            processed = 0
+            changed = 0
+            changes = []
+            last_id = 0
+            while True:
+                rows = db.execute(
+                    select(Car.id, Car.num_imma, Car.marque, Car.kilometrage, Car.prix_location)
+                    .where(Car.id > last_id)
+                    .order_by(Car.id)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                prices = predict_prices((row.marque, row.kilometrage or 0, annee) for row in rows)
+                updates = []
+                for row, price in zip(rows, prices):
+                    new_price = round(float(price), 2)
+                    if row.prix_location is not None and abs(new_price - row.prix_location) < 0.01:
+                        continue
+                    updates.append({"id": row.id, "prix_location": new_price})
+                    if len(changes) < MAX_DIFF_ROWS:
+                        changes.append({
+                            "car_id": row.id,
+                            "num_imma": row.num_imma,
+                            "old_price": row.prix_location,
+                            "new_price": new_price,
+                        })
+
+                if updates and not dry_run:
+                    db.execute(update(Car), updates)
+                    VersionService.bump(db, "cars")
+                db.commit()
+                if updates and not dry_run:
+                    # One event per chunk: [[car id, new price], ...]
+                    event_bus.publish("cars.repriced", {
+                        "prices": [[item["id"], item["prix_location"]] for item in updates]
+                    })
+
+                processed += len(rows)
+                changed += len(updates)
+                if progress:
+                    progress(processed, total)
+
+            return {
+                "dry_run": dry_run,
+                "model_version": model_registry.version,
+                "processed": processed,
+                "changed": changed,
+                "updated": 0 if dry_run else changed,
+                "changes": changes,
+                "changes_truncated": changed > len(changes),
+            }
+        finally:
+            db.close()
@@ -0,0 +1,149 @@
+from datetime import datetime
+
+from sqlalchemy import exists, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.database import insert_returning
+from app.events import event_bus
+from app.models.models import Car, Customer, Rental, Reservation
+from app.schemas.schemas import ReservationCreate
+from app.services.rental_service import RentalError, CarNotFoundError, CustomerNotFoundError
+from app.services.version_service import VersionService
+
+
+class ReservationConflictError(RentalError):
+    """The car is already booked or rented during the requested period"""
+
+
+def _overlapping_reservation(car_id, date_debut: datetime, date_fin: datetime):
+    """
+    EXISTS clause: a reservation of the car overlaps [date_debut, date_fin).
+
+    Served by ix_reservations_car_period: a seek on car_id, then a range scan of the
+    reservations ending after date_debut (the car's upcoming bookings only).
+    """
+    return exists().where(
+        Reservation.car_id == car_id,
+        Reservation.date_fin > date_debut,
+        Reservation.date_debut < date_fin,
+    )
+
+
+def _active_rental(car_id, date_fin: datetime):
+    """EXISTS clause: the car is out on a rental started before date_fin (ix_rentals_active)"""
+    return exists().where(
+        Rental.car_id == car_id,
+        Rental.date_retour.is_(None),
+        Rental.date_debut < date_fin,
+    )
+
+
+class ReservationService:
+    """Service layer for reservations (planned bookings) and availability queries"""
+
+    @staticmethod
+    def create_reservation(db: Session, reservation: ReservationCreate) -> Reservation:
+        """
+        Book a car over [date_debut, date_fin) atomically.
+
+        The car row is locked first (SELECT ... FOR UPDATE, a no-op on SQLite, which
+        serializes writers anyway), so that on PostgreSQL concurrent bookings of the same
+        car queue up and each one sees the reservations committed before it. The row is
+        then inserted by a single INSERT ... SELECT that only yields a row if the car and
+        customer exist and no other reservation or active rental overlaps the period, so two
+        concurrent bookings of the same slot can never both succeed.
+
+        Raises CarNotFoundError, CustomerNotFoundError or ReservationConflictError.
+        """
+        car_id = db.scalar(select(Car.id).where(Car.id == reservation.car_id).with_for_update())
+        if car_id is None:
+            db.rollback()
+            raise CarNotFoundError()
+
+        statement = (
+            insert(Reservation)
+            .from_select(
+                ["car_id", "customer_id", "date_debut", "date_fin", "created_at"],
+                select(
+                    literal(reservation.car_id), Customer.id, literal(reservation.date_debut),
+                    literal(reservation.date_fin), literal(datetime.utcnow())
+                ).where(
+                    Customer.id == reservation.customer_id,
+                    exists().where(Car.id == reservation.car_id),
+                    ~_overlapping_reservation(reservation.car_id, reservation.date_debut, reservation.date_fin),
+                    ~_active_rental(reservation.car_id, reservation.date_fin),
+                )
+            )
+            .returning(Reservation)
+        )
+        db_reservation = insert_returning(db, statement)
+
+        if db_reservation is None:
+            db.rollback()
+            if db.query(Car.id).filter(Car.id == reservation.car_id).first() is None:
+                raise CarNotFoundError()
+            if db.query(Customer.id).filter(Customer.id == reservation.customer_id).first() is None:
+                raise CustomerNotFoundError()
+            raise ReservationConflictError()
+
+        VersionService.bump(db, "reservations")
+        db.commit()
+        event_bus.publish("reservation.created", {
+            "id": db_reservation.id, "car_id": db_reservation.car_id, "customer_id": db_reservation.customer_id,
+            "date_debut": db_reservation.date_debut, "date_fin": db_reservation.date_fin,
+        })
+        return db_reservation
+
+    @staticmethod
+    def get_reservation(db: Session, reservation_id: int) -> Reservation:
+        """Get reservation by ID"""
+        return db.query(Reservation).filter(Reservation.id == reservation_id).first()
+
+    @staticmethod
+    def get_car_reservations(db: Session, car_id: int, upcoming_only: bool = True):
+        """Get the reservations of a car in date order (by default those not over yet)"""
+        query = db.query(Reservation).filter(Reservation.car_id == car_id)
+        if upcoming_only:
+            query = query.filter(Reservation.date_fin > datetime.utcnow())
+        return query.order_by(Reservation.date_fin).all()
+
+    @staticmethod
+    def get_customer_reservations(db: Session, customer_id: int):
+        """Get the reservations of a customer"""
+        return db.query(Reservation).filter(
+            Reservation.customer_id == customer_id
+        ).order_by(Reservation.date_debut).all()
+
+    @staticmethod
+    def cancel_reservation(db: Session, reservation_id: int) -> bool:
+        """Delete a reservation"""
+        db_reservation = db.query(Reservation).filter(Reservation.id == reservation_id).first()
+        if db_reservation:
+            car_id = db_reservation.car_id
+            db.delete(db_reservation)
+            VersionService.bump(db, "reservations")
+            db.commit()
+            event_bus.publish("reservation.cancelled", {"id": reservation_id, "car_id": car_id})
+            return True
+        return False
+
+    @staticmethod
+    def get_available_cars(db: Session, date_debut: datetime, date_fin: datetime):
+        """
+        Cars free over the whole window [date_debut, date_fin), by ID.
+
+        One query: each car is checked with two NOT EXISTS probes, one on the
+        per-car reservation interval index and one on the partial index of active
+        rentals, so the cost grows with the fleet and not with the booking history.
+        """
+        return db.execute(
+            select(
+                Car.id, Car.num_imma, Car.marque, Car.modele, Car.kilometrage,
+                Car.etat, Car.prix_location, Car.image_filename
+            )
+            .where(
+                ~_overlapping_reservation(Car.id, date_debut, date_fin),
+                ~_active_rental(Car.id, date_fin),
+            )
+            .order_by(Car.id)
+        ).all()
@@ -0,0 +1,181 @@
+from functools import lru_cache
+import heapq
+import os
+import re
+import unicodedata
+
+from sqlalchemy import text
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import Session
+
+from app.migrations import CUSTOMERS_FTS_FILL
+from app.models.models import Customer
+
+# Words of a search query (the FTS index tokenizes on the same boundaries)
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+# At most this many words of a query are used
+MAX_QUERY_WORDS = 5
+
+# Candidates fetched per query, for each of the whole-word and prefix lookups. The
+# lookups stop at this many matches (no ranking inside the index, which would score
+# every match of a short prefix: hundreds of milliseconds at a million customers)
+# and the candidates are ranked in Python.
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "200"))
+
+
+def fold_text(value: str) -> str:
+    """Case and accent folded text, as the FTS tokenizer sees it (Hélène -> helene)"""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+_fts_available = None
+
+
+class SearchService:
+    """Service layer for customer full-text search (SQLite FTS5, LIKE fallback)"""
+
+    @staticmethod
+    def fts_available(db: Session) -> bool:
+        """Whether the customers_fts index exists (checked once per process)"""
+        global _fts_available
+        if _fts_available is None:
+            _fts_available = db.get_bind().dialect.name == "sqlite" and db.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'customers_fts'")
+            ).first() is not None
+        return _fts_available
+
+    @staticmethod
+    def build_match_query(query: str, prefix: bool = True) -> str:
+        """
+        FTS5 MATCH expression for a user query: every word must match as a prefix, or
+        as a whole word when prefix is False.
+
+        A term containing a digit is a customer ID and is matched, without its
+        separators, against the id_loc column only. A term of digits only is a customer
+        number, matched without its leading zeros ('0042' finds CL-00042). Words are
+        quoted, so FTS operators typed by the user are searched literally. Returns an
+        empty string when the query has no words.
+        """
+        star = "*" if prefix else ""
+        parts = []
+        for term in query.split()[:MAX_QUERY_WORDS]:
+            if any(char.isdigit() for char in term):
+                parts.append(f'id_loc : "{SearchService.id_key(term)}"{star}')
+            else:
+                parts.extend(f'"{word}"{star}' for word in _WORD.findall(term))
+        return " ".join(parts)
+
+    @staticmethod
+    def _candidates(db: Session, match: str) -> list:
+        """The first SEARCH_CANDIDATES customers matching an FTS expression (in index order)"""
+        return db.execute(
+            text(
+                "SELECT customers.id, customers.id_loc, customers.nom, customers.prenom FROM customers_fts "
+                "JOIN customers ON customers.id = customers_fts.rowid "
+                "WHERE customers_fts MATCH :match LIMIT :candidates"
+            ),
+            {"match": match, "candidates": SEARCH_CANDIDATES}
+        ).all()
+
+    @staticmethod
+    def search_customers(db: Session, query: str, limit: int = 50):
+        """
+        Customers whose ID, last name or first name start with each word of the query.
+
+        Matching is case and accent insensitive ('lea' finds Léa) and results are ranked
+        by relevance: exact customer IDs or numbers first, then by name (see name_rank).
+        Whole-word matches, which always rank first, are looked up first; prefix matches
+        only top them up when there are fewer than `limit` (a prefix lookup reads every
+        indexed word starting with the prefix, a whole-word one a single word). Each
+        lookup stops at SEARCH_CANDIDATES rows, so the cost does not grow with the
+        number of matches. Without the FTS index, falls back to a LIKE scan in name order.
+        """
+        if not SearchService.fts_available(db):
+            return SearchService.search_customers_like(db, query, limit)
+
+        match = SearchService.build_match_query(query)
+        if not match:
+            return []
+        exact_match = SearchService.build_match_query(query, prefix=False)
+        candidates = SearchService._candidates(db, exact_match)
+        if len(candidates) < limit:
+            found = {row.id for row in candidates}
+            candidates += [row for row in SearchService._candidates(db, match) if row.id not in found]
+
+        terms = query.split()[:MAX_QUERY_WORDS]
+        id_keys = {SearchService.id_key(term) for term in terms if any(char.isdigit() for char in term)}
+        words = tuple(
+            fold_text(word) for term in terms if not any(char.isdigit() for char in term) for word in _WORD.findall(term)
+        )
+        ranked = heapq.nsmallest(limit, candidates, key=lambda row: (
+            -len(id_keys & SearchService.id_keys(row.id_loc)) if id_keys else 0,
+            SearchService.name_rank(words, row.nom, row.prenom), len(row.id_loc), row.id
+        ))
+        ids = [row.id for row in ranked]
+        if not ids:
+            return []
+        customers = {customer.id: customer for customer in db.query(Customer).filter(Customer.id.in_(ids))}
+        return [customers[customer_id] for customer_id in ids if customer_id in customers]
+
+    @staticmethod
+    def id_key(term: str) -> str:
+        """Comparable form of a customer ID or number: folded, without separators or leading zeros"""
+        key = "".join(char for char in fold_text(term) if char.isalnum())
+        return key.lstrip("0") or "0" if key.isdigit() else key
+
+    @staticmethod
+    def id_keys(id_loc: str) -> set:
+        """Keys an ID matches exactly: the whole ID and its number (CL-00042 -> cl00042, 42)"""
+        key = SearchService.id_key(id_loc)
+        number = key.lstrip("abcdefghijklmnopqrstuvwxyz")
+        return {key, number.lstrip("0") or "0"} if number.isdigit() else {key}
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def name_rank(words: tuple, nom: str, prenom: str) -> tuple:
+        """
+        Relevance of a matching name (lower ranks first): whole-word matches first,
+        then last-name matches, then the shortest names (the closest to what was typed).
+        Names repeat a lot, so ranks are cached.
+        """
+        nom_words = _WORD.findall(fold_text(nom))
+        prenom_words = _WORD.findall(fold_text(prenom))
+        exact = sum(1 for word in words if word in nom_words or word in prenom_words)
+        on_nom = sum(1 for word in words if any(nom_word.startswith(word) for nom_word in nom_words))
+        return (-exact, -on_nom, len(nom) + len(prenom), nom_words, prenom_words)
+
+    @staticmethod
+    def search_customers_like(db: Session, query: str, limit: int = 50):
+        """Substring search on ID and names (full table scan)"""
+        search_term = f"%{query}%"
+        return db.query(Customer).filter(
+            (Customer.nom.ilike(search_term)) |
+            (Customer.prenom.ilike(search_term)) |
+            (Customer.id_loc.ilike(search_term))
+        ).order_by(Customer.nom, Customer.prenom, Customer.id).limit(limit).all()
+
+    @staticmethod
+    def rebuild_index(db: Session) -> dict:
+        """Re-index every customer and merge the index into a single segment (e.g. after a bulk import)"""
+        if not SearchService.fts_available(db):
+            raise RuntimeError("The customers_fts index does not exist (SQLite with FTS5 only)")
+        db.execute(text("INSERT INTO customers_fts (customers_fts) VALUES ('delete-all')"))
+        db.execute(text(CUSTOMERS_FTS_FILL))
+        db.execute(text("INSERT INTO customers_fts (customers_fts) VALUES ('optimize')"))
+        db.commit()
+        return {
+            "customers": db.execute(text("SELECT count(*) FROM customers")).scalar(),
+            "integrity_check": SearchService.check_index(db),
+        }
+
+    @staticmethod
+    def check_index(db: Session) -> bool:
+        """Whether the FTS index structures are consistent"""
+        try:
+            db.execute(text("INSERT INTO customers_fts (customers_fts) VALUES ('integrity-check')"))
+        except DatabaseError:
+            db.rollback()
+            return False
+        db.rollback()
+        return True
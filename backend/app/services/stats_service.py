@@ -0,0 +1,92 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, select, update
+from app.models.models import Car, CarStatus, FleetStats
+from app.services.version_service import VersionService
+
+# Primary key of the single fleet_stats row
+STATS_ROW_ID = 1
+
+_COUNTERS = ("total_cars", "available_cars", "rented_cars", "total_mileage")
+
+
+class StatsService:
+    """Service layer for the maintained fleet statistics counters"""
+
+    @staticmethod
+    def car_contribution(car: Car) -> dict:
+        """Counter values contributed by a single car"""
+        etat = CarStatus(car.etat) if car.etat is not None else None
+        return {
+            "total_cars": 1,
+            "available_cars": 1 if etat == CarStatus.AVAILABLE else 0,
+            "rented_cars": 1 if etat == CarStatus.RENTED else 0,
+            "total_mileage": car.kilometrage or 0,
+        }
+
+    @staticmethod
+    def apply(db: Session, **deltas):
+        """Add deltas to the counters in the caller's transaction (committed with it)"""
+        deltas = {name: value for name, value in deltas.items() if value}
+        if not deltas:
+            return
+        db.execute(
+            update(FleetStats)
+            .where(FleetStats.id == STATS_ROW_ID)
+            .values({name: getattr(FleetStats, name) + value for name, value in deltas.items()})
+        )
+
+    @staticmethod
+    def apply_car_change(db: Session, before: dict = None, after: dict = None):
+        """Apply the difference between two car contributions (None for a missing car)"""
+        StatsService.apply(db, **{
+            name: (after or {}).get(name, 0) - (before or {}).get(name, 0) for name in _COUNTERS
+        })
+
+    @staticmethod
+    def compute(db: Session) -> dict:
+        """Compute the counters from the cars table in a single aggregate query"""
+        row = db.execute(
+            select(
+                func.count(Car.id),
+                func.coalesce(func.sum(case((Car.etat == CarStatus.AVAILABLE, 1), else_=0)), 0),
+                func.coalesce(func.sum(case((Car.etat == CarStatus.RENTED, 1), else_=0)), 0),
+                func.coalesce(func.sum(Car.kilometrage), 0),
+            )
+        ).one()
+        return dict(zip(_COUNTERS, (int(value) for value in row)))
+
+    @staticmethod
+    def rebuild(db: Session, dry_run: bool = False) -> dict:
+        """Recompute the counters and report whether the stored ones had drifted"""
+        actual = StatsService.compute(db)
+        stats = db.get(FleetStats, STATS_ROW_ID)
+        stored = {name: getattr(stats, name) for name in _COUNTERS} if stats else None
+
+        if not dry_run:
+            if stats is None:
+                db.add(FleetStats(id=STATS_ROW_ID, **actual))
+            else:
+                for name, value in actual.items():
+                    setattr(stats, name, value)
+            # The cached statistics response is versioned on the cars table
+            VersionService.bump(db, "cars")
+            db.commit()
+
+        return {"consistent": stored == actual, "stored": stored, "actual": actual, "rebuilt": not dry_run}
+
+    @staticmethod
+    def get_statistics(db: Session) -> dict:
+        """Read the fleet statistics from the counters row (rebuilt if missing)"""
+        stats = db.get(FleetStats, STATS_ROW_ID)
+        if stats is None:
+            counters = StatsService.rebuild(db)["actual"]
+        else:
+            counters = {name: getattr(stats, name) for name in _COUNTERS}
+
+        total = counters["total_cars"]
+        return {
+            "total_cars": total,
+            "available_cars": counters["available_cars"],
+            "rented_cars": counters["rented_cars"],
+            "average_mileage": counters["total_mileage"] / total if total else 0.0,
+        }
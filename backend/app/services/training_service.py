@@ -0,0 +1,95 @@
+from datetime import datetime
+import time
+
+import numpy as np
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.models import Car, Rental
+from app.services.ml_service import (
+    encode_marque, fit_model, generate_synthetic_data, save_model, TRAIN_BACKEND, TRAIN_N_JOBS
+)
+
+# Cars have no manufacturing year column; a car's age at checkout assumes the predictor's default year
+DEFAULT_ANNEE = 2023
+
+TRAINING_SOURCES = ("synthetic", "history")
+
+
+class TrainingService:
+    """Service layer for (re)training the price model off the request path"""
+
+    @staticmethod
+    def load_history(chunk_size: int = 50000, progress=None):
+        """
+        Build the training set from historical rentals.
+
+        Each rental contributes one sample (brand, mileage, age) -> daily price, with the
+        price and mileage recorded on the rental at checkout (rentals created before they
+        were recorded are skipped). The cars' current values are never used: reprice-fleet
+        writes the model's predictions back into them, and the model would learn its own
+        output. Rows are streamed from the database chunk_size at a time and converted to
+        NumPy arrays per chunk, so memory stays proportional to the final arrays, not to
+        ORM objects.
+        """
+        X_chunks = []
+        y_chunks = []
+        processed = 0
+
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                select(Car.marque, Rental.kilometrage, Rental.date_debut, Rental.prix_location)
+                .join(Rental, Rental.car_id == Car.id)
+                .where(Rental.prix_location.is_not(None), Rental.kilometrage.is_not(None))
+                .execution_options(yield_per=chunk_size)
+            )
+            for rows in result.partitions():
+                marques, kilometrages, dates_debut, prices = zip(*rows)
+                X = np.empty((len(rows), 3), dtype=np.float64)
+                X[:, 0] = [encode_marque(marque) for marque in marques]
+                X[:, 1] = np.clip(np.asarray(kilometrages, dtype=np.float64), 0, 300000)
+                X[:, 2] = np.clip([date_debut.year - DEFAULT_ANNEE for date_debut in dates_debut], 0, 50)
+                X_chunks.append(X)
+                y_chunks.append(np.asarray(prices, dtype=np.float64))
+
+                processed += len(rows)
+                if progress:
+                    progress(processed)
+        finally:
+            db.close()
+
+        if not X_chunks:
+            return np.empty((0, 3)), np.empty(0)
+        return np.concatenate(X_chunks), np.concatenate(y_chunks)
+
+    @staticmethod
+    def train(source: str = "synthetic", chunk_size: int = 50000, n_jobs: int = TRAIN_N_JOBS,
+              backend: str = TRAIN_BACKEND, progress=None) -> dict:
+        """Train the price model and publish it as a new versioned artifact"""
+        if source not in TRAINING_SOURCES:
+            raise ValueError(f"Unknown training source: {source}")
+
+        start = time.perf_counter()
+        if source == "history":
+            X, y = TrainingService.load_history(chunk_size, progress)
+            if len(y) == 0:
+                raise ValueError("No rental history to train on")
+        else:
+            X, y = generate_synthetic_data()
+        loaded = time.perf_counter()
+
+        model = fit_model(X, y, n_jobs=n_jobs, backend=backend)
+        fitted = time.perf_counter()
+
+        metadata = {
+            "source": source,
+            "n_samples": len(y),
+            "n_jobs": n_jobs,
+            "backend": backend,
+            "trained_at": datetime.utcnow(),
+            "loading_seconds": round(loaded - start, 3),
+            "training_seconds": round(fitted - loaded, 3),
+        }
+        metadata["version"] = save_model(model, metadata)
+        return metadata
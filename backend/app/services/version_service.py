@@ -0,0 +1,28 @@
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.models import TableVersion
+
+
+class VersionService:
+    """Service layer for the per-table change counters used to invalidate cached responses"""
+
+    @staticmethod
+    def bump(db: Session, *tables: str):
+        """Increment the counters of the written tables in the caller's transaction (committed with it)"""
+        db.execute(
+            update(TableVersion)
+            .where(TableVersion.table_name.in_(tables))
+            .values(version=TableVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def get(db: Session, tables: tuple):
+        """Current counters of the tables, in order (None if a counter row is missing)"""
+        versions = dict(db.execute(
+            select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(tables))
+        ).all())
+        if len(versions) < len(tables):
+            return None
+        return tuple(versions[table] for table in tables)
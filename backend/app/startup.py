@@ -0,0 +1,72 @@
+"""Startup timing report: how long each import and initialization phase took"""
+from contextlib import contextmanager
+from datetime import datetime
+import importlib
+import sys
+import threading
+import time
+
+# Modules whose presence in sys.modules is worth reporting (they are expensive to import)
+HEAVY_MODULES = ["numpy", "sklearn", "joblib", "scipy"]
+
+
+class StartupReport:
+    """Collects per-phase timings from process start until the app is ready"""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.started_at = datetime.utcnow()
+        self.phases = []
+        self.ready_ms = None
+
+    def _elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._started) * 1000, 2)
+
+    @contextmanager
+    def measure(self, name: str):
+        """Time a block and record it as a startup phase"""
+        modules_before = len(sys.modules)
+        offset_ms = self._elapsed_ms()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            phase = {
+                "name": name,
+                "thread": threading.current_thread().name,
+                "offset_ms": offset_ms,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                "modules_loaded": len(sys.modules) - modules_before,
+            }
+            if error:
+                phase["error"] = error
+            with self._lock:
+                self.phases.append(phase)
+
+    def import_module(self, name: str):
+        """Import a module and record how long it took"""
+        with self.measure(f"import {name}"):
+            return importlib.import_module(name)
+
+    def mark_ready(self):
+        """Record the moment the application starts serving requests"""
+        self.ready_ms = self._elapsed_ms()
+
+    def to_dict(self) -> dict:
+        """Serialize the report"""
+        with self._lock:
+            phases = list(self.phases)
+        return {
+            "started_at": self.started_at,
+            "ready_ms": self.ready_ms,
+            "phases": phases,
+            "heavy_modules_loaded": {name: name in sys.modules for name in HEAVY_MODULES},
+        }
+
+
+startup_report = StartupReport()
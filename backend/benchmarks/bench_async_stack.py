@@ -0,0 +1,198 @@
+"""
+Load test: thread-pool routes vs async routes (DATABASE_ASYNC) at high concurrency.
+
+Starts the application under uvicorn (one worker, in a subprocess, with a fresh
+temporary database) once with the sync routers, whose handlers run in the
+thread pool (40 threads), and once with DATABASE_ASYNC=true, whose car,
+customer and rental handlers run on the event loop over an AsyncSession. Each
+time, client processes keep --concurrency requests in flight for --seconds:
+car lookups, cached and uncached list pages, customer searches, and checkouts
+followed by returns. Reports requests/s and p50/p99 latency per mode.
+
+Reads gain the most: a waiting request costs a task, not one of the 40 threads.
+Writes do not (SQLite has one writer, and an async transaction holds the lock
+across event loop turns), so checkouts are slower in async mode. Sync routes
+validate their response in the thread pool while their session still holds a
+connection: at --concurrency 200, handlers waiting for a connection occupy every
+thread and the thread-pool mode fails with pool timeouts.
+
+Usage (from the backend directory):
+    python benchmarks/bench_async_stack.py [--concurrency 100] [--seconds 10] [--clients 2]
+
+Exits with status 1 if a request fails in async mode (a 409 for a car that is
+already rented is expected); failures in thread-pool mode are reported.
+"""
+import argparse
+import asyncio
+from collections import Counter
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {"threadpool": "false", "async": "true"}
+
+SEARCHES = ["mar", "dup", "jean", "le", "ber", "c00", "pet"]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(tmpdir: str, port: int, database_async: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, 'bench_async_stack.db')}",
+        DATABASE_ASYNC=database_async,
+        UPLOAD_DIR=os.path.join(tmpdir, "uploads"),
+        ML_WARMUP="false",
+        AUTOCOMPLETE_ENABLED="false",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--backlog", "4096"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def seed(base_url: str, n_cars: int, n_customers: int) -> tuple:
+    names = ["Martin", "Dupont", "Bernard", "Petit", "Durand", "Leroy", "Moreau"]
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        car_ids = [
+            client.post("/api/cars/", json={
+                "num_imma": f"AS-{i:04d}", "marque": "Peugeot", "modele": "208",
+                "kilometrage": 1000 * i, "prix_location": 45,
+            }).json()["id"]
+            for i in range(n_cars)
+        ]
+        customer_ids = [
+            client.post("/api/customers/", json={
+                "id_loc": f"C{i:04d}", "nom": names[i % len(names)], "prenom": f"Jean{i}",
+            }).json()["id"]
+            for i in range(n_customers)
+        ]
+    return car_ids, customer_ids
+
+
+async def _client_loop(client: httpx.AsyncClient, rng: random.Random, car_ids: list, customer_ids: list,
+                       deadline: float, results: list):
+    while time.time() < deadline:
+        draw = rng.random()
+        kind = ("car" if draw < 0.45 else "cars page" if draw < 0.60 else "rentals page" if draw < 0.75
+                else "search" if draw < 0.90 else "checkout")
+        t0 = time.perf_counter()
+        try:
+            if kind == "car":
+                response = await client.get(f"/api/cars/{rng.choice(car_ids)}")
+            elif kind == "cars page":
+                response = await client.get("/api/cars/", params={"limit": 50})
+            elif kind == "rentals page":
+                response = await client.get("/api/rentals/", params={"cursor": "", "limit": 20})
+            elif kind == "search":
+                response = await client.get("/api/customers/search/by-name", params={"q": rng.choice(SEARCHES)})
+            else:
+                response = await client.post("/api/rentals/", json={
+                    "car_id": rng.choice(car_ids), "customer_id": rng.choice(customer_ids)
+                })
+                if response.status_code == 201:
+                    rental_id = response.json()["id"]
+                    response = await client.post(f"/api/rentals/{rental_id}/return", json={"id": rental_id})
+            status = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        results.append((kind, status, (time.perf_counter() - t0) * 1000))
+
+
+def run_clients(base_url: str, tasks: int, start_at: float, seconds: float, car_ids: list, customer_ids: list,
+                seed: int) -> list:
+    """`tasks` concurrent request loops in this process; returns (kind, status, ms) tuples"""
+    async def main():
+        results = []
+        limits = httpx.Limits(max_connections=tasks, max_keepalive_connections=tasks)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+            await asyncio.sleep(max(0.0, start_at - time.time()))
+            await asyncio.gather(*(
+                _client_loop(client, random.Random(seed * 1000 + i), car_ids, customer_ids, start_at + seconds, results)
+                for i in range(tasks)
+            ))
+        return results
+
+    return asyncio.run(main())
+
+
+def percentile(timings: list, p: float) -> float:
+    return sorted(timings)[min(len(timings) - 1, int(len(timings) * p))] if timings else float("nan")
+
+
+def run_mode(database_async: str, args) -> list:
+    tmpdir = tempfile.TemporaryDirectory()
+    port = free_port()
+    server = start_server(tmpdir.name, port, database_async)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        car_ids, customer_ids = seed(base_url, args.cars, args.customers)
+        per_client = max(1, args.concurrency // args.clients)
+        start_at = time.time() + 2.0
+        with multiprocessing.Pool(args.clients) as pool:
+            batches = pool.starmap(run_clients, [
+                (base_url, per_client, start_at, args.seconds, car_ids, customer_ids, i) for i in range(args.clients)
+            ])
+    finally:
+        server.terminate()
+        server.wait()
+        tmpdir.cleanup()
+    return [result for batch in batches for result in batch]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in flight")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each run")
+    parser.add_argument("--clients", type=int, default=2, help="Client processes sharing the concurrency")
+    parser.add_argument("--cars", type=int, default=200, help="Cars in the fleet")
+    parser.add_argument("--customers", type=int, default=200, help="Customers")
+    args = parser.parse_args()
+
+    print(f"{args.concurrency} requests in flight for {args.seconds:g}s, one uvicorn worker:")
+    failures = Counter()
+    for mode, database_async in MODES.items():
+        results = run_mode(database_async, args)
+        timings = [ms for _, status, ms in results]
+        for kind, status, _ in results:
+            if status not in (200, 201) and not (kind == "checkout" and status == 409):
+                failures[(mode, kind, status)] += 1
+        print(f"  {mode:<10} {len(results) / args.seconds:7.0f} req/s   p50 {percentile(timings, 0.5):7.1f} ms   "
+              f"p99 {percentile(timings, 0.99):7.1f} ms   max {max(timings):7.1f} ms")
+        for kind in ("car", "cars page", "rentals page", "search", "checkout"):
+            kind_timings = [ms for k, _, ms in results if k == kind]
+            print(f"    {kind:<13} {len(kind_timings):6d} requests   p50 {percentile(kind_timings, 0.5):7.1f} ms   "
+                  f"p99 {percentile(kind_timings, 0.99):7.1f} ms")
+
+    for (mode, kind, status), count in failures.most_common():
+        print(f"  {count} x {mode} {kind}: {status}")
+    ok = not any(mode == "async" for mode, _, _ in failures)
+    print(f"  {'OK  ' if ok else 'FAIL'}  every request succeeded in async mode")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Build time, memory and lookup latency of the in-memory autocomplete index.
+
+The index is filled directly (no database) with synthetic plates and customers,
+then queried keystroke by keystroke as counter staff would type.
+
+Usage (from the backend directory):
+    python benchmarks/bench_autocomplete.py [--cars 20000] [--customers 1000000] [--memory]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.autocomplete import PrefixIndex, AutocompleteIndex  # noqa: E402
+
+NOMS = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Petit", "Durand", "Lefèvre", "Dupont", "Fournier"]
+PRENOMS = ["Jean", "Marie", "Hélène", "Léa", "Chloé", "Jérôme", "Stéphane", "Cécile", "Loïc", "Élodie"]
+TYPED = ["AB-123-CD", "CL-0004242", "Lefèvre Hélène", "dupont jean", "zz"]
+
+
+def percentile(timings: list, p: float) -> float:
+    return sorted(timings)[min(len(timings) - 1, int(len(timings) * p))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cars", type=int, default=20000)
+    parser.add_argument("--customers", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--memory", action="store_true", help="Trace allocations (slows the build down)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    cars = [SimpleNamespace(id=i, num_imma=f"{chr(65 + i % 26)}{chr(65 + i // 26 % 26)}-{i % 1000:03d}-CD",
+                            marque="Renault", modele="Clio") for i in range(args.cars)]
+    customers = [SimpleNamespace(id=i, id_loc=f"CL-{i:07d}", nom=f"{rng.choice(NOMS)}{rng.randint(1, 9999)}",
+                                 prenom=rng.choice(PRENOMS)) for i in range(args.customers)]
+
+    if args.memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    car_index = PrefixIndex.build("car", (AutocompleteIndex.car_row(car) for car in cars))
+    customer_index = PrefixIndex.build("customer", (AutocompleteIndex.customer_row(c) for c in customers))
+    built = time.perf_counter() - start
+    print(f"{len(car_index)} cars and {len(customer_index)} customers indexed in {built:.1f}s, "
+          f"{(car_index.entries + customer_index.entries):,} entries")
+    if args.memory:
+        print(f"  {tracemalloc.get_traced_memory()[0] / 2 ** 20:.0f} MiB allocated by the index")
+        tracemalloc.stop()
+
+    index = AutocompleteIndex()
+    index._indexes = {"car": car_index, "customer": customer_index}
+    index.loaded_at = time.time()
+
+    timings = []
+    for text in TYPED:
+        for length in range(1, len(text) + 1):
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                index.search(text[:length], limit=10)
+                timings.append((time.perf_counter() - t0) * 1e6)
+    print(f"{len(timings)} keystrokes: p50 {percentile(timings, 0.5):.1f} us, p99 {percentile(timings, 0.99):.1f} us")
+
+    start = time.perf_counter()
+    for offset in range(0, 50000, 1000):
+        index.put_customers([SimpleNamespace(id=args.customers + 1000 + offset + i, id_loc=f"IMP-{offset + i}",
+                                             nom="Import", prenom="Client") for i in range(1000)])
+    print(f"bulk import of 50000 customers in chunks of 1000: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    for i in range(1000):
+        index.put_customers([SimpleNamespace(id=args.customers + i, id_loc=f"NEW-{i}", nom="Nouveau", prenom="Client")])
+    print(f"single-customer update: {(time.perf_counter() - start) * 1000 / 1000:.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Latency benchmark for fleet availability queries (ReservationService.get_available_cars).
+
+Fills a temporary SQLite database with a fleet whose cars each have a long history
+of back-to-back reservations (past and upcoming) plus some active rentals, then
+times "which cars are free over this month" queries over random windows. The
+results are checked against a reference computed in Python, and concurrent
+bookings of overlapping slots are checked to never both succeed.
+
+Usage (from the backend directory):
+    python benchmarks/bench_availability.py [--cars 10000] [--history-days 730] [--repeat 50]
+
+Exits with status 1 if a result differs from the reference, a slot was double
+booked, or the p99 latency is above --target-ms.
+"""
+import argparse
+from bisect import bisect_right
+from collections import Counter
+from datetime import datetime, timedelta
+import gc
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.TemporaryDirectory()
+# Must be set before the app is imported: app.database builds its engine at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir.name, 'bench_availability.db')}"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models.models import Car, CarStatus, Customer, Rental, Reservation  # noqa: E402
+from app.schemas.schemas import ReservationCreate  # noqa: E402
+from app.services.reservation_service import ReservationService, ReservationConflictError  # noqa: E402
+
+NOW = datetime(2030, 1, 1)
+
+
+def populate(n_cars: int, history_days: int, rented_share: float, chunk_size: int = 50000):
+    """Insert the fleet; returns {car_id: sorted [(debut, fin)]} and the set of rented car IDs"""
+    rng = random.Random(42)
+    intervals = {}
+    db = SessionLocal()
+    try:
+        db.execute(insert(Customer), [
+            {"id_loc": f"CL-{i:05d}", "nom": "Client", "prenom": str(i)} for i in range(1000)
+        ])
+        rented = {car_id for car_id in range(1, n_cars + 1) if rng.random() < rented_share}
+        db.execute(insert(Car), [
+            {
+                "num_imma": f"AV-{car_id:06d}", "marque": "Renault", "modele": "Clio", "kilometrage": 0,
+                "etat": CarStatus.RENTED if car_id in rented else CarStatus.AVAILABLE,
+                "prix_location": 45.0,
+            }
+            for car_id in range(1, n_cars + 1)
+        ])
+        db.commit()
+
+        rows = []
+        for car_id in range(1, n_cars + 1):
+            periods = intervals[car_id] = []
+            day = NOW - timedelta(days=history_days) + timedelta(hours=rng.randint(0, 240))
+            end_of_bookings = NOW + timedelta(days=180)
+            while day < end_of_bookings:
+                # Idle gaps of up to six weeks between bookings
+                debut = day + timedelta(hours=rng.randint(0, 24 * 42))
+                fin = debut + timedelta(hours=rng.randint(12, 24 * 7))
+                periods.append((debut, fin))
+                rows.append({
+                    "car_id": car_id, "customer_id": rng.randint(1, 1000),
+                    "date_debut": debut, "date_fin": fin, "created_at": NOW,
+                })
+                day = fin
+                if len(rows) >= chunk_size:
+                    db.execute(insert(Reservation), rows)
+                    rows = []
+        if rows:
+            db.execute(insert(Reservation), rows)
+
+        if rented:
+            db.execute(insert(Rental), [
+                {"car_id": car_id, "customer_id": 1, "date_debut": NOW - timedelta(days=1)} for car_id in rented
+            ])
+        db.commit()
+    finally:
+        db.close()
+    return intervals, rented
+
+
+def reference_available(intervals: dict, rented: set, debut: datetime, fin: datetime) -> list:
+    """Free cars computed from the per-car sorted interval lists"""
+    available = []
+    for car_id, periods in intervals.items():
+        if car_id in rented:
+            continue
+        # Last reservation starting before the window end: the only candidate for an overlap
+        i = bisect_right(periods, (fin,)) - 1
+        if i < 0 or periods[i][1] <= debut:
+            available.append(car_id)
+    return available
+
+
+def percentile(timings: list, p: float) -> float:
+    return sorted(timings)[min(len(timings) - 1, int(len(timings) * p))]
+
+
+def check_concurrent_bookings(threads: int, cars: int) -> bool:
+    """Many threads book overlapping slots of the same cars: at most one per car may succeed"""
+    debut = NOW + timedelta(days=400)
+    barrier = threading.Barrier(threads)
+    outcomes = Counter()
+    booked = Counter()
+    lock = threading.Lock()
+
+    def attempt(i: int):
+        car_id = i % cars + 1
+        start = debut + timedelta(hours=i % 5)
+        barrier.wait()
+        db = SessionLocal()
+        try:
+            ReservationService.create_reservation(db, ReservationCreate(
+                car_id=car_id, customer_id=i % 1000 + 1, date_debut=start, date_fin=start + timedelta(days=2)
+            ))
+            outcome = "booked"
+        except ReservationConflictError:
+            outcome = "conflict"
+        except Exception as e:
+            outcome = f"error: {type(e).__name__}: {e}"
+        finally:
+            db.close()
+        with lock:
+            outcomes[outcome] += 1
+            if outcome == "booked":
+                booked[car_id] += 1
+
+    workers = [threading.Thread(target=attempt, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    print(f"{threads} concurrent bookings of {cars} cars: {dict(outcomes)}")
+    return set(outcomes) <= {"booked", "conflict"} and all(count <= 1 for count in booked.values())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cars", type=int, default=10000)
+    parser.add_argument("--history-days", type=int, default=730, help="Days of past reservations per car")
+    parser.add_argument("--rented-share", type=float, default=0.1, help="Share of cars out on an active rental")
+    parser.add_argument("--window-days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=50, help="Availability queries timed")
+    parser.add_argument("--threads", type=int, default=200, help="Concurrent booking attempts")
+    parser.add_argument("--target-ms", type=float, default=50.0, help="Maximum p99 latency")
+    args = parser.parse_args()
+
+    init_db()
+    start = time.perf_counter()
+    intervals, rented = populate(args.cars, args.history_days, args.rented_share)
+    n_reservations = sum(len(periods) for periods in intervals.values())
+    print(f"{args.cars} cars, {n_reservations} reservations inserted in {time.perf_counter() - start:.1f}s")
+    # The reference intervals are benchmark data, not server state: keep full GC passes over them out of the timings
+    gc.freeze()
+
+    rng = random.Random(7)
+    timings = []
+    mismatches = 0
+    windows = []
+    db = SessionLocal()
+    try:
+        for i in range(args.repeat):
+            debut = NOW + timedelta(hours=rng.randint(0, 24 * 180))
+            fin = debut + timedelta(days=args.window_days)
+            t0 = time.perf_counter()
+            cars = ReservationService.get_available_cars(db, debut, fin)
+            timings.append((time.perf_counter() - t0) * 1000)
+            if i < 5:
+                windows.append((debut, fin, [car.id for car in cars]))
+        for debut, fin, car_ids in windows:
+            if car_ids != reference_available(intervals, rented, debut, fin):
+                mismatches += 1
+    finally:
+        db.close()
+
+    p99 = percentile(timings, 0.99)
+    print(f"{args.window_days}-day windows: p50 {percentile(timings, 0.5):.1f} ms, p99 {p99:.1f} ms "
+          f"({len(cars)} cars free in the last one)")
+
+    checks = {
+        "results match the reference": mismatches == 0,
+        "no slot booked twice": check_concurrent_bookings(args.threads, 10),
+        f"p99 under {args.target_ms:g} ms": p99 <= args.target_ms,
+    }
+    for name, ok in checks.items():
+        print(f"  {'OK  ' if ok else 'FAIL'}  {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Latency benchmark for the customer full-text search (SearchService.search_customers).
+
+Fills a temporary SQLite database with French-style customers (the FTS triggers
+index them as they are inserted) and times typeahead-style queries.
+
+Usage (from the backend directory):
+    python benchmarks/bench_customer_search.py [--customers 1000000] [--repeat 200]
+
+Exits with status 1 if the p99 latency of all queries is over --max-p99-ms,
+accent-insensitive prefix matching, ranking (whole words first, however common
+the prefix) or the search by customer number fails, or the index integrity check
+fails.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.TemporaryDirectory()
+# Must be set before the app is imported: app.database builds its engine at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir.name, 'bench_search.db')}"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models.models import Customer  # noqa: E402
+from app.services.search_service import SearchService  # noqa: E402
+
+NOMS = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau",
+        "Simon", "Laurent", "Lefèvre", "Michel", "Garcia", "David", "Bertrand", "Roux", "Vincent", "Fournier",
+        "Morel", "Girard", "André", "Lefebvre", "Mercier", "Dupont", "Lambert", "Bonnet", "François", "Martinez"]
+PRENOMS = ["Jean", "Marie", "Hélène", "Léa", "Chloé", "Zoé", "Noé", "Jérôme", "Stéphane", "Frédéric",
+           "Cécile", "Gaëlle", "Loïc", "Anaïs", "Benoît", "Élodie", "Théo", "Maël", "Inès", "Raphaël"]
+
+QUERIES = ["d", "du", "dup", "dupont", "lef", "helene", "hél", "lea mar", "gaelle fr", "CL-00012", "cl0999999", "CL-0999999 dupont",
+           "12", "0999999", "99999999", "zzz", "jérôme ber"]
+
+
+def populate(n: int, chunk_size: int = 50000):
+    rng = random.Random(42)
+    db = SessionLocal()
+    try:
+        for start in range(0, n, chunk_size):
+            db.execute(insert(Customer), [
+                {
+                    "id_loc": f"CL-{i:07d}",
+                    "nom": f"{rng.choice(NOMS)}{'' if rng.random() < 0.7 else rng.randint(1, 9999)}",
+                    "prenom": rng.choice(PRENOMS),
+                    "adresse": "Paris",
+                }
+                for i in range(start, min(n, start + chunk_size))
+            ])
+            db.commit()
+    finally:
+        db.close()
+
+
+def percentile(timings: list, p: float) -> float:
+    return sorted(timings)[min(len(timings) - 1, int(len(timings) * p))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--customers", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=200, help="Runs of each query")
+    parser.add_argument("--limit", type=int, default=20, help="Results per query")
+    parser.add_argument("--optimize", action="store_true", help="Rebuild the index after the bulk load (as the CLI does)")
+    parser.add_argument("--max-p99-ms", type=float, default=10.0, help="Allowed p99 latency over all queries")
+    args = parser.parse_args()
+
+    init_db()
+    start = time.perf_counter()
+    populate(args.customers)
+    print(f"{args.customers} customers inserted and indexed in {time.perf_counter() - start:.1f}s")
+
+    db = SessionLocal()
+    ok = True
+    try:
+        if not SearchService.fts_available(db):
+            print("FTS5 index not available")
+            return 1
+        if args.optimize:
+            start = time.perf_counter()
+            SearchService.rebuild_index(db)
+            print(f"Index rebuilt and optimized in {time.perf_counter() - start:.1f}s")
+
+        all_timings = []
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                results = SearchService.search_customers(db, query, args.limit)
+                timings.append((time.perf_counter() - t0) * 1000)
+                db.expunge_all()
+            all_timings.extend(timings)
+            print(f"  {query!r:<14} {len(results):>3} results  p50 {percentile(timings, 0.5):6.2f} ms  "
+                  f"p99 {percentile(timings, 0.99):6.2f} ms")
+        p99 = percentile(all_timings, 0.99)
+        print(f"  all queries: p50 {percentile(all_timings, 0.5):.2f} ms, p99 {p99:.2f} ms")
+        fast = p99 <= args.max_p99_ms
+        print(f"  {'OK  ' if fast else 'FAIL'}  p99 under {args.max_p99_ms:g} ms")
+
+        accent_hits = SearchService.search_customers(db, "helene", 5)
+        ok = bool(accent_hits) and all(customer.prenom == "Hélène" for customer in accent_hits)
+        print(f"  {'OK  ' if ok else 'FAIL'}  'helene' finds Hélène")
+        # Whole-word matches before longer names starting with the word (Dupont4074)
+        ranked = all(customer.nom == "Dupont" for customer in SearchService.search_customers(db, "dupont", args.limit))
+        print(f"  {'OK  ' if ranked else 'FAIL'}  'dupont' ranks the whole word Dupont first")
+        by_id = any(customer.id_loc == "CL-0000012" for customer in SearchService.search_customers(db, "12", args.limit))
+        print(f"  {'OK  ' if by_id else 'FAIL'}  '12' finds CL-0000012")
+        consistent = SearchService.check_index(db)
+        print(f"  {'OK  ' if consistent else 'FAIL'}  index integrity check")
+    finally:
+        db.close()
+    return 0 if fast and ok and ranked and by_id and consistent else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
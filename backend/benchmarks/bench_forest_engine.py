@@ -0,0 +1,85 @@
+"""
+Parity check and microbenchmark: FlatForest vs RandomForestRegressor.predict.
+
+Usage (from the backend directory):
+    python benchmarks/bench_forest_engine.py [--rows 10000] [--repeat 200]
+
+Exits with status 1 if the flat engine disagrees with scikit-learn.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.ensemble import RandomForestRegressor  # noqa: E402
+
+from app.services.forest_engine import FlatForest  # noqa: E402
+from app.services.ml_service import MARQUES, MODEL_PATH, _load_sklearn_model  # noqa: E402
+
+
+def random_features(rng, n: int) -> np.ndarray:
+    return np.column_stack([
+        rng.integers(0, len(MARQUES), n),
+        rng.integers(0, 300001, n),
+        rng.integers(0, 37, n),
+    ]).astype(np.float64)
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def check_model(name: str, model, X: np.ndarray, repeat: int) -> bool:
+    flat = FlatForest.from_sklearn(model)
+    expected = model.predict(X)
+    batch_diff = np.max(np.abs(flat.predict(X) - expected))
+    single_diff = max(abs(flat.predict(X[i:i + 1])[0] - expected[i]) for i in range(min(len(X), 500)))
+    ok = batch_diff < 1e-9 and single_diff < 1e-9
+    print(f"[{name}] {flat.n_estimators} trees, max depth {flat.max_depth}, {flat.nbytes} bytes")
+    print(f"  parity: max |diff| batch={batch_diff:.3g} single={single_diff:.3g} -> {'OK' if ok else 'FAIL'}")
+
+    row = X[:1]
+    sk_single = best_of(lambda: model.predict(row), repeat)
+    flat_single = best_of(lambda: flat.predict(row), repeat)
+    sk_batch = best_of(lambda: model.predict(X), max(3, repeat // 20))
+    flat_batch = best_of(lambda: flat.predict(X), max(3, repeat // 20))
+    print(f"  single row: sklearn {sk_single * 1e6:9.1f} us   flat {flat_single * 1e6:9.1f} us"
+          f"   x{sk_single / flat_single:.1f}")
+    print(f"  {len(X)} rows: sklearn {sk_batch * 1e3:9.2f} ms   flat {flat_batch * 1e3:9.2f} ms"
+          f"   x{sk_batch / flat_batch:.1f}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    X = random_features(rng, args.rows)
+    ok = True
+
+    # Forêt non triviale avec les hyperparamètres de production
+    X_train = random_features(rng, 20000)
+    y_train = 80 - X_train[:, 1] * 1e-4 - X_train[:, 2] * 1.5 + X_train[:, 0] * 3 + rng.normal(0, 2, len(X_train))
+    model = RandomForestRegressor(n_estimators=50, max_depth=10, random_state=42, n_jobs=1).fit(X_train, y_train)
+    ok &= check_model("random data", model, X, args.repeat)
+
+    if os.path.exists(MODEL_PATH):
+        ok &= check_model("published model", _load_sklearn_model(MODEL_PATH), X, args.repeat)
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Cost of repeat fleet page views: per-car download URLs vs immutable image URLs.
+
+Uploads an image for each car of a fleet page, then loads the page's thumbnails
+several times through a minimal browser cache, the way CarsPage did before
+(/api/images/cars/{id}/download?w=320: Cache-Control no-cache, so every view
+revalidates every image and each revalidation looks the car up) and does now
+(the car's image_url: immutable, so a cached image is not requested again).
+Counts requests, SQL statements, bytes and time per view, and checks the
+conditional and range behaviour of the image URLs.
+
+Usage (from the backend directory):
+    python benchmarks/bench_image_serving.py [--cars 24] [--views 20]
+
+Exits with status 1 if a repeat view of the image URLs sends a request or runs
+a query, or a header check fails.
+"""
+import argparse
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.TemporaryDirectory()
+# Must be set before the app is imported: the engine and image directories are read at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir.name, 'bench_image_serving.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(_tmpdir.name, "uploads")
+os.environ["IMAGE_CACHE_DIR"] = os.path.join(_tmpdir.name, "variants")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from PIL import Image  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+BROWSER_ACCEPT = "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8"
+
+statements = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(*args):
+    global statements
+    statements += 1
+
+
+class BrowserCache:
+    """The parts of a browser HTTP cache that matter here: freshness and revalidation"""
+
+    def __init__(self, client: TestClient):
+        self.client = client
+        self.entries = {}
+        self.requests = 0
+        self.bytes = 0
+
+    def fetch(self, url: str):
+        entry = self.entries.get(url)
+        if entry and "immutable" in entry["cache-control"]:
+            return
+        headers = {"Accept": BROWSER_ACCEPT}
+        if entry:
+            headers["If-None-Match"] = entry["etag"]
+        response = self.client.get(url, headers=headers)
+        self.requests += 1
+        self.bytes += len(response.content)
+        assert response.status_code in (200, 304), response.status_code
+        if response.status_code == 200:
+            self.entries[url] = {"etag": response.headers["etag"], "cache-control": response.headers["cache-control"]}
+
+
+def view_pages(client: TestClient, urls: list, views: int) -> dict:
+    """First view and average repeat view of a page showing `urls`"""
+    browser = BrowserCache(client)
+    result = {}
+    for label, n in (("first", 1), ("repeat", views)):
+        requests, sent, queries = browser.requests, browser.bytes, statements
+        start = time.perf_counter()
+        for _ in range(n):
+            for url in urls:
+                browser.fetch(url)
+        result[label] = {
+            "requests": (browser.requests - requests) / n,
+            "bytes": (browser.bytes - sent) / n,
+            "queries": (statements - queries) / n,
+            "ms": (time.perf_counter() - start) * 1000 / n,
+        }
+    return result
+
+
+def check_headers(client: TestClient, url: str, size: int) -> dict:
+    full = client.get(url)
+    etag = full.headers["etag"]
+    part = client.get(url, headers={"Range": "bytes=0-99"})
+    stale = client.get(url, headers={"Range": "bytes=0-99", "If-Range": '"other"'})
+    return {
+        "image URL is immutable": "immutable" in full.headers["cache-control"],
+        "304 on If-None-Match and If-Modified-Since":
+            client.get(url, headers={"If-None-Match": etag}).status_code == 304
+            and client.get(url, headers={"If-Modified-Since": full.headers["last-modified"]}).status_code == 304,
+        "206 for a byte range":
+            part.status_code == 206 and len(part.content) == 100 and part.headers["content-range"] == f"bytes 0-99/{size}",
+        "416 past the end": client.get(url, headers={"Range": f"bytes={size}-"}).status_code == 416,
+        "full image when If-Range does not match": stale.status_code == 200 and len(stale.content) == size,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cars", type=int, default=24, help="Cars on the fleet page")
+    parser.add_argument("--views", type=int, default=20, help="Repeat views of the page")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with TestClient(app) as client:
+        for i in range(args.cars):
+            car_id = client.post("/api/cars/", json={
+                "num_imma": f"IS-{i:03d}", "marque": "Peugeot", "modele": "208", "prix_location": 40
+            }).json()["id"]
+            buffer = io.BytesIO()
+            Image.new("RGB", (1600, 1200), (i * 10 % 256, 120, 200)).save(buffer, "JPEG", quality=90)
+            response = client.post(f"/api/images/cars/{car_id}", files={"file": ("car.jpg", buffer.getvalue(), "image/jpeg")})
+            assert response.status_code == 200, response.text
+        cars = client.get("/api/cars/", params={"limit": args.cars}).json()
+        # Render the thumbnails beforehand: both URLs serve the same cached variants
+        for car in cars:
+            client.get(f"{car['image_url']}?w=320", headers={"Accept": BROWSER_ACCEPT})
+
+        before = view_pages(client, [f"/api/images/cars/{car['id']}/download?w=320" for car in cars], args.views)
+        after = view_pages(client, [f"{car['image_url']}?w=320" for car in cars], args.views)
+
+        print(f"Fleet page of {args.cars} thumbnails, {args.views} repeat views:")
+        print(f"  {'':24}{'requests':>9}{'queries':>9}{'KiB':>8}{'ms':>8}")
+        for name, result in (("download URL", before), ("image_url", after)):
+            for label in ("first", "repeat"):
+                r = result[label]
+                print(f"  {name + ' ' + label:24}{r['requests']:9.0f}{r['queries']:9.0f}"
+                      f"{r['bytes'] / 1024:8.0f}{r['ms']:8.1f}")
+
+        original = cars[0]["image_url"]
+        checks = {
+            "repeat views of image URLs send no request": after["repeat"]["requests"] == 0,
+            "image URLs run no query": after["first"]["queries"] == 0,
+            **check_headers(client, original, len(client.get(original).content)),
+        }
+    for name, ok in checks.items():
+        print(f"  {'OK  ' if ok else 'FAIL'}  {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+API latency during concurrent image uploads.
+
+Starts the application under uvicorn (one worker, in a subprocess, with a
+temporary database and upload directory), then measures GET /api/cars/{id}
+latency alone and again while clients upload images concurrently: slow clients
+trickling a 4 MB image, fast clients sending theirs at once, and clients sending
+oversized bodies. Uploads are spooled and copied off the event loop, so the
+other requests of the worker should not wait for them: an upload holding the
+loop for its whole transfer would add the duration of the slow uploads (seconds)
+to the latency. On a machine with a single core the upload clients share the CPU
+with the server, which alone raises the p99 by a few tens of milliseconds.
+
+Usage (from the backend directory):
+    python benchmarks/bench_image_upload.py [--uploaders 8] [--rounds 3] [--probes 400]
+
+Exits with status 1 if an upload fails, an oversized body is accepted, a partial
+file is left in the upload directory, or the API latency during uploads is
+more than --max-slowdown-ms above the idle one (p50 and p99).
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMAGE_SIZE = 4 * 1024 * 1024
+BOUNDARY = "benchboundary"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(tmpdir: str, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, 'bench_image_upload.db')}",
+        UPLOAD_DIR=os.path.join(tmpdir, "uploads"),
+        ML_WARMUP="false",
+        AUTOCOMPLETE_ENABLED="false",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def multipart_body(size: int, chunk: int, delay: float):
+    """A multipart image upload sent in chunks of `chunk` bytes, `delay` seconds apart"""
+    yield (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"car.jpg\"\r\n"
+           f"Content-Type: image/jpeg\r\n\r\n").encode()
+    data = os.urandom(chunk)
+    sent = 0
+    while sent < size:
+        yield data[:size - sent]
+        sent += chunk
+        if delay:
+            time.sleep(delay)
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def percentile(timings: list, p: float) -> float:
+    return sorted(timings)[min(len(timings) - 1, int(len(timings) * p))]
+
+
+def probe(client: httpx.Client, car_id: int, n: int, interval: float) -> list:
+    timings = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        response = client.get(f"/api/cars/{car_id}")
+        timings.append((time.perf_counter() - t0) * 1000)
+        assert response.status_code == 200, response.status_code
+        time.sleep(interval)
+    return timings
+
+
+def upload(base_url: str, i: int, car_id: int, rounds: int) -> list:
+    """Upload `rounds` images of a car; returns (client kind, status) pairs"""
+    # A third of the clients are slow, a third fast, a third send too much
+    kind = ("slow", "fast", "oversized")[i % 3]
+    size = 6 * 1024 * 1024 if kind == "oversized" else IMAGE_SIZE
+    chunk, delay = (64 * 1024, 0.01) if kind == "slow" else (1024 * 1024, 0)
+    outcomes = []
+    with httpx.Client(base_url=base_url, timeout=120) as client:
+        for _ in range(rounds):
+            try:
+                response = client.post(
+                    f"/api/images/cars/{car_id}", content=multipart_body(size, chunk, delay),
+                    headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+                )
+                status = response.status_code
+            except httpx.TransportError as e:
+                # The server may close the connection while an oversized body is still being sent
+                status = type(e).__name__
+            outcomes.append((kind, status))
+    return outcomes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uploaders", type=int, default=8, help="Concurrent upload clients")
+    parser.add_argument("--rounds", type=int, default=3, help="Uploads per client")
+    parser.add_argument("--probes", type=int, default=400, help="API requests timed per phase")
+    parser.add_argument("--max-slowdown-ms", type=float, nargs=2, default=[5.0, 100.0], metavar=("P50", "P99"),
+                        help="Largest accepted p50 and p99 increase while uploads run")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    port = free_port()
+    server = start_server(tmpdir.name, port)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            car_ids = [
+                client.post("/api/cars/", json={
+                    "num_imma": f"UP-{i:03d}", "marque": "Toyota", "modele": "Yaris", "prix_location": 40
+                }).json()["id"]
+                for i in range(args.uploaders + 1)
+            ]
+            probe_car = car_ids.pop()
+            idle = probe(client, probe_car, args.probes, 0.002)
+
+        # Uploaders run in their own processes so that the client side of the probe is not slowed down
+        with multiprocessing.Pool(args.uploaders) as pool:
+            pending = pool.starmap_async(upload, [(base_url, i, car_id, args.rounds) for i, car_id in enumerate(car_ids)])
+            start = time.perf_counter()
+            with httpx.Client(base_url=base_url, timeout=60) as client:
+                busy = []
+                while not pending.ready() or len(busy) < args.probes:
+                    busy.extend(probe(client, probe_car, 20, 0.002))
+            outcomes = [outcome for client_outcomes in pending.get() for outcome in client_outcomes]
+        elapsed = time.perf_counter() - start
+
+        upload_dir = os.path.join(tmpdir.name, "uploads")
+        leftovers = [name for name in os.listdir(upload_dir) if name.endswith(".part")]
+        stored = len(os.listdir(upload_dir)) - len(leftovers)
+    finally:
+        server.terminate()
+        server.wait()
+
+    accepted = sum(1 for kind, status in outcomes if kind != "oversized" and status == 200)
+    expected = sum(1 for kind, _ in outcomes if kind != "oversized")
+    rejected = sum(1 for kind, status in outcomes if kind == "oversized" and status != 200)
+    oversized = sum(1 for kind, _ in outcomes if kind == "oversized")
+    slowdown = [percentile(busy, p) - percentile(idle, p) for p in (0.5, 0.99)]
+
+    print(f"{len(outcomes)} uploads by {args.uploaders} clients in {elapsed:.1f}s "
+          f"({accepted}/{expected} stored, {rejected}/{oversized} oversized rejected)")
+    for label, timings in (("idle", idle), ("uploads", busy)):
+        print(f"  GET /api/cars/{{id}} {label:<8} p50 {percentile(timings, 0.5):6.2f} ms   "
+              f"p99 {percentile(timings, 0.99):6.2f} ms   max {max(timings):6.2f} ms")
+
+    checks = {
+        "every upload stored": accepted == expected,
+        "every oversized body rejected": rejected == oversized,
+        "one image file per car, no partial files": not leftovers and stored == len(car_ids) - oversized // args.rounds,
+        f"p50 within {args.max_slowdown_ms[0]:g} ms of idle ({slowdown[0]:+.1f} ms)":
+            slowdown[0] <= args.max_slowdown_ms[0],
+        f"p99 within {args.max_slowdown_ms[1]:g} ms of idle ({slowdown[1]:+.1f} ms)":
+            slowdown[1] <= args.max_slowdown_ms[1],
+    }
+    for name, ok in checks.items():
+        print(f"  {'OK  ' if ok else 'FAIL'}  {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Bytes transferred per fleet page load, with and without image variants.
+
+Uploads a distinct photo-like JPEG (2400x1600) for each car of a fleet page, then
+loads the page's images the way CarsPage did before (the originals) and does now
+(?w=320 from a browser that accepts WebP, and ?w=640 for 2x screens), cold (the
+variants are rendered) and warm (served from the variant cache). Also checks that
+identical uploads are stored once and that the variant cache stays within its
+size limit.
+
+Usage (from the backend directory):
+    python benchmarks/bench_image_variants.py [--cars 24]
+
+Exits with status 1 if the thumbnails are not at least --min-reduction times
+smaller than the originals, or a storage check fails.
+"""
+import argparse
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.TemporaryDirectory()
+# Must be set before the app is imported: the engine and image directories are read at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir.name, 'bench_image_variants.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(_tmpdir.name, "uploads")
+os.environ["IMAGE_CACHE_DIR"] = os.path.join(_tmpdir.name, "variants")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from PIL import Image, ImageDraw, ImageFilter  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services.image_service import derivative_cache  # noqa: E402
+from app.services.image_variants import DerivativeCache  # noqa: E402
+
+BROWSER_ACCEPT = "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8"
+
+
+def photos(n: int, size=(2400, 1600)):
+    """n distinct photo-like JPEGs: noise at three scales, so they compress like photos at any size"""
+    width, height = size
+
+    def channel():
+        coarse = Image.effect_noise((width // 16, height // 16), 60).resize(size, Image.Resampling.BICUBIC)
+        mid = Image.effect_noise((width // 4, height // 4), 50).resize(size, Image.Resampling.BICUBIC)
+        fine = Image.effect_noise(size, 30).filter(ImageFilter.GaussianBlur(0.6))
+        return Image.blend(Image.blend(coarse, mid, 0.4), fine, 0.3)
+
+    channels = [channel() for _ in range(3)]
+    for i in range(n):
+        image = Image.merge("RGB", [channels[(i + k) % 3] for k in range(3)])
+        ImageDraw.Draw(image).rectangle((i * 40, i * 20, i * 40 + 600, i * 20 + 300), fill=(i * 10 % 256, 80, 160))
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=92)
+        yield buffer.getvalue()
+
+
+def load_page(client: TestClient, car_ids: list, params: dict) -> tuple:
+    """Fetch one image per car; returns (total bytes, seconds, content types)"""
+    total = 0
+    types = set()
+    start = time.perf_counter()
+    for car_id in car_ids:
+        response = client.get(f"/api/images/cars/{car_id}/download", params=params, headers={"Accept": BROWSER_ACCEPT})
+        assert response.status_code == 200, response.status_code
+        total += len(response.content)
+        types.add(response.headers["content-type"])
+    return total, time.perf_counter() - start, types
+
+
+def check_cache_limit(source_path: str, source_name: str) -> bool:
+    """A small cache evicts the least recently used variants and stays under its limit"""
+    max_bytes = 128 * 1024
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DerivativeCache(directory, max_bytes=max_bytes, workers=2)
+        first = cache.get(source_path, source_name, 160, "webp")
+        for width in (160, 320, 640):
+            for fmt in ("webp", "jpeg"):
+                cache.get(source_path, source_name, width, fmt)
+        on_disk = sum(entry.stat().st_size for entry in os.scandir(directory))
+        stats = cache.stats()
+        print(f"  {max_bytes // 1024} KiB cache after 6 variants: {stats['variants']} kept, "
+              f"{on_disk // 1024} KiB on disk, {stats['evictions']} evicted")
+        return on_disk <= max_bytes and stats["evictions"] > 0 and not os.path.exists(first)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cars", type=int, default=24, help="Cars on the fleet page")
+    parser.add_argument("--min-reduction", type=float, default=10.0, help="Required original/thumbnail bytes ratio")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with TestClient(app) as client:
+        car_ids = [
+            client.post("/api/cars/", json={
+                "num_imma": f"IV-{i:03d}", "marque": "Renault", "modele": "Clio", "prix_location": 40
+            }).json()["id"]
+            for i in range(args.cars + 2)
+        ]
+        start = time.perf_counter()
+        for car_id, photo in zip(car_ids, photos(args.cars)):
+            response = client.post(f"/api/images/cars/{car_id}", files={"file": ("photo.jpg", photo, "image/jpeg")})
+            assert response.status_code == 200, response.text
+        print(f"{args.cars} photos uploaded in {time.perf_counter() - start:.1f}s")
+
+        # The two extra cars get a copy of the first car's photo
+        first_photo = client.get(f"/api/images/cars/{car_ids[0]}/download").content
+        shared = {
+            client.post(f"/api/images/cars/{car_id}", files={"file": ("copy.jpg", first_photo, "image/jpeg")}).json()["filename"]
+            for car_id in car_ids[args.cars:]
+        }
+        page = car_ids[:args.cars]
+
+        original, original_s, _ = load_page(client, page, {})
+        cold, cold_s, types = load_page(client, page, {"w": 320})
+        warm, warm_s, _ = load_page(client, page, {"w": 320})
+        retina, retina_s, _ = load_page(client, page, {"w": 640})
+
+        print(f"Fleet page of {args.cars} cars:")
+        print(f"  originals          {original / 1024:8.0f} KiB  {original_s * 1000:6.0f} ms")
+        print(f"  ?w=320 cold        {cold / 1024:8.0f} KiB  {cold_s * 1000:6.0f} ms  ({', '.join(sorted(types))})")
+        print(f"  ?w=320 warm        {warm / 1024:8.0f} KiB  {warm_s * 1000:6.0f} ms")
+        print(f"  ?w=640 (2x) cold   {retina / 1024:8.0f} KiB  {retina_s * 1000:6.0f} ms")
+        print(f"  variant cache: {derivative_cache.stats()}")
+
+        upload_dir = os.environ["UPLOAD_DIR"]
+        stored = [name for name in os.listdir(upload_dir) if not name.startswith(".")]
+        source_name = next(iter(shared))
+        checks = {
+            f"thumbnails {original / warm:.0f}x smaller than originals": original / warm >= args.min_reduction,
+            "identical uploads stored once": len(shared) == 1 and len(stored) == args.cars,
+            "variant cache stays under its limit": check_cache_limit(os.path.join(upload_dir, source_name), source_name),
+        }
+    for name, ok in checks.items():
+        print(f"  {'OK  ' if ok else 'FAIL'}  {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Cost and correctness of the /metrics instrumentation.
+
+1. Overhead: calls a minimal ASGI route directly (no server, no network) with
+   and without MetricsMiddleware and reports the added time per request.
+2. Threads: several threads record counters and histograms at once into their
+   own shards; the totals must be exact.
+3. Workers: runs uvicorn with --workers and METRICS_DIR, sends requests on new
+   connections so that every worker serves some, then scrapes /metrics a few
+   times (any worker may answer): each scrape must count every request.
+
+Usage (from the backend directory):
+    python benchmarks/bench_metrics.py [--requests 20000] [--workers 2]
+
+Exits with status 1 if the middleware adds more than --max-overhead-us per
+request, a total is wrong, or a worker served no request.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from fastapi import FastAPI  # noqa: E402
+
+from app.metrics import Counter, Histogram, Registry  # noqa: E402
+from app.middleware import MetricsMiddleware  # noqa: E402
+
+
+def per_request_us(app, n: int) -> float:
+    """Mean time of n GET requests sent straight to the ASGI app, in microseconds"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def run():
+        start = time.perf_counter()
+        for i in range(n):
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                "scheme": "http", "path": f"/api/cars/{i % 100}", "raw_path": b"", "root_path": "",
+                "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+            }
+            await app(scope, receive, send)
+        return (time.perf_counter() - start) / n * 1e6
+
+    return asyncio.run(run())
+
+
+def measure_overhead(n: int) -> tuple:
+    app = FastAPI()
+
+    @app.get("/api/cars/{car_id}")
+    async def get_car(car_id: int):
+        return {"id": car_id}
+
+    instrumented = MetricsMiddleware(app)
+    per_request_us(app, n // 10)  # warm up the routing and validation caches
+    per_request_us(instrumented, n // 10)
+    # Alternate the runs so that drift in machine load affects both alike
+    plain, measured = [], []
+    for _ in range(5):
+        plain.append(per_request_us(app, n // 5))
+        measured.append(per_request_us(instrumented, n // 5))
+    return min(plain), min(measured)
+
+
+def record_from_threads(threads: int, per_thread: int) -> tuple:
+    registry = Registry()
+    counter = Counter("bench_total", "Bench counter", ("kind",), registry=registry)
+    histogram = Histogram("bench_seconds", "Bench histogram", ("kind",), registry=registry)
+    start_line = threading.Barrier(threads)
+
+    def work(index: int):
+        kind = "even" if index % 2 == 0 else "odd"
+        start_line.wait()
+        for i in range(per_thread):
+            counter.inc(kind)
+            histogram.observe(i % 7 / 1000, kind)
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    snapshot = registry.snapshot()
+    counted = sum(value for (name, _), value in snapshot.items() if name == "bench_total")
+    observed = sum(sum(value[:-1]) for (name, _), value in snapshot.items() if name == "bench_seconds")
+    return counted, observed, threads * per_thread * 2 / elapsed
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def scrape_count(text: str, route: str) -> int:
+    pattern = re.compile(r'^http_requests_total\{method="GET",route="' + re.escape(route) + r'",status="\d+"\} (\d+)$', re.M)
+    return sum(int(count) for count in pattern.findall(text))
+
+
+def check_workers(workers: int, n_requests: int) -> dict:
+    tmpdir = tempfile.TemporaryDirectory()
+    metrics_dir = os.path.join(tmpdir.name, "metrics")
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(tmpdir.name, 'bench_metrics.db')}",
+        UPLOAD_DIR=os.path.join(tmpdir.name, "uploads"),
+        METRICS_DIR=metrics_dir,
+        METRICS_FLUSH_SECONDS="0.5",
+        ML_WARMUP="false",
+        AUTOCOMPLETE_ENABLED="false",
+    )
+    # Create the schema first: workers starting together on an empty file would race to create it
+    subprocess.run([sys.executable, "-c", "from app.database import init_db; init_db()"],
+                   cwd=BACKEND_DIR, env=env, check=True)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.time() + 60
+        while len(os.listdir(metrics_dir) if os.path.isdir(metrics_dir) else []) < workers:
+            if time.time() > deadline:
+                raise RuntimeError("workers did not start")
+            time.sleep(0.2)
+
+        # A new connection per request, so that the kernel spreads them over the workers
+        limits = httpx.Limits(max_keepalive_connections=0)
+        with httpx.Client(base_url=base_url, timeout=30, limits=limits) as client:
+            car_id = client.post("/api/cars/", json={
+                "num_imma": "MET-0001", "marque": "Renault", "modele": "Clio", "kilometrage": 1000, "prix_location": 40,
+            }).json()["id"]
+            for _ in range(n_requests):
+                client.get(f"/api/cars/{car_id}")
+            time.sleep(1.5)  # at least two snapshots of every worker
+            scrapes = [client.get("/metrics").text for _ in range(2 * workers)]
+        served = []
+        for name in os.listdir(metrics_dir):
+            with open(os.path.join(metrics_dir, name)) as f:
+                served.append(sum(value for metric, labels, value in json.load(f)["samples"]
+                                  if metric == "http_requests_total" and labels[1] == "/api/cars/{car_id}"))
+    finally:
+        server.terminate()
+        server.wait()
+        tmpdir.cleanup()
+    return {"counts": [scrape_count(text, "/api/cars/{car_id}") for text in scrapes], "served": served}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000, help="ASGI calls to time, per variant")
+    parser.add_argument("--threads", type=int, default=8, help="Threads recording at once")
+    parser.add_argument("--per-thread", type=int, default=50000, help="Samples recorded by each thread")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes")
+    parser.add_argument("--http-requests", type=int, default=300, help="Requests sent to the workers")
+    parser.add_argument("--max-overhead-us", type=float, default=25.0, help="Allowed middleware cost per request")
+    args = parser.parse_args()
+
+    plain, measured = measure_overhead(args.requests)
+    overhead = measured - plain
+    print(f"ASGI route: {plain:6.1f} us/request without metrics, {measured:6.1f} us with ({overhead:+.1f} us)")
+
+    counted, observed, rate = record_from_threads(args.threads, args.per_thread)
+    expected = args.threads * args.per_thread
+    print(f"{args.threads} threads: {counted} counts and {observed} observations of {expected} each, "
+          f"{rate / 1e6:.2f}M samples/s")
+
+    workers = check_workers(args.workers, args.http_requests)
+    print(f"{args.workers} workers, {args.http_requests} requests: served per worker {workers['served']}, "
+          f"counted per scrape {workers['counts']}")
+
+    checks = {
+        f"middleware adds at most {args.max_overhead_us:g} us per request": overhead <= args.max_overhead_us,
+        "thread shards add up exactly": counted == expected and observed == expected,
+        "every worker served requests": len(workers["served"]) == args.workers and all(workers["served"]),
+        "every scrape counts every request": all(count == args.http_requests for count in workers["counts"]),
+    }
+    for name, ok in checks.items():
+        print(f"  {'OK  ' if ok else 'FAIL'}  {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Latency benchmark for the versioned response cache (app.response_cache).
+
+Fills a temporary SQLite database with a fleet, then times large GET /api/cars/
+pages through the application three ways: rebuilt on every request (cache
+cleared), served from the cache, and revalidated with If-None-Match (304). It
+also checks that every kind of write invalidates the cached pages and that a
+stale ETag is never answered with 304.
+
+Usage (from the backend directory):
+    python benchmarks/bench_response_cache.py [--cars 20000] [--limit 1000] [--repeat 100]
+
+Exits with status 1 if a stale response is served or the cached p50 is not at
+least --min-speedup times faster than the uncached one.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.TemporaryDirectory()
+# Must be set before the app is imported: app.database builds its engine at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir.name, 'bench_response_cache.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.models import Car, CarStatus  # noqa: E402
+from app.response_cache import response_cache  # noqa: E402
+
+
+def populate(n_cars: int):
+    db = SessionLocal()
+    try:
+        db.execute(insert(Car), [
+            {
+                "num_imma": f"RC-{i:06d}", "marque": "Peugeot", "modele": "208", "kilometrage": i,
+                "etat": CarStatus.AVAILABLE, "prix_location": 40.0 + i % 30,
+            }
+            for i in range(n_cars)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def percentile(timings: list, p: float) -> float:
+    return sorted(timings)[min(len(timings) - 1, int(len(timings) * p))]
+
+
+def time_requests(client: TestClient, repeat: int, params: dict, headers=None, clear=False) -> list:
+    timings = []
+    for _ in range(repeat):
+        if clear:
+            response_cache.clear()
+        t0 = time.perf_counter()
+        response = client.get("/api/cars/", params=params, headers=headers)
+        timings.append((time.perf_counter() - t0) * 1000)
+        assert response.status_code in (200, 304), response.status_code
+    return timings
+
+
+def check_invalidation(client: TestClient) -> bool:
+    """After each kind of write, cached views must match a freshly built response"""
+    views = [("/api/cars/", {"limit": 5}), ("/api/cars/search/rented", {}), ("/api/statistics", {})]
+    ok = True
+
+    def after(label: str, write):
+        nonlocal ok
+        etags = [client.get(path, params=params).headers["etag"] for path, params in views]
+        result = write()
+        served = [client.get(path, params=params, headers={"If-None-Match": etag})
+                  for (path, params), etag in zip(views, etags)]
+        response_cache.clear()
+        for (path, params), etag, response in zip(views, etags, served):
+            rebuilt = client.get(path, params=params)
+            stale = (
+                response.headers["etag"] != etag if response.status_code == 304
+                else response.content != rebuilt.content
+            ) or response.headers["etag"] != rebuilt.headers["etag"]
+            if stale:
+                print(f"  stale {path} after {label}")
+                ok = False
+        return result
+
+    first = client.get("/api/cars/", params={"limit": 1}).json()[0]
+    customer = client.post("/api/customers/", json={"id_loc": "RC-CUST", "nom": "Cache", "prenom": "Test"}).json()
+    after("update", lambda: client.put(f"/api/cars/{first['id']}", json={"kilometrage": 123456}))
+    rental = after("rental", lambda: client.post(
+        "/api/rentals/", json={"car_id": first["id"], "customer_id": customer["id"]}
+    )).json()
+    after("return", lambda: client.post(f"/api/rentals/{rental['id']}/return"))
+    car = after("create", lambda: client.post(
+        "/api/cars/", json={"num_imma": "AA-000-AA", "marque": "Fiat", "modele": "500", "prix_location": 30}
+    )).json()
+    after("delete", lambda: client.delete(f"/api/cars/{car['id']}"))
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cars", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=1000, help="Cars per page")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--min-speedup", type=float, default=3.0, help="Required uncached/cached p50 ratio")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with TestClient(app) as client:
+        populate(args.cars)
+        params = {"limit": args.limit, "skip": args.cars // 2}
+
+        uncached = time_requests(client, args.repeat, params, clear=True)
+        etag = client.get("/api/cars/", params=params).headers["etag"]
+        cached = time_requests(client, args.repeat, params)
+        not_modified = time_requests(client, args.repeat, params, headers={"If-None-Match": etag})
+        size = len(client.get("/api/cars/", params=params).content)
+
+        print(f"GET /api/cars/?limit={args.limit} ({size / 1024:.0f} KiB) over {args.cars} cars:")
+        for label, timings in (("uncached", uncached), ("cached", cached), ("304", not_modified)):
+            print(f"  {label:<9} p50 {percentile(timings, 0.5):6.2f} ms   p99 {percentile(timings, 0.99):6.2f} ms")
+        print(f"  cache: {response_cache.stats()}")
+
+        speedup = percentile(uncached, 0.5) / percentile(cached, 0.5)
+        checks = {
+            "writes invalidate cached responses": check_invalidation(client),
+            f"cached at least {args.min_speedup:g}x faster ({speedup:.1f}x)": speedup >= args.min_speedup,
+        }
+    for name, ok in checks.items():
+        print(f"  {'OK  ' if ok else 'FAIL'}  {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
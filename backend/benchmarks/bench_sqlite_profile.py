@@ -0,0 +1,210 @@
+"""
+Throughput of the SQLite engine profiles under concurrent reads and writes.
+
+Runs the same mixed workload against a fresh database with DATABASE_PROFILE=default
+(rollback journal, driver defaults) and DATABASE_PROFILE=tuned (WAL,
+synchronous=NORMAL, busy timeout, cache and mmap, pool sizing, read-only engine
+for reads). Several processes stand in for uvicorn workers; in each, threads
+stand in for requests: a write checks a car out and returns it (RentalService,
+as the routes do), a read lists a page of cars or fetches one (through
+ReadSessionLocal, as the GET routes do), and a few reads stream the car export
+to a client that takes a while to receive it. With the rollback journal, a
+writer cannot commit while such a cursor is open; with WAL it does not wait.
+Single-core machines are bound by CPU well before SQLite, which narrows the gap.
+
+Usage (from the backend directory):
+    python benchmarks/bench_sqlite_profile.py [--processes 2] [--threads 8] [--seconds 5]
+
+Exits with status 1 if the tuned profile is not at least --min-gain times the
+default throughput, reports a database error, or leaves the fleet counters
+inconsistent.
+"""
+import argparse
+from collections import Counter
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PROFILES = ("default", "tuned")
+
+
+def configure(env: dict):
+    """Pool initializer: the engine settings are read when app.database is imported"""
+    os.environ.update(env)
+    import app.database  # noqa: F401
+
+
+def seed(n_cars: int, n_customers: int) -> tuple:
+    from app.database import SessionLocal, init_db
+    from app.schemas.schemas import CarCreate, CustomerCreate
+    from app.services.car_service import CarService
+    from app.services.customer_service import CustomerService
+    from app.services.stats_service import StatsService
+
+    init_db()
+    db = SessionLocal()
+    try:
+        StatsService.rebuild(db)
+        car_ids = [
+            CarService.create_car(db, CarCreate(
+                num_imma=f"SQL-{i:04d}", marque="Renault", modele="Clio", kilometrage=1000 * i, prix_location=40
+            )).id
+            for i in range(n_cars)
+        ]
+        customer_ids = [
+            CustomerService.create_customer(db, CustomerCreate(id_loc=f"SQL-{i:04d}", nom="Client", prenom=str(i))).id
+            for i in range(n_customers)
+        ]
+    finally:
+        db.close()
+    return car_ids, customer_ids
+
+
+def run_worker(car_ids: list, customer_ids: list, threads: int, start_at: float, seconds: float,
+               write_ratio: float, export_ratio: float) -> dict:
+    """Run `threads` request loops in this process until the deadline; returns counts and latencies"""
+    from app.database import ReadSessionLocal, SessionLocal
+    from app.schemas.schemas import RentalCreate, RentalReturn
+    from app.services.car_service import CarService
+    from app.services.export_service import ExportService
+    from app.services.rental_service import CarNotAvailableError, RentalService
+
+    result = {"reads": [], "writes": [], "errors": Counter()}
+    lock = threading.Lock()
+
+    def write(rng: random.Random):
+        db = SessionLocal()
+        try:
+            rental = RentalService.create_rental(db, RentalCreate(
+                car_id=rng.choice(car_ids), customer_id=rng.choice(customer_ids)
+            ))
+            RentalService.return_rental(db, rental.id, RentalReturn(id=rental.id))
+        except CarNotAvailableError:
+            pass
+        finally:
+            db.close()
+
+    def read(rng: random.Random):
+        if rng.random() < export_ratio:
+            # Streams every car to a client that reads a batch every 10 ms: the cursor
+            # stays open until the last one is sent
+            for _ in ExportService.stream("cars", "csv", batch_size=50):
+                time.sleep(0.01)
+            return
+        db = ReadSessionLocal()
+        try:
+            if rng.random() < 0.5:
+                CarService.get_all_cars(db, skip=rng.randrange(len(car_ids)), limit=50)
+            else:
+                CarService.get_car(db, rng.choice(car_ids))
+        finally:
+            db.close()
+
+    def loop(seed: int):
+        rng = random.Random(seed)
+        time.sleep(max(0.0, start_at - time.time()))
+        deadline = start_at + seconds
+        while time.time() < deadline:
+            kind = "writes" if rng.random() < write_ratio else "reads"
+            t0 = time.perf_counter()
+            try:
+                (write if kind == "writes" else read)(rng)
+            except Exception as e:
+                with lock:
+                    result["errors"][f"{type(e).__name__}: {str(e).splitlines()[0][:80]}"] += 1
+                continue
+            with lock:
+                result[kind].append((time.perf_counter() - t0) * 1000)
+
+    workers = [threading.Thread(target=loop, args=(os.getpid() * 100 + i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return result
+
+
+def counters_consistent() -> bool:
+    from app.database import SessionLocal
+    from app.services.stats_service import StatsService
+
+    db = SessionLocal()
+    try:
+        return StatsService.rebuild(db, dry_run=True)["consistent"]
+    finally:
+        db.close()
+
+
+def percentile(timings: list, p: float) -> float:
+    return sorted(timings)[min(len(timings) - 1, int(len(timings) * p))] if timings else float("nan")
+
+
+def run_profile(profile: str, args) -> dict:
+    tmpdir = tempfile.TemporaryDirectory(dir=args.dir)
+    env = {
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmpdir.name, 'bench_sqlite_profile.db')}",
+        "DATABASE_PROFILE": profile,
+    }
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(args.processes, initializer=configure, initargs=(env,)) as pool:
+        car_ids, customer_ids = pool.apply(seed, (args.cars, 50))
+        start_at = time.time() + 1.0
+        results = pool.starmap(run_worker, [
+            (car_ids, customer_ids, args.threads, start_at, args.seconds, args.write_ratio, args.export_ratio)
+        ] * args.processes)
+        consistent = pool.apply(counters_consistent)
+    tmpdir.cleanup()
+
+    merged = {"reads": [], "writes": [], "errors": Counter(), "consistent": consistent}
+    for result in results:
+        merged["reads"].extend(result["reads"])
+        merged["writes"].extend(result["writes"])
+        merged["errors"].update(result["errors"])
+    return merged
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=2, help="Worker processes")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent requests per process")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Share of requests that write")
+    parser.add_argument("--export-ratio", type=float, default=0.05, help="Share of reads that stream the car export")
+    parser.add_argument("--cars", type=int, default=500, help="Cars in the fleet")
+    parser.add_argument("--min-gain", type=float, default=1.3, help="Required tuned/default throughput ratio")
+    parser.add_argument("--dir", default=None, help="Directory of the database files (default: system temp)")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{args.processes} processes x {args.threads} threads, {args.seconds:g}s, "
+          f"{args.write_ratio:.0%} writes (checkout + return):")
+    for profile in PROFILES:
+        r = results[profile] = run_profile(profile, args)
+        r["throughput"] = (len(r["reads"]) + len(r["writes"])) / args.seconds
+        print(f"  {profile:<8} {r['throughput']:8.0f} req/s   writes {len(r['writes']) / args.seconds:6.0f}/s "
+              f"p50 {percentile(r['writes'], 0.5):7.1f} ms p99 {percentile(r['writes'], 0.99):7.1f} ms   "
+              f"reads p50 {percentile(r['reads'], 0.5):6.1f} ms p99 {percentile(r['reads'], 0.99):7.1f} ms   "
+              f"errors {sum(r['errors'].values())}")
+        for error, count in r["errors"].most_common(3):
+            print(f"           {count} x {error}")
+
+    gain = results["tuned"]["throughput"] / max(results["default"]["throughput"], 1e-9)
+    checks = {
+        f"tuned throughput {gain:.1f}x default (at least {args.min_gain:g}x)": gain >= args.min_gain,
+        "no database errors with the tuned profile": not results["tuned"]["errors"],
+        "fleet counters consistent": results["tuned"]["consistent"],
+    }
+    for name, ok in checks.items():
+        print(f"  {'OK  ' if ok else 'FAIL'}  {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
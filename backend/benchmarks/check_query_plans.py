@@ -0,0 +1,91 @@
+"""
+Query-plan regression test: the hot queries must use their indexes (HOT_QUERIES).
+
+Builds two temporary SQLite databases and runs EXPLAIN QUERY PLAN on each:
+a fresh one (create_all, then the migrations) and one upgraded from the
+schema before the migrations (create_all without the migrated indexes, then
+the migrations). The order in which create_all creates the indexes depends on
+the hash seed, and SQLite picks between equally good indexes by creation
+order, so both are checked in a child process per PYTHONHASHSEED.
+
+Usage (from the backend directory):
+    python benchmarks/check_query_plans.py [--seeds 8]
+
+Exits with status 1 if a hot query does not use its index for any seed.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.migrations import HOT_QUERIES, check_query_plans, run_migrations  # noqa: E402
+from app.models import models  # noqa: E402,F401  (registers the tables on Base.metadata)
+
+# Indexes created by the migrations rather than by the first create_all
+MIGRATED_INDEXES = ("ix_rentals_car_id", "ix_rentals_customer_id", "ix_rentals_active", "ix_customers_nom_prenom_id")
+
+
+def fresh_database(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    return engine
+
+
+def upgraded_database(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for index in MIGRATED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    run_migrations(engine)
+    return engine
+
+
+def check_single() -> int:
+    """Check both databases in this process (one hash seed)"""
+    ok = True
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, build in (("fresh", fresh_database), ("upgraded", upgraded_database)):
+            engine = build(os.path.join(tmpdir, f"{name}.db"))
+            for result in check_query_plans(engine):
+                if not result["ok"]:
+                    ok = False
+                    print(f"  FAIL  {name} database: {result['query']} does not use {result['expected_index']}")
+                    for step in result["plan"]:
+                        print(f"          {step}")
+            engine.dispose()
+    return 0 if ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seeds", type=int, default=8, help="Hash seeds to check (1..N)")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.single:
+        return check_single()
+
+    failed = []
+    for seed in range(1, args.seeds + 1):
+        env = dict(os.environ, PYTHONHASHSEED=str(seed))
+        returncode = subprocess.run([sys.executable, os.path.abspath(__file__), "--single"],
+                                    cwd=BACKEND_DIR, env=env).returncode
+        if returncode != 0:
+            failed.append(seed)
+    print(f"{len(HOT_QUERIES)} hot queries, fresh and upgraded databases, "
+          f"{args.seeds} hash seeds")
+    print(f"  {'OK  ' if not failed else 'FAIL'}  every hot query uses its index"
+          + (f" (failed with PYTHONHASHSEED={', '.join(map(str, failed))})" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Concurrency stress test for the rental checkout (RentalService.create_rental).
+
+Hundreds of threads try to rent a handful of cars at the same time against a
+temporary SQLite database. Every car must be rented exactly once, every other
+attempt must fail with CarNotAvailableError, and the fleet counters must still
+match the cars table.
+
+Usage (from the backend directory):
+    python benchmarks/checkout_stress.py [--threads 300] [--cars 10]
+
+Exits with status 1 if a car was double-booked or the counters drifted.
+"""
+import argparse
+from collections import Counter
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.TemporaryDirectory()
+# Must be set before the app is imported: app.database builds its engine at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir.name, 'checkout_stress.db')}"
+
+from sqlalchemy import func, select  # noqa: E402
+
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models.models import Car, CarStatus, Rental  # noqa: E402
+from app.schemas.schemas import CarCreate, CustomerCreate, RentalCreate  # noqa: E402
+from app.services.car_service import CarService  # noqa: E402
+from app.services.customer_service import CustomerService  # noqa: E402
+from app.services.rental_service import RentalService, CarNotAvailableError  # noqa: E402
+from app.services.stats_service import StatsService  # noqa: E402
+
+
+def seed(n_cars: int, n_customers: int):
+    db = SessionLocal()
+    try:
+        # Create the counters row up front so the checkouts maintain it
+        StatsService.rebuild(db)
+        car_ids = [
+            CarService.create_car(db, CarCreate(
+                num_imma=f"STRESS-{i}", marque="Toyota", modele="Corolla",
+                kilometrage=10000, prix_location=50.0
+            )).id
+            for i in range(n_cars)
+        ]
+        customer_ids = [
+            CustomerService.create_customer(db, CustomerCreate(
+                id_loc=f"STRESS-{i}", nom="Client", prenom=str(i)
+            )).id
+            for i in range(n_customers)
+        ]
+    finally:
+        db.close()
+    return car_ids, customer_ids
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=300, help="Concurrent checkout attempts")
+    parser.add_argument("--cars", type=int, default=10, help="Cars competed for")
+    args = parser.parse_args()
+
+    init_db()
+    car_ids, customer_ids = seed(args.cars, 50)
+
+    barrier = threading.Barrier(args.threads)
+    outcomes = Counter()
+    rented = Counter()
+    lock = threading.Lock()
+
+    def attempt(i: int):
+        car_id = car_ids[i % len(car_ids)]
+        customer_id = customer_ids[i % len(customer_ids)]
+        barrier.wait()
+        db = SessionLocal()
+        try:
+            RentalService.create_rental(db, RentalCreate(car_id=car_id, customer_id=customer_id))
+            outcome = "rented"
+        except CarNotAvailableError:
+            outcome = "not available"
+        except Exception as e:
+            outcome = f"error: {type(e).__name__}: {e}"
+        finally:
+            db.close()
+        with lock:
+            outcomes[outcome] += 1
+            if outcome == "rented":
+                rented[car_id] += 1
+
+    threads = [threading.Thread(target=attempt, args=(i,)) for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    db = SessionLocal()
+    try:
+        rentals_per_car = dict(db.execute(
+            select(Rental.car_id, func.count()).group_by(Rental.car_id)
+        ).all())
+        still_available = db.scalar(select(func.count()).select_from(Car).where(Car.etat == CarStatus.AVAILABLE))
+        stats = StatsService.rebuild(db, dry_run=True)
+    finally:
+        db.close()
+
+    print(f"{args.threads} checkouts of {len(car_ids)} cars in {elapsed:.2f}s")
+    for outcome, count in sorted(outcomes.items()):
+        print(f"  {outcome}: {count}")
+
+    checks = {
+        "each car rented exactly once (responses)": all(rented[car_id] == 1 for car_id in car_ids),
+        "each car has exactly one rental row": all(rentals_per_car.get(car_id) == 1 for car_id in car_ids),
+        "no car left available": still_available == 0,
+        "no unexpected errors": set(outcomes) <= {"rented", "not available"},
+        "fleet counters consistent": stats["consistent"],
+    }
+    for name, ok in checks.items():
+        print(f"  {'OK  ' if ok else 'FAIL'}  {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Regression checks: the benchmark scripts that verify correctness, run in turn.
+
+Each script runs in its own process (some build their temporary database at
+import time) with sizes small enough for a quick run, and prints its own
+report. A summary lists the checks that failed.
+
+Usage (from the backend directory):
+    python benchmarks/run_checks.py [--only NAME ...]
+
+Exits with status 1 if any check fails.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+# name -> (script, arguments, what it verifies)
+CHECKS = {
+    "forest-parity": (
+        "bench_forest_engine.py", ["--rows", "2000", "--repeat", "20"],
+        "the flat forest engine predicts exactly what scikit-learn predicts",
+    ),
+    "query-plans": (
+        "check_query_plans.py", [],
+        "the hot queries use their indexes, on fresh and upgraded databases",
+    ),
+    "double-checkout": (
+        "checkout_stress.py", ["--threads", "300", "--cars", "10"],
+        "concurrent checkouts never rent a car twice",
+    ),
+}
+
+
+def run_check(name: str) -> bool:
+    script, arguments, description = CHECKS[name]
+    print(f"=== {name}: {description}", flush=True)
+    start = time.perf_counter()
+    returncode = subprocess.run([sys.executable, os.path.join(BENCHMARKS_DIR, script), *arguments],
+                                cwd=BACKEND_DIR).returncode
+    print(f"=== {name}: {'OK' if returncode == 0 else 'FAIL'} in {time.perf_counter() - start:.1f}s\n", flush=True)
+    return returncode == 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=list(CHECKS), help="Checks to run (default: all)")
+    args = parser.parse_args()
+
+    failed = [name for name in args.only or CHECKS if not run_check(name)]
+    if failed:
+        print(f"FAIL  {', '.join(failed)}")
+        return 1
+    print(f"OK  {len(args.only or CHECKS)} checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+import { useEffect, useRef } from 'react';
+import { API_BASE_URL } from '../services/api';
+
+/**
+ * Hook personnalisé pour suivre les changements de la flotte en direct (SSE /api/events)
+ *
+ * handlers: { 'car.updated': (data) => ..., reset: () => ..., '*': (data, type) => ... }
+ * EventSource se reconnecte seul en renvoyant Last-Event-ID : le serveur rejoue les
+ * événements manqués, ou envoie "reset" s'il ne les a plus (il faut alors recharger).
+ */
+export const useFleetEvents = (types, handlers) => {
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+  const typesParam = types ? types.join(',') : '';
+
+  useEffect(() => {
+    const query = typesParam ? `?types=${encodeURIComponent(typesParam)}` : '';
+    const source = new EventSource(`${API_BASE_URL}/events/${query}`);
+
+    source.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      const handler = handlersRef.current[event.type] || handlersRef.current['*'];
+      if (handler) handler(event.data, event.type);
+    };
+
+    return () => source.close();
+  }, [typesParam]);
+};
+
+export default useFleetEvents;
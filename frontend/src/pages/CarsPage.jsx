@@ -4,6 +4,7 @@ import Modal from '../components/Modal';
 import LoadingSpinner from '../components/LoadingSpinner';
 import ErrorMessage from '../components/ErrorMessage';
 import SuccessMessage from '../components/SuccessMessage';
+import useFleetEvents from '../hooks/useFleetEvents';
 import '../styles/CarsPage.css';
 
 function CarsPage() {
@@ -25,6 +26,27 @@ function CarsPage() {
     prix_location: 0,
   });
 
+  // Apply other desks' changes (and our own) as they happen instead of refetching the list
+  const upsertCar = (car) => setCars(prev => (
+    prev.some(c => c.id === car.id) ? prev.map(c => (c.id === car.id ? { ...c, ...car } : c)) : [...prev, car]
+  ));
+  const patchCar = (changes) => setCars(prev => prev.map(c => (c.id === changes.id ? { ...c, ...changes } : c)));
+  const removeCar = (id) => setCars(prev => prev.filter(c => c.id !== id));
+
+  useFleetEvents(['car', 'cars', 'import'], {
+    'car.created': upsertCar,
+    'car.updated': patchCar,
+    'car.deleted': (data) => removeCar(data.id),
+    'cars.repriced': (data) => {
+      const prices = new Map(data.prices);
+      setCars(prev => prev.map(c => (prices.has(c.id) ? { ...c, prix_location: prices.get(c.id) } : c)));
+    },
+    'import.completed': (data) => {
+      if (data.entity !== 'customers') fetchCars();
+    },
+    reset: () => fetchCars(),
+  });
+
   useEffect(() => {
     fetchCars();
   }, []);
@@ -109,8 +131,9 @@ function CarsPage() {
         throw new Error(errorData.detail || 'Upload failed');
       }
 
+      const data = await response.json();
+      patchCar({ id: selectedCarForImage.id, image_filename: data.filename, image_url: data.url });
       setSuccess('Image uploaded successfully!');
-      fetchCars();
       handleCloseImageModal();
     } catch (err) {
       setError('Upload failed: ' + err.message);
@@ -129,8 +152,8 @@ function CarsPage() {
 
       if (!response.ok) throw new Error('Delete failed');
 
+      patchCar({ id: carId, image_filename: null, image_url: null });
       setSuccess('Image deleted successfully!');
-      fetchCars();
     } catch (err) {
       setError('Failed to delete image: ' + err.message);
     }
@@ -152,14 +175,15 @@ function CarsPage() {
 
     try {
       if (editingCar) {
-        await carsAPI.update(editingCar.id, formData);
+        const response = await carsAPI.update(editingCar.id, formData);
+        upsertCar(response.data);
         setSuccess('Car updated successfully!');
       } else {
-        await carsAPI.create(formData);
+        const response = await carsAPI.create(formData);
+        upsertCar(response.data);
         setSuccess('Car added successfully!');
       }
       handleCloseModal();
-      fetchCars();
     } catch (err) {
       setError('Failed to save car: ' + (err.response?.data?.detail || err.message));
     }
@@ -169,8 +193,8 @@ function CarsPage() {
     if (window.confirm('Are you sure you want to delete this car?')) {
       try {
         await carsAPI.delete(id);
+        removeCar(id);
         setSuccess('Car deleted successfully!');
-        fetchCars();
       } catch (err) {
         setError('Failed to delete car: ' + (err.response?.data?.detail || err.message));
       }
@@ -195,12 +219,15 @@ function CarsPage() {
         {cars.map(car => (
           <div key={car.id} className="car-card">
             <div className="car-image-container">
-              {car.image_filename ? (
+              {car.image_url ? (
                 <>
                   <img
-                    src={`/api/images/cars/${car.id}/download`}
+                    src={`${car.image_url}?w=320`}
+                    srcSet={`${car.image_url}?w=640 2x`}
                     alt={`${car.marque} ${car.modele}`}
                     className="car-image"
+                    loading="lazy"
+                    decoding="async"
                   />
                   <button
                     className="btn-delete-image"
@@ -1,20 +1,31 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { statsAPI } from '../services/api';
 import LoadingSpinner from '../components/LoadingSpinner';
 import ErrorMessage from '../components/ErrorMessage';
+import useFleetEvents from '../hooks/useFleetEvents';
 
 function Dashboard() {
   const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
+  // Counters are re-read (one row) at most once per burst of fleet changes
+  const refreshTimer = useRef(null);
+  useFleetEvents(['car', 'cars', 'rental', 'import'], {
+    '*': () => {
+      clearTimeout(refreshTimer.current);
+      refreshTimer.current = setTimeout(() => fetchStatistics(false), 500);
+    },
+  });
+  useEffect(() => () => clearTimeout(refreshTimer.current), []);
+
   useEffect(() => {
     fetchStatistics();
   }, []);
 
-  const fetchStatistics = async () => {
+  const fetchStatistics = async (showSpinner = true) => {
     try {
-      setLoading(true);
+      if (showSpinner) setLoading(true);
       const response = await statsAPI.getStatistics();
       setStats(response.data);
       setError(null);
@@ -69,7 +80,7 @@ function Dashboard() {
         </ul>
       </div>
 
-      <button className="btn btn-primary" onClick={fetchStatistics}>
+      <button className="btn btn-primary" onClick={() => fetchStatistics()}>
         Refresh Statistics
       </button>
     </div>
@@ -4,6 +4,7 @@ import Modal from '../components/Modal';
 import LoadingSpinner from '../components/LoadingSpinner';
 import ErrorMessage from '../components/ErrorMessage';
 import SuccessMessage from '../components/SuccessMessage';
+import useFleetEvents from '../hooks/useFleetEvents';
 
 function RentalsPage() {
   const [rentals, setRentals] = useState([]);
@@ -19,6 +20,53 @@ function RentalsPage() {
     customer_id: '',
   });
 
+  // A new rental is loaded on its own (one request) and merged into the list
+  const addRental = async (id) => {
+    try {
+      const { data } = await rentalsAPI.getById(id);
+      const { car, customer, ...rental } = data;
+      const row = {
+        ...rental,
+        car_num_imma: car.num_imma,
+        car_marque: car.marque,
+        car_modele: car.modele,
+        customer_id_loc: customer.id_loc,
+        customer_nom: customer.nom,
+        customer_prenom: customer.prenom,
+      };
+      setRentals(prev => (prev.some(r => r.id === id) ? prev : [...prev, row]));
+    } catch (err) {
+      console.error(err);
+    }
+  };
+  const patchRental = (changes) => setRentals(prev => prev.map(r => (r.id === changes.id ? { ...r, ...changes } : r)));
+  const removeRental = (id) => setRentals(prev => prev.filter(r => r.id !== id));
+  const patchRows = (match, changes) => setRentals(prev => prev.map(r => (match(r) ? { ...r, ...changes } : r)));
+
+  useFleetEvents(['rental', 'car', 'customer', 'import'], {
+    'rental.created': (data) => addRental(data.id),
+    'rental.returned': patchRental,
+    'rental.deleted': (data) => removeRental(data.id),
+    'car.updated': (data) => {
+      if (data.marque !== undefined || data.modele !== undefined) {
+        const changes = {};
+        if (data.marque !== undefined) changes.car_marque = data.marque;
+        if (data.modele !== undefined) changes.car_modele = data.modele;
+        patchRows(r => r.car_id === data.id, changes);
+      }
+    },
+    'customer.updated': (data) => {
+      const changes = {};
+      if (data.nom !== undefined) changes.customer_nom = data.nom;
+      if (data.prenom !== undefined) changes.customer_prenom = data.prenom;
+      patchRows(r => r.customer_id === data.id, changes);
+    },
+    'import.completed': (data) => {
+      if (data.entity === 'rentals') fetchData();
+    },
+    reset: () => fetchData(),
+  });
+
   useEffect(() => {
     fetchData();
   }, []);
@@ -26,14 +74,9 @@ function RentalsPage() {
   const fetchData = async () => {
     try {
       setLoading(true);
-      const [rentalsRes, carsRes, customersRes] = await Promise.all([
-        rentalsAPI.getAll(),
-        carsAPI.getAll(),
-        customersAPI.getAll(),
-      ]);
+      // Rentals come with car and customer display columns already joined by the API
+      const rentalsRes = await rentalsAPI.getExpanded();
       setRentals(rentalsRes.data);
-      setCars(carsRes.data);
-      setCustomers(customersRes.data);
       setError(null);
     } catch (err) {
       setError('Failed to load data: ' + (err.response?.data?.detail || err.message));
@@ -43,9 +86,20 @@ function RentalsPage() {
     }
   };
 
-  const handleOpenModal = () => {
+  const handleOpenModal = async () => {
     setFormData({ car_id: '', customer_id: '' });
     setModalOpen(true);
+    try {
+      // Only the rental form needs the car and customer lists
+      const [carsRes, customersRes] = await Promise.all([
+        carsAPI.getAvailable(),
+        customersAPI.getAll(),
+      ]);
+      setCars(carsRes.data);
+      setCustomers(customersRes.data);
+    } catch (err) {
+      setError('Failed to load cars and customers: ' + (err.response?.data?.detail || err.message));
+    }
   };
 
   const handleCloseModal = () => {
@@ -67,10 +121,10 @@ function RentalsPage() {
     }
 
     try {
-      await rentalsAPI.create(formData);
+      const response = await rentalsAPI.create(formData);
+      addRental(response.data.id);
       setSuccess('Car rented successfully!');
       handleCloseModal();
-      fetchData();
     } catch (err) {
       setError('Failed to create rental: ' + (err.response?.data?.detail || err.message));
     }
@@ -79,9 +133,9 @@ function RentalsPage() {
   const handleReturnCar = async (rentalId) => {
     if (window.confirm('Are you sure you want to return this car?')) {
       try {
-        await rentalsAPI.returnCar(rentalId, {});
+        const response = await rentalsAPI.returnCar(rentalId, { id: rentalId });
+        patchRental(response.data);
         setSuccess('Car returned successfully!');
-        fetchData();
       } catch (err) {
         setError('Failed to return car: ' + (err.response?.data?.detail || err.message));
       }
@@ -92,20 +146,14 @@ function RentalsPage() {
     if (window.confirm('Are you sure you want to delete this rental record?')) {
       try {
         await rentalsAPI.delete(id);
+        removeRental(id);
         setSuccess('Rental deleted successfully!');
-        fetchData();
       } catch (err) {
         setError('Failed to delete rental: ' + (err.response?.data?.detail || err.message));
       }
     }
   };
 
-  const getRentalDisplay = (rental) => {
-    const car = cars.find(c => c.id === rental.car_id);
-    const customer = customers.find(c => c.id === rental.customer_id);
-    return { car, customer };
-  };
-
   const filteredRentals = activeTab === 'active' ? rentals.filter(r => !r.date_retour) : rentals;
 
   if (loading && rentals.length === 0) return <LoadingSpinner />;
@@ -150,12 +198,11 @@ function RentalsPage() {
           </thead>
           <tbody>
             {filteredRentals.map(rental => {
-              const { car, customer } = getRentalDisplay(rental);
               return (
                 <tr key={rental.id}>
                   <td>#{rental.id}</td>
-                  <td>{car ? `${car.marque} ${car.modele}` : 'N/A'}</td>
-                  <td>{customer ? `${customer.prenom} ${customer.nom}` : 'N/A'}</td>
+                  <td>{rental.car_marque ? `${rental.car_marque} ${rental.car_modele}` : 'N/A'}</td>
+                  <td>{rental.customer_nom ? `${rental.customer_prenom} ${rental.customer_nom}` : 'N/A'}</td>
                   <td>{new Date(rental.date_debut).toLocaleDateString()}</td>
                   <td>{rental.date_retour ? new Date(rental.date_retour).toLocaleDateString() : '—'}</td>
                   <td>
@@ -1,6 +1,6 @@
 import axios from 'axios';
 
-const API_BASE_URL = 'http://localhost:8000/api';
+export const API_BASE_URL = 'http://localhost:8000/api';
 
 const apiClient = axios.create({
   baseURL: API_BASE_URL,
@@ -34,6 +34,7 @@ export const customersAPI = {
 // Rentals API
 export const rentalsAPI = {
   getAll: (skip = 0, limit = 100) => apiClient.get('/rentals', { params: { skip, limit } }),
+  getExpanded: (skip = 0, limit = 100) => apiClient.get('/rentals/expanded', { params: { skip, limit } }),
   getById: (id) => apiClient.get(`/rentals/${id}`),
   create: (data) => apiClient.post('/rentals', data),
   returnCar: (id, data) => apiClient.post(`/rentals/${id}/return`, data),